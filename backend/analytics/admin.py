@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import PartSalesDaily
+
+
+@admin.register(PartSalesDaily)
+class PartSalesDailyAdmin(admin.ModelAdmin):
+    list_display = ['date', 'part', 'brand', 'warehouse', 'units', 'revenue', 'orders_count']
+    list_filter = ['date', 'brand', 'warehouse']
+    date_hierarchy = 'date'
+    raw_id_fields = ['part', 'brand', 'warehouse']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('part', 'brand', 'warehouse')
+    
+    def has_add_permission(self, request):
+        # Сводка заполняется автоматически и командой rebuild_sales_rollup
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
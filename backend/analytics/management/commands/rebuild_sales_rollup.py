@@ -0,0 +1,47 @@
+"""
+Management command для пересчета дневной сводки продаж по запчастям
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.rollup import rebuild_day
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сводку продаж PartSalesDaily из заказов (включая архив) за период'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Пересчитать последние N дней (по умолчанию: 30)'
+        )
+        parser.add_argument(
+            '--date-from',
+            type=date.fromisoformat,
+            help='Начало периода (ГГГГ-ММ-ДД), вместо --days'
+        )
+        parser.add_argument(
+            '--date-to',
+            type=date.fromisoformat,
+            help='Конец периода включительно (по умолчанию: сегодня)'
+        )
+
+    def handle(self, *args, **options):
+        date_to = options['date_to'] or timezone.localdate()
+        date_from = options['date_from'] or date_to - timedelta(days=options['days'] - 1)
+        if date_from > date_to:
+            raise CommandError('Начало периода позже конца')
+
+        day = date_from
+        rows_total = 0
+        while day <= date_to:
+            rows_total += rebuild_day(day)
+            day += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Сводка за {date_from} — {date_to} пересчитана. Строк: {rows_total}'
+        ))
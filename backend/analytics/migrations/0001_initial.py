@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartSalesDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('units', models.IntegerField(default=0, verbose_name='Продано, шт.')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Выручка')),
+                ('orders_count', models.IntegerField(default=0, verbose_name='Заказов')),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.brand', verbose_name='Бренд')),
+                ('part', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales_daily', to='catalog.part', verbose_name='Автозапчасть')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.warehouse', verbose_name='Склад')),
+            ],
+            options={
+                'verbose_name': 'Продажи запчасти за день',
+                'verbose_name_plural': 'Продажи запчастей по дням',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['part', 'date'], name='analytics_p_part_id_42cda5_idx'), models.Index(fields=['brand', 'date'], name='analytics_p_brand_i_a4b257_idx'), models.Index(fields=['warehouse', 'date'], name='analytics_p_warehou_bf2079_idx')],
+                'unique_together': {('date', 'part')},
+            },
+        ),
+    ]
@@ -0,0 +1,110 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:52
+
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+BATCH_SIZE = 2000
+
+
+def add_sales(totals, day, part_id, units, revenue, orders_count):
+    total = totals.setdefault((day, part_id), [0, Decimal('0'), 0])
+    total[0] += units
+    total[1] += revenue
+    total[2] += orders_count
+
+
+def add_order_sales(OrderItem, totals, order_ids):
+    """Продажи пакета заказов (каждый заказ целиком в одном пакете)"""
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .annotate(day=TruncDate('order__created_at'))
+        .values('day', 'part_id')
+        .annotate(
+            units=Sum('quantity'),
+            revenue=Sum('total_price'),
+            orders_count=Count('order_id', distinct=True)
+        )
+        .order_by()
+    )
+    for row in rows:
+        add_sales(totals, row['day'], row['part_id'], row['units'], row['revenue'], row['orders_count'])
+
+
+def backfill_sales_daily(apps, schema_editor):
+    """
+    Сводка за все заказы, созданные до ее появления: иначе отмена такого
+    заказа вычитала бы продажи, которые в сводку не попадали
+    """
+    Order = apps.get_model('orders', 'Order')
+    OrderItem = apps.get_model('orders', 'OrderItem')
+    ArchivedOrder = apps.get_model('orders', 'ArchivedOrder')
+    Part = apps.get_model('catalog', 'Part')
+    PartSalesDaily = apps.get_model('analytics', 'PartSalesDaily')
+
+    # (дата, запчасть) -> [шт., выручка, заказов]
+    totals = {}
+    order_ids = Order.objects.exclude(status='cancelled').order_by('id').values_list('id', flat=True)
+    batch = []
+    for order_id in order_ids.iterator(chunk_size=BATCH_SIZE):
+        batch.append(order_id)
+        if len(batch) >= BATCH_SIZE:
+            add_order_sales(OrderItem, totals, batch)
+            batch = []
+    if batch:
+        add_order_sales(OrderItem, totals, batch)
+
+    # Позиции архивных заказов есть только в снимке заказа
+    archived_orders = ArchivedOrder.objects.exclude(status='cancelled').only('created_at', 'data')
+    for order in archived_orders.iterator(chunk_size=500):
+        day = timezone.localtime(order.created_at).date()
+        order_totals = {}
+        for item in order.data.get('items', []):
+            total = order_totals.setdefault(item['part']['id'], [0, Decimal('0')])
+            total[0] += item['quantity']
+            total[1] += Decimal(item['total_price'])
+        for part_id, (units, revenue) in order_totals.items():
+            add_sales(totals, day, part_id, units, revenue, 1)
+
+    part_ids = sorted({part_id for day, part_id in totals})
+    parts = {}
+    for start in range(0, len(part_ids), BATCH_SIZE):
+        parts.update(
+            (part_id, (brand_id, warehouse_id))
+            for part_id, brand_id, warehouse_id in Part.objects.filter(
+                id__in=part_ids[start:start + BATCH_SIZE]
+            ).values_list('id', 'brand_id', 'warehouse_id')
+        )
+
+    PartSalesDaily.objects.all().delete()
+    batch = []
+    for (day, part_id), (units, revenue, orders_count) in totals.items():
+        if part_id not in parts:
+            # Запчасть удалена из каталога
+            continue
+        brand_id, warehouse_id = parts[part_id]
+        batch.append(PartSalesDaily(
+            date=day, part_id=part_id, brand_id=brand_id, warehouse_id=warehouse_id,
+            units=units, revenue=revenue, orders_count=orders_count
+        ))
+        if len(batch) >= BATCH_SIZE:
+            PartSalesDaily.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        PartSalesDaily.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('catalog', '0003_part_changes'),
+        ('orders', '0011_orderevent_txid'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sales_daily, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.db import models
+
+
+class PartSalesDaily(models.Model):
+    """
+    Продажи запчасти за день (по дате создания заказа, без отмененных заказов).
+    Обновляется при создании и отмене заказов, пересчитывается командой
+    rebuild_sales_rollup.
+    """
+    
+    date = models.DateField(
+        verbose_name="Дата"
+    )
+    part = models.ForeignKey(
+        'catalog.Part',
+        on_delete=models.CASCADE,
+        related_name='sales_daily',
+        verbose_name="Автозапчасть"
+    )
+    # Бренд и склад на момент продажи: отчеты по ним не требуют join с каталогом
+    brand = models.ForeignKey(
+        'catalog.Brand',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Бренд"
+    )
+    warehouse = models.ForeignKey(
+        'catalog.Warehouse',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Склад"
+    )
+    units = models.IntegerField(
+        default=0,
+        verbose_name="Продано, шт."
+    )
+    revenue = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Выручка"
+    )
+    orders_count = models.IntegerField(
+        default=0,
+        verbose_name="Заказов"
+    )
+    
+    class Meta:
+        verbose_name = "Продажи запчасти за день"
+        verbose_name_plural = "Продажи запчастей по дням"
+        ordering = ['-date']
+        unique_together = ['date', 'part']
+        indexes = [
+            models.Index(fields=['part', 'date']),
+            models.Index(fields=['brand', 'date']),
+            models.Index(fields=['warehouse', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - {self.part_id}: {self.units} шт."
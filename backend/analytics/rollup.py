@@ -0,0 +1,184 @@
+"""
+Поддержка дневной сводки продаж PartSalesDaily
+
+Позиции заказов агрегируются по (дате заказа, запчасти) и прибавляются к
+сводке одним INSERT ... ON CONFLICT DO UPDATE (PostgreSQL и SQLite), поэтому
+параллельные заказы одной запчасти не теряют обновлений. При отмене заказа те
+же суммы вычитаются. Вызывать внутри транзакции, в которой создается или
+отменяется заказ.
+
+Пересчет дня (rebuild_day) удаляет и заново вставляет строки дня. Чтобы он не
+шел одновременно с изменениями сводки за тот же день, в PostgreSQL оба пути
+берут транзакционную advisory-блокировку дня: изменения — разделяемую (заказы
+не ждут друг друга), пересчет — исключительную. Пересчет начинается после
+фиксации уже начатых изменений дня, а новые изменения ждут конца пересчета.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from catalog.models import Part
+from orders.models import ArchivedOrder, OrderItem
+from .models import PartSalesDaily
+
+SIGN_CREATED = 1
+SIGN_CANCELLED = -1
+
+# Первый ключ advisory-блокировок сводки (второй — день), чтобы не пересекаться
+# с другими блокировками в той же базе
+ROLLUP_LOCK_NAMESPACE = 3901
+
+
+def lock_days(days, exclusive=False):
+    """Блокировка дней сводки до конца транзакции (только PostgreSQL)"""
+    if connection.vendor != 'postgresql':
+        # SQLite и так выполняет пишущие транзакции по одной
+        return
+    function = 'pg_advisory_xact_lock' if exclusive else 'pg_advisory_xact_lock_shared'
+    with connection.cursor() as cursor:
+        for day in sorted(set(days)):
+            cursor.execute(f'SELECT {function}(%s, %s)', [ROLLUP_LOCK_NAMESPACE, day.toordinal()])
+
+
+def sales_rows(items):
+    """Агрегаты позиций заказов по (дате заказа, запчасти)"""
+    return (
+        items.annotate(date=TruncDate('order__created_at'))
+        .values('date', 'part_id', 'part__brand_id', 'part__warehouse_id')
+        .annotate(
+            units=Sum('quantity'),
+            revenue=Sum('total_price'),
+            orders_count=Count('order_id', distinct=True)
+        )
+        .order_by()
+    )
+
+
+def collect_sales(items, archived_orders):
+    """
+    Строки сводки (словари полей PartSalesDaily) из позиций заказов items и
+    снимков архивных заказов archived_orders; отмененные заказы исключает
+    вызывающий
+    """
+    rows = {}
+    for row in sales_rows(items):
+        rows[(row['date'], row['part_id'])] = {
+            'date': row['date'],
+            'part_id': row['part_id'],
+            'brand_id': row['part__brand_id'],
+            'warehouse_id': row['part__warehouse_id'],
+            'units': row['units'],
+            'revenue': row['revenue'],
+            'orders_count': row['orders_count'],
+        }
+
+    # Позиции архивных заказов есть только в снимке заказа
+    totals = defaultdict(lambda: {'units': 0, 'revenue': Decimal('0'), 'orders': set()})
+    archived_orders = archived_orders.only('original_id', 'created_at', 'data')
+    for order in archived_orders.iterator(chunk_size=500):
+        day = timezone.localtime(order.created_at).date()
+        for item in order.data.get('items', []):
+            total = totals[(day, item['part']['id'])]
+            total['units'] += item['quantity']
+            total['revenue'] += Decimal(item['total_price'])
+            total['orders'].add(order.original_id)
+
+    parts = {
+        part_id: (brand_id, warehouse_id)
+        for part_id, brand_id, warehouse_id in Part.objects.filter(
+            id__in={part_id for day, part_id in totals}
+        ).values_list('id', 'brand_id', 'warehouse_id')
+    }
+    for (day, part_id), total in totals.items():
+        if part_id not in parts:
+            # Запчасть удалена из каталога
+            continue
+        row = rows.get((day, part_id))
+        if row is None:
+            brand_id, warehouse_id = parts[part_id]
+            row = rows[(day, part_id)] = {
+                'date': day, 'part_id': part_id,
+                'brand_id': brand_id, 'warehouse_id': warehouse_id,
+                'units': 0, 'revenue': Decimal('0'), 'orders_count': 0,
+            }
+        row['units'] += total['units']
+        row['revenue'] += total['revenue']
+        row['orders_count'] += len(total['orders'])
+    return list(rows.values())
+
+
+def record_order_sales(order_ids, sign=SIGN_CREATED):
+    """Прибавляет (sign=1) или вычитает (sign=-1) продажи заказов из сводки"""
+    if not order_ids:
+        return
+    rows = list(sales_rows(OrderItem.objects.filter(order_id__in=order_ids)))
+    if not rows:
+        return
+    lock_days(row['date'] for row in rows)
+
+    table = PartSalesDaily._meta.db_table
+    with connection.cursor() as cursor:
+        if sign == SIGN_CREATED:
+            cursor.executemany(
+                f'INSERT INTO {table} '
+                '(date, part_id, brand_id, warehouse_id, units, revenue, orders_count) '
+                'VALUES (%s, %s, %s, %s, %s, %s, %s) '
+                'ON CONFLICT (date, part_id) DO UPDATE SET '
+                f'units = {table}.units + EXCLUDED.units, '
+                f'revenue = {table}.revenue + EXCLUDED.revenue, '
+                f'orders_count = {table}.orders_count + EXCLUDED.orders_count',
+                [
+                    (
+                        row['date'], row['part_id'], row['part__brand_id'], row['part__warehouse_id'],
+                        row['units'], row['revenue'], row['orders_count']
+                    )
+                    for row in rows
+                ]
+            )
+        else:
+            # Только UPDATE: для заказа, которого нет в сводке, не появится
+            # строка с отрицательными продажами
+            cursor.executemany(
+                f'UPDATE {table} SET '
+                'units = units - %s, revenue = revenue - %s, orders_count = orders_count - %s '
+                'WHERE date = %s AND part_id = %s',
+                [
+                    (row['units'], row['revenue'], row['orders_count'], row['date'], row['part_id'])
+                    for row in rows
+                ]
+            )
+
+    if sign == SIGN_CANCELLED:
+        # Строки, где после отмены не осталось продаж, не нужны
+        PartSalesDaily.objects.filter(
+            date__in={row['date'] for row in rows},
+            part_id__in={row['part_id'] for row in rows},
+            orders_count__lte=0
+        ).delete()
+
+
+@transaction.atomic
+def rebuild_day(day):
+    """Пересчитывает сводку за один день из заказов (включая архив)"""
+    lock_days([day], exclusive=True)
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = start + timedelta(days=1)
+
+    rows = collect_sales(
+        OrderItem.objects.filter(
+            order__created_at__gte=start, order__created_at__lt=end
+        ).exclude(order__status='cancelled'),
+        ArchivedOrder.objects.filter(
+            created_at__gte=start, created_at__lt=end
+        ).exclude(status='cancelled'),
+    )
+    PartSalesDaily.objects.filter(date=day).delete()
+    PartSalesDaily.objects.bulk_create(
+        [PartSalesDaily(**row) for row in rows], batch_size=1000
+    )
+    return len(rows)
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+
+class SalesQuerySerializer(serializers.Serializer):
+    """Параметры отчетов по продажам"""
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    part = serializers.IntegerField(required=False)
+    brand = serializers.IntegerField(required=False)
+    warehouse = serializers.IntegerField(required=False)
+    
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 731
+    
+    def validate(self, attrs):
+        date_to = attrs.get('date_to') or timezone.localdate()
+        date_from = attrs.get('date_from') or date_to - timedelta(days=self.DEFAULT_DAYS - 1)
+        if date_from > date_to:
+            raise serializers.ValidationError("date_from позже date_to")
+        if (date_to - date_from).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"Период не больше {self.MAX_DAYS} дней")
+        attrs['date_from'] = date_from
+        attrs['date_to'] = date_to
+        attrs['days'] = (date_to - date_from).days + 1
+        return attrs
+
+
+class SalesRankingQuerySerializer(SalesQuerySerializer):
+    """Параметры рейтинга продаж"""
+    ordering = serializers.ChoiceField(
+        choices=['units', 'revenue', 'orders_count'],
+        default='units'
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    compare = serializers.BooleanField(
+        default=False,
+        help_text="Сравнить с предыдущим периодом той же длины"
+    )
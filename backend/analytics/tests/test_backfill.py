@@ -0,0 +1,45 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from analytics.models import PartSalesDaily
+from analytics.rollup import rebuild_day
+from orders.models import Order
+from orders.tests.utils import create_order, create_part
+
+
+class BackfillMigrationTests(TransactionTestCase):
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([target])
+
+    def snapshot(self):
+        return sorted(PartSalesDaily.objects.values_list(
+            'date', 'part_id', 'brand_id', 'warehouse_id', 'units', 'revenue', 'orders_count'
+        ))
+
+    def test_backfill_matches_rebuild(self):
+        part = create_part()
+        other = create_part()
+        old = timezone.now() - timezone.timedelta(days=400)
+        archived = create_order(part, status='delivered', quantity=2)
+        Order.objects.filter(id=archived.id).update(created_at=old)
+        call_command('archive_orders', stdout=StringIO())
+        create_order(part, quantity=3)
+        create_order(other, quantity=1)
+        create_order(part, status='cancelled', quantity=5)
+
+        self.migrate(('analytics', '0001_initial'))
+        self.migrate(('analytics', '0002_backfill_sales_daily'))
+        backfilled = self.snapshot()
+
+        PartSalesDaily.objects.all().delete()
+        for day in {timezone.localdate(), timezone.localtime(old).date()}:
+            rebuild_day(day)
+        self.assertEqual(backfilled, self.snapshot())
+        self.assertEqual(len(backfilled), 3)
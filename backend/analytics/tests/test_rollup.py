@@ -0,0 +1,75 @@
+import threading
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from analytics.models import PartSalesDaily
+from analytics.rollup import rebuild_day, record_order_sales
+from orders.tests.utils import create_order, create_part
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.part = create_part()
+        self.today = timezone.localdate()
+
+    def test_incremental_matches_rebuild(self):
+        for quantity in (1, 3):
+            record_order_sales([create_order(self.part, quantity=quantity).pk])
+        cancelled = create_order(self.part, quantity=5)
+        record_order_sales([cancelled.pk])
+        cancelled.transition_status('cancelled')
+
+        row = PartSalesDaily.objects.get(date=self.today, part=self.part)
+        self.assertEqual((row.units, row.orders_count), (4, 2))
+
+        rebuild_day(self.today)
+        row = PartSalesDaily.objects.get(date=self.today, part=self.part)
+        self.assertEqual((row.units, row.orders_count), (4, 2))
+
+    def test_cancel_of_order_missing_from_rollup(self):
+        # Заказ создан до появления сводки: в ней его нет
+        old = create_order(self.part, quantity=2)
+        old.transition_status('cancelled')
+        self.assertFalse(PartSalesDaily.objects.exists())
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Advisory-блокировки есть только в PostgreSQL')
+class RebuildConcurrencyTests(TransactionTestCase):
+    def test_rebuild_waits_for_open_order_transaction(self):
+        part = create_part()
+        today = timezone.localdate()
+        recorded, release = threading.Event(), threading.Event()
+
+        def place_order():
+            try:
+                with transaction.atomic():
+                    record_order_sales([create_order(part, quantity=2).pk])
+                    recorded.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        def rebuild():
+            try:
+                rebuild_day(today)
+            finally:
+                connection.close()
+
+        order_thread = threading.Thread(target=place_order)
+        order_thread.start()
+        self.assertTrue(recorded.wait(10))
+        rebuild_thread = threading.Thread(target=rebuild)
+        rebuild_thread.start()
+        try:
+            rebuild_thread.join(0.5)
+            self.assertTrue(rebuild_thread.is_alive())
+        finally:
+            release.set()
+            order_thread.join()
+            rebuild_thread.join()
+
+        row = PartSalesDaily.objects.get(date=today, part=part)
+        self.assertEqual((row.units, row.orders_count), (2, 1))
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import SalesAnalyticsViewSet
+
+router = DefaultRouter()
+router.register(r'analytics', SalesAnalyticsViewSet, basename='analytics')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
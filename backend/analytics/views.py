@@ -0,0 +1,144 @@
+from datetime import timedelta
+
+from django.db.models import DecimalField, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from catalog.models import Part, Brand, Warehouse
+from .models import PartSalesDaily
+from .serializers import SalesQuerySerializer, SalesRankingQuerySerializer
+
+
+class SalesAnalyticsViewSet(viewsets.ViewSet):
+    """
+    Отчеты по продажам. Читают только дневную сводку PartSalesDaily:
+    агрегация, рейтинг и сравнение с предыдущим периодом выполняются в БД.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    METRICS = ['units', 'revenue', 'orders_count']
+    
+    def _filtered_rows(self, params, date_from):
+        rows = PartSalesDaily.objects.filter(
+            date__gte=date_from, date__lte=params['date_to']
+        )
+        for field in ('part', 'brand', 'warehouse'):
+            if params.get(field):
+                rows = rows.filter(**{f'{field}_id': params[field]})
+        return rows
+    
+    def _ranking(self, request, group_field):
+        """Рейтинг групп (запчастей, брендов, складов) за период"""
+        query = SalesRankingQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        date_from, days = params['date_from'], params['days']
+        
+        current = Q(date__gte=date_from)
+        previous_from = date_from - timedelta(days=days)
+        rows = self._filtered_rows(params, previous_from if params['compare'] else date_from)
+        
+        zero = {
+            'units': Value(0),
+            'revenue': Value(0, output_field=DecimalField(max_digits=14, decimal_places=2)),
+            'orders_count': Value(0),
+        }
+        aggregates = {}
+        if params['compare']:
+            # Агрегаты прошлого периода объявляются раньше текущих: иначе
+            # Sum('units') сослался бы на аннотацию units, а не на поле
+            aggregates.update({
+                f'{metric}_prev': Coalesce(Sum(metric, filter=~current), zero[metric])
+                for metric in self.METRICS
+            })
+        aggregates.update({
+            metric: Coalesce(Sum(metric, filter=current), zero[metric])
+            for metric in self.METRICS
+        })
+        
+        ordering = params['ordering']
+        ranking = (
+            rows.values(group_field)
+            .annotate(**aggregates)
+            .filter(units__gt=0)
+            .annotate(units_per_day=Cast(F('units'), FloatField()) / days)
+            .order_by(f'-{ordering}', group_field)
+        )
+        if params['compare']:
+            ranking = ranking.annotate(**{
+                f'{metric}_change': F(metric) - F(f'{metric}_prev')
+                for metric in self.METRICS
+            })
+        results = list(ranking[:params['limit']])
+        for rank, row in enumerate(results, start=1):
+            row['rank'] = rank
+        
+        return {
+            'date_from': date_from,
+            'date_to': params['date_to'],
+            'days': days,
+            'ordering': ordering,
+            'previous_period': {
+                'date_from': previous_from,
+                'date_to': date_from - timedelta(days=1),
+            } if params['compare'] else None,
+            'results': results,
+        }
+    
+    @action(detail=False, methods=['get'])
+    def parts(self, request):
+        """Рейтинг запчастей: продажи, выручка, заказы и скорость продаж"""
+        report = self._ranking(request, 'part_id')
+        parts = Part.objects.select_related('brand').only(
+            'id', 'title', 'original_number', 'brand__name'
+        ).in_bulk([row['part_id'] for row in report['results']])
+        for row in report['results']:
+            part = parts.get(row['part_id'])
+            row['title'] = part.title if part else None
+            row['original_number'] = part.original_number if part else None
+            row['brand_name'] = part.brand.name if part else None
+        return Response(report)
+    
+    @action(detail=False, methods=['get'])
+    def brands(self, request):
+        """Рейтинг брендов"""
+        report = self._ranking(request, 'brand_id')
+        names = dict(Brand.objects.filter(
+            id__in=[row['brand_id'] for row in report['results']]
+        ).values_list('id', 'name'))
+        for row in report['results']:
+            row['name'] = names.get(row['brand_id'])
+        return Response(report)
+    
+    @action(detail=False, methods=['get'])
+    def warehouses(self, request):
+        """Рейтинг складов"""
+        report = self._ranking(request, 'warehouse_id')
+        names = dict(Warehouse.objects.filter(
+            id__in=[row['warehouse_id'] for row in report['results']]
+        ).values_list('id', 'name'))
+        for row in report['results']:
+            row['name'] = names.get(row['warehouse_id'])
+        return Response(report)
+    
+    @action(detail=False, methods=['get'])
+    def daily(self, request):
+        """Продажи по дням (с фильтрами part, brand, warehouse)"""
+        query = SalesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        
+        results = (
+            self._filtered_rows(params, params['date_from'])
+            .values('date')
+            .annotate(**{metric: Sum(metric) for metric in self.METRICS})
+            .order_by('date')
+        )
+        return Response({
+            'date_from': params['date_from'],
+            'date_to': params['date_to'],
+            'results': list(results),
+        })
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Brand, Warehouse, Part, PartImage
+from .models import Brand, Warehouse, Part, PartImage, PartReorderSuggestion
 
 
 @admin.register(Brand)
@@ -17,7 +17,7 @@ class BrandAdmin(admin.ModelAdmin):
 
 @admin.register(Warehouse)
 class WarehouseAdmin(admin.ModelAdmin):
-    list_display = ['name', 'address', 'parts_count']
+    list_display = ['name', 'address', 'lead_time_days', 'parts_count']
     search_fields = ['name', 'address']
     ordering = ['name']
     
@@ -89,3 +89,24 @@ class PartImageAdmin(admin.ModelAdmin):
             )
         return "Нет изображения"
     get_image_preview.short_description = 'Превью'
+
+
+@admin.register(PartReorderSuggestion)
+class PartReorderSuggestionAdmin(admin.ModelAdmin):
+    list_display = [
+        'part', 'warehouse', 'available', 'velocity', 'days_of_stock',
+        'reorder_point', 'suggested_quantity', 'computed_at'
+    ]
+    list_filter = ['warehouse', 'brand']
+    search_fields = ['part__title', 'part__original_number']
+    ordering = ['days_of_stock']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('part__brand', 'warehouse')
+    
+    def has_add_permission(self, request):
+        # Рекомендации рассчитывает только compute_reorder_suggestions
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,109 @@
+"""
+Лента изменений каталога для синхронизации клиентов и партнеров
+
+Изменения запчастей (создание, обновление, деактивация) и удаления (отметки
+PartTombstone) идут по возрастанию позиции и id — диапазонное чтение по
+индексу. Курсор склеивает позиции обеих лент:
+"<позиция запчасти>-<id запчасти>-<позиция отметки>-<id отметки>".
+
+В PostgreSQL позиция — номер транзакции (txid, заполняет триггер), и
+отдаются только строки транзакций старше pg_snapshot_xmin: все более ранние
+транзакции уже зафиксированы, поэтому долгий импорт, зафиксированный позже
+коротких изменений, не окажется позади курсора. В прочих базах позиция
+запчасти — updated_at в микросекундах, отметки идут по id, а самые свежие
+записи (моложе PARTS_CHANGES_SETTLE_SECONDS) не отдаются.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Part, PartTombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Верхняя граница значений курсора (bigint)
+MAX_CURSOR_VALUE = 2 ** 63 - 1
+
+
+def uses_txid():
+    """Позиции ленты — номера транзакций (только PostgreSQL)"""
+    return connection.vendor == 'postgresql'
+
+
+def committed_horizon():
+    """Наименьший номер транзакции, которая может быть еще не зафиксирована"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+        return cursor.fetchone()[0]
+
+
+def part_position(part):
+    if uses_txid():
+        return part.txid
+    return (part.updated_at - EPOCH) // timedelta(microseconds=1)
+
+
+def encode_cursor(part_pos, part_id, tombstone_pos, tombstone_id):
+    return f'{part_pos}-{part_id}-{tombstone_pos}-{tombstone_id}'
+
+
+def decode_cursor(cursor):
+    """
+    (позиция запчасти, id запчасти, позиция отметки, id отметки); пустой
+    курсор — с начала. Прежний курсор "<updated_at>-<id запчасти>-<id отметки>"
+    в PostgreSQL начинает запчасти с начала. ValueError при ошибке
+    """
+    if not cursor:
+        return 0, 0, 0, 0
+    values = [int(value) for value in cursor.split('-')]
+    if len(values) == 3:
+        micros, part_id, tombstone_id = values
+        values = [0, 0, 0, tombstone_id] if uses_txid() else [micros, part_id, 0, tombstone_id]
+    if len(values) != 4 or not all(0 <= value <= MAX_CURSOR_VALUE for value in values):
+        raise ValueError('Некорректный курсор')
+    return tuple(values)
+
+
+def after(field, position, row_id):
+    return Q(**{f'{field}__gt': position}) | Q(**{field: position, 'id__gt': row_id})
+
+
+def changes_since(cursor, limit):
+    """
+    Изменения после курсора: {'changes': [Part], 'deleted': [PartTombstone],
+    'next_cursor', 'has_more'}. ValueError или OverflowError при ошибке курсора
+    """
+    part_pos, part_id, tombstone_pos, tombstone_id = decode_cursor(cursor)
+
+    if uses_txid():
+        horizon = committed_horizon()
+        parts = Part.objects.filter(after('txid', part_pos, part_id), txid__lt=horizon)
+        parts = parts.order_by('txid', 'id')
+        tombstones = PartTombstone.objects.filter(txid__lt=horizon)
+    else:
+        settled_before = timezone.now() - timedelta(seconds=settings.PARTS_CHANGES_SETTLE_SECONDS)
+        updated_at = EPOCH + timedelta(microseconds=part_pos)
+        parts = Part.objects.filter(after('updated_at', updated_at, part_id), updated_at__lt=settled_before)
+        parts = parts.order_by('updated_at', 'id')
+        tombstones = PartTombstone.objects.filter(deleted_at__lt=settled_before)
+
+    parts = list(parts[:limit + 1])
+    tombstones = list(
+        tombstones.filter(after('txid', tombstone_pos, tombstone_id)).order_by('txid', 'id')[:limit + 1]
+    )
+
+    has_more = len(parts) > limit or len(tombstones) > limit
+    parts, tombstones = parts[:limit], tombstones[:limit]
+    if parts:
+        part_pos, part_id = part_position(parts[-1]), parts[-1].id
+    if tombstones:
+        tombstone_pos, tombstone_id = tombstones[-1].txid, tombstones[-1].id
+    return {
+        'changes': parts,
+        'deleted': tombstones,
+        'next_cursor': encode_cursor(part_pos, part_id, tombstone_pos, tombstone_id),
+        'has_more': has_more,
+    }
@@ -0,0 +1,104 @@
+"""
+Management command для расчета рекомендаций по дозаказу запчастей
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import DateTimeField, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Ceil, Coalesce
+from django.utils import timezone
+
+from analytics.models import PartSalesDaily
+from catalog.models import Part, PartReorderSuggestion
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации по дозаказу по скорости продаж, остаткам и сроку поставки складов'
+
+    # Колонки PartReorderSuggestion в порядке SELECT
+    COLUMNS = [
+        'part_id', 'brand_id', 'warehouse_id', 'units_sold', 'velocity', 'available',
+        'lead_time_days', 'days_of_stock', 'reorder_point', 'suggested_quantity', 'computed_at'
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=28,
+            help='За сколько последних дней считать скорость продаж (по умолчанию: 28)'
+        )
+        parser.add_argument(
+            '--safety-days',
+            type=int,
+            default=7,
+            help='Страховой запас в днях продаж (по умолчанию: 7)'
+        )
+        parser.add_argument(
+            '--cover-days',
+            type=int,
+            default=14,
+            help='На сколько дней продаж после поставки заказывать (по умолчанию: 14)'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        days = options['days']
+        safety_days = options['safety_days']
+        cover_days = options['cover_days']
+        since = timezone.localdate() - timedelta(days=days - 1)
+
+        # Продажи из дневной сводки (см. analytics), а не из позиций заказов
+        sales = (
+            PartSalesDaily.objects.filter(part=OuterRef('pk'), date__gte=since)
+            .order_by()
+            .values('part')
+            .annotate(total=Sum('units'))
+            .values('total')
+        )
+        lead_time = F('warehouse__lead_time_days')
+        # Расчет идет в БД одним INSERT ... SELECT по всему каталогу; аннотации
+        # объявлены в порядке COLUMNS и все попадают в values()
+        suggestions = (
+            Part.objects.filter(is_active=True)
+            .annotate(
+                s_part_id=F('id'),
+                s_brand_id=F('brand_id'),
+                s_warehouse_id=F('warehouse_id'),
+                s_units_sold=Coalesce(Subquery(sales, output_field=IntegerField()), 0),
+                s_velocity=Cast(F('s_units_sold'), FloatField()) / days,
+                s_available=F('available'),
+                s_lead_time_days=lead_time,
+                s_days_of_stock=Cast(F('available'), FloatField()) / F('s_velocity'),
+                s_reorder_point=Cast(
+                    Ceil(F('s_velocity') * (lead_time + safety_days)), IntegerField()
+                ),
+                s_suggested_quantity=Cast(
+                    Ceil(F('s_velocity') * (lead_time + safety_days + cover_days)), IntegerField()
+                ) - F('available'),
+                s_computed_at=Value(timezone.now(), output_field=DateTimeField()),
+            )
+            .filter(
+                s_units_sold__gt=0,
+                available__lte=F('s_reorder_point'),
+                s_suggested_quantity__gt=0,
+            )
+            .order_by()
+            .values(*[f's_{column}' for column in self.COLUMNS])
+        )
+        select_sql, params = suggestions.query.sql_with_params()
+
+        table = PartReorderSuggestion._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            PartReorderSuggestion.objects.all().delete()
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(self.COLUMNS)}) {select_sql}', params
+            )
+            created = cursor.rowcount
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Рекомендаций по дозаказу: {created} '
+            f'(расчет занял {time.monotonic() - started:.1f} с)'
+        ))
@@ -5,6 +5,8 @@ Management command для импорта автозапчастей из CSV ф
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from catalog.models import Brand, Warehouse, Part, PartImage
+from gooddrive_backend.httpcache import purge_dispatcher
+from seo.rebuild import rebuild_after_import
 import csv
 import os
 from decimal import Decimal, InvalidOperation
@@ -21,6 +23,11 @@ class Command(BaseCommand):
             default=100,
             help='Максимальное количество запчастей для импорта'
         )
+        parser.add_argument(
+            '--skip-seo-files',
+            action='store_true',
+            help='Не пересобирать SEO метаданные, robots.txt, карту сайта и фид YML после импорта'
+        )
     
     def handle(self, *args, **options):
         file_path = options['file_path']
@@ -42,7 +49,8 @@ class Command(BaseCommand):
         with open(file_path, 'r', encoding='utf-8-sig') as f:
             reader = csv.DictReader(f, delimiter=';')
             
-            with transaction.atomic():
+            # HTTP-кэш по каждой записи не сбрасываем: после импорта сбрасываются списки, остальное истекает само
+            with purge_dispatcher.suspended(), transaction.atomic():
                 for row_num, row in enumerate(reader, start=2):
                     if row_num > limit + 1:
                         break
@@ -124,6 +132,12 @@ class Command(BaseCommand):
         
         if errors:
             self.stdout.write(self.style.ERROR(f'\n⚠️ Всего ошибок: {len(errors)}'))
+        
+        # Микрокэш nginx, SEO метаданные, карта сайта, robots.txt и фид YML
+        rebuild_after_import(
+            skip_files=options['skip_seo_files'],
+            log=lambda message: self.stdout.write(self.style.SUCCESS(message))
+        )
     
     def parse_int(self, value, default=0):
         """Преобразует значение в integer"""
@@ -4,6 +4,8 @@ Management command для импорта автозапчастей из Excel 
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from catalog.models import Brand, Warehouse, Part, PartImage
+from gooddrive_backend.httpcache import purge_dispatcher
+from seo.rebuild import rebuild_after_import
 from openpyxl import load_workbook
 import os
 from decimal import Decimal, InvalidOperation
@@ -20,6 +22,11 @@ class Command(BaseCommand):
             default=100,
             help='Максимальное количество запчастей для импорта (по умолчанию: 100)'
         )
+        parser.add_argument(
+            '--skip-seo-files',
+            action='store_true',
+            help='Не пересобирать SEO метаданные, robots.txt, карту сайта и фид YML после импорта'
+        )
     
     def handle(self, *args, **options):
         file_path = options['file_path']
@@ -51,7 +58,8 @@ class Command(BaseCommand):
         errors = []
         
         # Обрабатываем данные
-        with transaction.atomic():
+        # HTTP-кэш по каждой записи не сбрасываем: после импорта сбрасываются списки, остальное истекает само
+        with purge_dispatcher.suspended(), transaction.atomic():
             for row_idx, row in enumerate(worksheet.iter_rows(min_row=2, values_only=False), start=2):
                 if row_idx > limit + 1:
                     break
@@ -134,6 +142,12 @@ class Command(BaseCommand):
         
         if errors:
             self.stdout.write(self.style.ERROR(f'\nОшибок: {len(errors)}'))
+        
+        # Микрокэш nginx, SEO метаданные, карта сайта, robots.txt и фид YML
+        rebuild_after_import(
+            skip_files=options['skip_seo_files'],
+            log=lambda message: self.stdout.write(self.style.SUCCESS(message))
+        )
     
     def get_field_mapping(self, row_data):
         """
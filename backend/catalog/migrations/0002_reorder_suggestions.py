@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='warehouse',
+            name='lead_time_days',
+            field=models.PositiveIntegerField(default=7, help_text='Сколько дней идет пополнение склада от заказа поставщику', verbose_name='Срок поставки, дней'),
+        ),
+        migrations.CreateModel(
+            name='PartReorderSuggestion',
+            fields=[
+                ('part', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reorder_suggestion', serialize=False, to='catalog.part', verbose_name='Автозапчасть')),
+                ('units_sold', models.PositiveIntegerField(verbose_name='Продано за период')),
+                ('velocity', models.FloatField(verbose_name='Продаж в день')),
+                ('available', models.PositiveIntegerField(verbose_name='Доступно')),
+                ('lead_time_days', models.PositiveIntegerField(verbose_name='Срок поставки, дней')),
+                ('days_of_stock', models.FloatField(verbose_name='Хватит на дней')),
+                ('reorder_point', models.PositiveIntegerField(verbose_name='Точка заказа')),
+                ('suggested_quantity', models.PositiveIntegerField(verbose_name='Рекомендуется заказать')),
+                ('computed_at', models.DateTimeField(verbose_name='Дата расчета')),
+                ('brand', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.brand', verbose_name='Бренд')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.warehouse', verbose_name='Склад')),
+            ],
+            options={
+                'verbose_name': 'Рекомендация по дозаказу',
+                'verbose_name_plural': 'Рекомендации по дозаказу',
+                'ordering': ['days_of_stock'],
+                'indexes': [models.Index(fields=['days_of_stock'], name='catalog_par_days_of_918b95_idx'), models.Index(fields=['warehouse', 'days_of_stock'], name='catalog_par_warehou_fbe7a3_idx'), models.Index(fields=['brand', 'days_of_stock'], name='catalog_par_brand_i_245ba3_idx')],
+            },
+        ),
+    ]
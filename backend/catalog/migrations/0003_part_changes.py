@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:20
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_reorder_suggestions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('part_id', models.BigIntegerField(verbose_name='ID запчасти')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удаленная автозапчасть',
+                'verbose_name_plural': 'Удаленные автозапчасти',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['updated_at', 'id'], name='catalog_par_updated_a3e2d5_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.7 on 2026-10-19 20:01
+
+from django.db import migrations, models
+
+
+def create_txid_triggers(apps, schema_editor):
+    """
+    Триггеры записывают номер транзакции: в запчасть — при создании и каждом
+    изменении, в отметку об удалении — при создании
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        '''
+        CREATE OR REPLACE FUNCTION catalog_set_txid() RETURNS trigger AS $$
+        BEGIN
+            NEW.txid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        '''
+    )
+    schema_editor.execute(
+        'CREATE TRIGGER catalog_part_txid BEFORE INSERT OR UPDATE ON catalog_part '
+        'FOR EACH ROW EXECUTE FUNCTION catalog_set_txid()'
+    )
+    schema_editor.execute(
+        'CREATE TRIGGER catalog_parttombstone_txid BEFORE INSERT ON catalog_parttombstone '
+        'FOR EACH ROW EXECUTE FUNCTION catalog_set_txid()'
+    )
+
+
+def drop_txid_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP TRIGGER IF EXISTS catalog_part_txid ON catalog_part')
+    schema_editor.execute('DROP TRIGGER IF EXISTS catalog_parttombstone_txid ON catalog_parttombstone')
+    schema_editor.execute('DROP FUNCTION IF EXISTS catalog_set_txid()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_part_changes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='parttombstone',
+            options={'ordering': ['txid', 'id'], 'verbose_name': 'Удаленная автозапчасть', 'verbose_name_plural': 'Удаленные автозапчасти'},
+        ),
+        migrations.AddField(
+            model_name='part',
+            name='txid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция'),
+        ),
+        migrations.AddField(
+            model_name='parttombstone',
+            name='txid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция'),
+        ),
+        migrations.AddIndex(
+            model_name='part',
+            index=models.Index(fields=['txid', 'id'], name='catalog_par_txid_54fcca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parttombstone',
+            index=models.Index(fields=['txid', 'id'], name='catalog_par_txid_9e5e17_idx'),
+        ),
+        # Уже существующие строки остаются с txid = 0 и идут первыми в порядке id
+        migrations.RunPython(create_txid_triggers, drop_txid_triggers),
+    ]
@@ -28,6 +28,11 @@ class Warehouse(models.Model):
     """Модель склада"""
     name = models.CharField(max_length=200, verbose_name="Название склада")
     address = models.TextField(verbose_name="Адрес склада")
+    lead_time_days = models.PositiveIntegerField(
+        default=7,
+        verbose_name="Срок поставки, дней",
+        help_text="Сколько дней идет пополнение склада от заказа поставщику"
+    )
     
     class Meta:
         verbose_name = "Склад"
@@ -90,6 +95,8 @@ class Part(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+    # Номер транзакции последнего изменения (заполняет триггер PostgreSQL)
+    txid = models.BigIntegerField(default=0, editable=False, verbose_name="Транзакция")
     
     class Meta:
         verbose_name = "Автозапчасть"
@@ -100,6 +107,9 @@ class Part(models.Model):
             models.Index(fields=['warehouse', 'is_active']),
             models.Index(fields=['price_opt']),
             models.Index(fields=['available']),
+            # Лента изменений /api/parts/changes/ (txid — PostgreSQL, updated_at — прочие базы)
+            models.Index(fields=['txid', 'id']),
+            models.Index(fields=['updated_at', 'id']),
         ]
     
     def __str__(self):
@@ -140,6 +150,25 @@ class PartImage(models.Model):
         if self.image and not self.image_url:
             self.image_url = self.image.url
         super().save(*args, **kwargs)
+        self.touch_part()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.touch_part()
+        return result
+    
+    def touch_part(self):
+        """Обновляет updated_at запчасти: по нему пересобираются карта сайта, фид и JSON-LD"""
+        Part.objects.filter(pk=self.part_id).update(updated_at=timezone.now())
+    
+    @classmethod
+    def main_image_url_subquery(cls, part_ref='pk'):
+        """Подзапрос URL главного (первого) изображения запчасти для annotate()"""
+        return models.Subquery(
+            cls.objects.filter(part=models.OuterRef(part_ref))
+            .order_by('order_index', 'id')
+            .values('image_url')[:1]
+        )
     
     @property
     def get_image_url(self):
@@ -149,3 +178,64 @@ class PartImage(models.Model):
         elif self.image:
             return self.image.url
         return None
+
+
+class PartReorderSuggestion(models.Model):
+    """
+    Рекомендация по дозаказу запчасти. Таблица целиком пересчитывается
+    командой compute_reorder_suggestions; строки есть только у запчастей,
+    которые пора дозаказать.
+    """
+    part = models.OneToOneField(
+        Part,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='reorder_suggestion',
+        verbose_name="Автозапчасть"
+    )
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE, related_name='+', verbose_name="Бренд")
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name='+', verbose_name="Склад")
+    
+    units_sold = models.PositiveIntegerField(verbose_name="Продано за период")
+    velocity = models.FloatField(verbose_name="Продаж в день")
+    available = models.PositiveIntegerField(verbose_name="Доступно")
+    lead_time_days = models.PositiveIntegerField(verbose_name="Срок поставки, дней")
+    days_of_stock = models.FloatField(verbose_name="Хватит на дней")
+    reorder_point = models.PositiveIntegerField(verbose_name="Точка заказа")
+    suggested_quantity = models.PositiveIntegerField(verbose_name="Рекомендуется заказать")
+    computed_at = models.DateTimeField(verbose_name="Дата расчета")
+    
+    class Meta:
+        verbose_name = "Рекомендация по дозаказу"
+        verbose_name_plural = "Рекомендации по дозаказу"
+        ordering = ['days_of_stock']
+        indexes = [
+            models.Index(fields=['days_of_stock']),
+            models.Index(fields=['warehouse', 'days_of_stock']),
+            models.Index(fields=['brand', 'days_of_stock']),
+        ]
+    
+    def __str__(self):
+        return f"{self.part_id}: заказать {self.suggested_quantity} шт."
+
+
+class PartTombstone(models.Model):
+    """
+    Отметка об удалении запчасти для ленты изменений /api/parts/changes/
+    (создается сигналом post_delete, в том числе при каскадном удалении)
+    """
+    part_id = models.BigIntegerField(verbose_name="ID запчасти")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="Дата удаления")
+    # Номер транзакции удаления (заполняет триггер PostgreSQL)
+    txid = models.BigIntegerField(default=0, editable=False, verbose_name="Транзакция")
+    
+    class Meta:
+        verbose_name = "Удаленная автозапчасть"
+        verbose_name_plural = "Удаленные автозапчасти"
+        ordering = ['txid', 'id']
+        indexes = [
+            models.Index(fields=['txid', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.part_id} удалена {self.deleted_at:%Y-%m-%d %H:%M}"
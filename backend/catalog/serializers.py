@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Brand, Warehouse, Part, PartImage
+from seo.jsonld import cached_part_json_ld
+from .models import Brand, Warehouse, Part, PartImage, PartReorderSuggestion, PartTombstone
 
 
 class BrandSerializer(serializers.ModelSerializer):
@@ -21,7 +22,7 @@ class WarehouseSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Warehouse
-        fields = ['id', 'name', 'address', 'parts_count']
+        fields = ['id', 'name', 'address', 'lead_time_days', 'parts_count']
         read_only_fields = ['id']
     
     def get_parts_count(self, obj):
@@ -74,6 +75,7 @@ class PartDetailSerializer(serializers.ModelSerializer):
     brand = BrandSerializer(read_only=True)
     warehouse = WarehouseSerializer(read_only=True)
     images = PartImageSerializer(many=True, read_only=True)
+    json_ld = serializers.SerializerMethodField()
     
     class Meta:
         model = Part
@@ -81,9 +83,13 @@ class PartDetailSerializer(serializers.ModelSerializer):
             'id', 'is_active', 'title', 'label', 'original_number',
             'manufacturer_number', 'brand', 'warehouse', 'quantity',
             'stock', 'reserve', 'available', 'price_opt', 'description',
-            'images', 'created_at', 'updated_at'
+            'images', 'json_ld', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def get_json_ld(self, obj):
+        """Разметка Schema.org Product (из кэша по updated_at)"""
+        return cached_part_json_ld(obj)
 
 
 class PartCreateUpdateSerializer(serializers.ModelSerializer):
@@ -124,3 +130,43 @@ class PartCreateUpdateSerializer(serializers.ModelSerializer):
                 PartImage.objects.create(part=instance, **image_data)
         
         return instance
+
+
+class PartReorderSuggestionSerializer(serializers.ModelSerializer):
+    """Сериализатор рекомендации по дозаказу"""
+    title = serializers.CharField(source='part.title', read_only=True)
+    original_number = serializers.CharField(source='part.original_number', read_only=True)
+    manufacturer_number = serializers.CharField(source='part.manufacturer_number', read_only=True)
+    brand_name = serializers.CharField(source='brand.name', read_only=True)
+    warehouse_name = serializers.CharField(source='warehouse.name', read_only=True)
+    
+    class Meta:
+        model = PartReorderSuggestion
+        fields = [
+            'part_id', 'title', 'original_number', 'manufacturer_number',
+            'brand_id', 'brand_name', 'warehouse_id', 'warehouse_name',
+            'units_sold', 'velocity', 'available', 'lead_time_days',
+            'days_of_stock', 'reorder_point', 'suggested_quantity', 'computed_at'
+        ]
+
+
+class PartChangeSerializer(serializers.ModelSerializer):
+    """Сериализатор запчасти в ленте изменений (без вложенных объектов)"""
+    
+    class Meta:
+        model = Part
+        fields = [
+            'id', 'is_active', 'title', 'label', 'original_number',
+            'manufacturer_number', 'brand_id', 'warehouse_id', 'quantity',
+            'stock', 'reserve', 'available', 'price_opt', 'description',
+            'created_at', 'updated_at'
+        ]
+
+
+class PartTombstoneSerializer(serializers.ModelSerializer):
+    """Сериализатор отметки об удалении запчасти"""
+    id = serializers.IntegerField(source='part_id')
+    
+    class Meta:
+        model = PartTombstone
+        fields = ['id', 'deleted_at']
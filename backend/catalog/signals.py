@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from gooddrive_backend.httpcache import purge_dispatcher
+
+from .models import Brand, Part, PartImage, PartTombstone, Warehouse
+
+
+@receiver(post_delete, sender=Part)
+def record_part_tombstone(sender, instance, **kwargs):
+    """Запоминает удаление запчасти для ленты изменений"""
+    PartTombstone.objects.create(part_id=instance.pk)
+
+
+@receiver(post_save, sender=Part)
+@receiver(post_delete, sender=Part)
+def purge_part_http_cache(sender, instance, **kwargs):
+    """Сбрасывает HTTP-микрокэш запчасти, ее бренда и списков каталога"""
+    purge_dispatcher.purge('catalog', f'part:{instance.pk}', f'brand:{instance.brand_id}')
+
+
+@receiver(post_save, sender=PartImage)
+@receiver(post_delete, sender=PartImage)
+def purge_part_image_http_cache(sender, instance, **kwargs):
+    purge_dispatcher.purge(f'part:{instance.part_id}')
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def purge_brand_http_cache(sender, instance, **kwargs):
+    purge_dispatcher.purge('catalog', f'brand:{instance.pk}')
+
+
+@receiver(post_save, sender=Warehouse)
+@receiver(post_delete, sender=Warehouse)
+def purge_warehouse_http_cache(sender, instance, **kwargs):
+    purge_dispatcher.purge('catalog', f'warehouse:{instance.pk}')
@@ -0,0 +1,148 @@
+import threading
+from unittest import skipIf, skipUnless
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from catalog.changes import decode_cursor
+from catalog.models import Brand, Warehouse, Part, PartTombstone
+
+URL = '/api/parts/changes/'
+
+
+@override_settings(PARTS_CHANGES_SETTLE_SECONDS=0)
+class PartChangesFeedTests(TransactionTestCase):
+    # Лента отдает только изменения зафиксированных транзакций, поэтому тесты
+    # не оборачиваются в общую транзакцию
+    def setUp(self):
+        self.client = APIClient()
+        self.brand = Brand.objects.create(name='Bosch', country='Германия')
+        self.warehouse = Warehouse.objects.create(name='Основной', address='Москва')
+
+    def create_part(self, brand=None):
+        return Part.objects.create(
+            title='Фильтр масляный', brand=brand or self.brand, warehouse=self.warehouse,
+            quantity=1, stock=1, available=1, price_opt=100
+        )
+
+    def read(self, since='', limit=500):
+        response = self.client.get(URL, {'since': since, 'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def read_all(self, since='', limit=500):
+        """Все страницы после since: (id изменений, id удалений, курсор)"""
+        changed, deleted = [], []
+        cursors = [decode_cursor(since)]
+        while True:
+            page = self.read(since, limit)
+            changed += [part['id'] for part in page['changes']]
+            deleted += [tombstone['id'] for tombstone in page['deleted']]
+            since = page['next_cursor']
+            cursors.append(decode_cursor(since))
+            if not page['has_more']:
+                break
+        for previous, current in zip(cursors, cursors[1:]):
+            # Ни одна из позиций курсора не откатывается назад
+            self.assertGreaterEqual(current[:2], previous[:2])
+            self.assertGreaterEqual(current[2:], previous[2:])
+        return changed, deleted, since
+
+    def test_pages_with_same_updated_at(self):
+        parts = [self.create_part() for _ in range(5)]
+        # Одна транзакция импорта: одинаковый updated_at, порядок по id
+        Part.objects.update(updated_at=timezone.now() - timezone.timedelta(seconds=1))
+
+        changed, deleted, cursor = self.read_all(limit=2)
+        self.assertEqual(changed, [part.id for part in parts])
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.read(cursor)['changes'], [])
+
+    def test_updated_and_deactivated_parts_return(self):
+        first, second = self.create_part(), self.create_part()
+        *_, cursor = self.read_all()
+
+        second.is_active = False
+        second.save()
+        first.save()
+        changes = {part['id']: part for part in self.read(cursor)['changes']}
+        self.assertEqual(set(changes), {first.id, second.id})
+        self.assertFalse(changes[second.id]['is_active'])
+
+    def test_deletions_reported_as_tombstones(self):
+        kept = self.create_part()
+        deleted = self.create_part()
+        other_brand = Brand.objects.create(name='Mann', country='Германия')
+        cascaded = self.create_part(brand=other_brand)
+        *_, cursor = self.read_all()
+
+        deleted_id = deleted.id
+        deleted.delete()
+        # Каскадное удаление тоже оставляет отметку
+        other_brand.delete()
+        changed, tombstones, cursor = self.read_all(cursor, limit=1)
+        self.assertEqual(changed, [])
+        self.assertEqual(tombstones, [deleted_id, cascaded.id])
+        self.assertTrue(Part.objects.filter(id=kept.id).exists())
+        self.assertEqual(self.read(cursor)['deleted'], [])
+
+    def test_invalid_cursor(self):
+        for since in ('abc', '1-2', '9' * 30 + '-1-0-0'):
+            response = self.client.get(URL, {'since': since})
+            self.assertEqual(response.status_code, 400, since)
+
+    @skipIf(connection.vendor == 'postgresql', 'В PostgreSQL позиция курсора — номер транзакции, а не дата')
+    def test_cursor_beyond_datetime_range(self):
+        response = self.client.get(URL, {'since': f'{2 ** 63 - 1}-1-0-0'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_legacy_cursor(self):
+        part = self.create_part()
+        deleted = self.create_part()
+        deleted.delete()
+        # Прежние курсоры выданы до появления номеров транзакций у отметок
+        PartTombstone.objects.update(txid=0)
+        tombstone_id = self.read()['deleted'][0]['id']
+
+        # Прежний курсор "<updated_at>-<id запчасти>-<id отметки>" принимается
+        page = self.read(f'0-0-{tombstone_id}')
+        self.assertEqual([change['id'] for change in page['changes']], [part.id])
+        self.assertEqual(page['deleted'], [])
+
+    @skipUnless(connection.vendor == 'postgresql', 'Порядок фиксации транзакций есть только в PostgreSQL')
+    def test_change_of_long_transaction_not_skipped(self):
+        """
+        Долгий импорт A меняет запчасть раньше, чем короткая транзакция B
+        (резерв), и фиксируется после нее. Курсор не должен уйти дальше A.
+        """
+        imported, reserved = self.create_part(), self.create_part()
+        *_, cursor = self.read_all()
+        written, release = threading.Event(), threading.Event()
+
+        def long_import():
+            try:
+                with transaction.atomic():
+                    Part.objects.filter(id=imported.id).update(price_opt=200)
+                    written.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=long_import)
+        thread.start()
+        try:
+            self.assertTrue(written.wait(10))
+            Part.objects.filter(id=reserved.id).update(available=0)
+
+            # B зафиксирована, но A еще открыта: B не отдается раньше A
+            page = self.read(cursor)
+            self.assertEqual(page['changes'], [])
+            cursor = page['next_cursor']
+        finally:
+            release.set()
+            thread.join()
+
+        changed, _, _ = self.read_all(cursor)
+        self.assertEqual(changed, [imported.id, reserved.id])
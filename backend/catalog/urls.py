@@ -9,6 +9,11 @@ router.register(r'parts', views.PartViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path(
+        'pages/part/<int:pk>/',
+        views.PartPageViewSet.as_view({'get': 'retrieve'}),
+        name='part-page'
+    ),
 ]
 
 
@@ -2,14 +2,24 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from .models import Brand, Warehouse, Part, PartImage
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, Q
+from django.http import Http404
+from gooddrive_backend.httpcache import HttpCacheMixin
+from seo.autometa import get_meta
+from seo.cache import seo_cache
+from seo.models import GeneratedMeta
+from .models import Brand, Warehouse, Part, PartImage, PartReorderSuggestion
 from .serializers import (
     BrandSerializer, WarehouseSerializer, 
-    PartListSerializer, PartDetailSerializer, PartCreateUpdateSerializer
+    PartListSerializer, PartDetailSerializer, PartCreateUpdateSerializer,
+    PartReorderSuggestionSerializer, PartChangeSerializer, PartTombstoneSerializer
 )
 from .filters import PartFilter
+from .changes import changes_since
 
 
 class PartPagination(PageNumberPagination):
@@ -19,8 +29,9 @@ class PartPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class BrandViewSet(viewsets.ReadOnlyModelViewSet):
+class BrandViewSet(HttpCacheMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для брендов (только чтение)"""
+    surrogate_key_prefix = 'brand'
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -29,8 +40,9 @@ class BrandViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ['name']
 
 
-class WarehouseViewSet(viewsets.ReadOnlyModelViewSet):
+class WarehouseViewSet(HttpCacheMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для складов (только чтение)"""
+    surrogate_key_prefix = 'warehouse'
     queryset = Warehouse.objects.all()
     serializer_class = WarehouseSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -39,8 +51,9 @@ class WarehouseViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ['name']
 
 
-class PartViewSet(viewsets.ModelViewSet):
+class PartViewSet(HttpCacheMixin, viewsets.ModelViewSet):
     """ViewSet для автозапчастей"""
+    surrogate_key_prefix = 'part'
     queryset = Part.objects.select_related('brand', 'warehouse').prefetch_related('images')
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = PartFilter
@@ -102,6 +115,50 @@ class PartViewSet(viewsets.ModelViewSet):
         serializer = PartListSerializer(queryset, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def reorder(self, request):
+        """
+        Рекомендации по дозаказу (пересчитываются ночью командой
+        compute_reorder_suggestions). Сначала то, что закончится раньше.
+        """
+        queryset = PartReorderSuggestion.objects.select_related(
+            'part', 'brand', 'warehouse'
+        ).order_by('days_of_stock', 'part_id')
+        for param in ('brand', 'warehouse'):
+            value = request.query_params.get(param)
+            if value and value.isdigit():
+                queryset = queryset.filter(**{f'{param}_id': value})
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = PartReorderSuggestionSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
+        serializer = PartReorderSuggestionSerializer(queryset, many=True)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Лента изменений каталога после курсора since: измененные (в том числе
+        деактивированные) и удаленные запчасти. Пустой since — с начала.
+        """
+        try:
+            limit = int(request.query_params.get('limit', 500))
+            result = changes_since(request.query_params.get('since', ''), max(1, min(limit, 1000)))
+        except (ValueError, OverflowError):
+            return Response(
+                {'error': 'Некорректный курсор since или параметр limit'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({
+            'changes': PartChangeSerializer(result['changes'], many=True).data,
+            'deleted': PartTombstoneSerializer(result['deleted'], many=True).data,
+            'next_cursor': result['next_cursor'],
+            'has_more': result['has_more'],
+        })
+    
     @action(detail=True, methods=['get'])
     def similar(self, request, pk=None):
         """Получить похожие автозапчасти (того же бренда)"""
@@ -115,5 +172,52 @@ class PartViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-
-
+class PartPageViewSet(HttpCacheMixin, viewsets.ViewSet):
+    """
+    Данные страницы запчасти для SSR одним запросом: детальная информация,
+    похожие запчасти, SEO метаданные и хлебные крошки. Ответ кэшируется
+    целиком; ключ включает updated_at запчасти и версию SEO-данных.
+    """
+    SIMILAR_LIMIT = 5
+    surrogate_keys = ['catalog', 'seo']
+    surrogate_key_prefix = 'part'
+    
+    def retrieve(self, request, pk=None):
+        updated_at = Part.objects.filter(pk=pk, is_active=True).values_list(
+            'updated_at', flat=True
+        ).first()
+        if updated_at is None:
+            raise Http404
+        
+        key = f'pages:part:{pk}:{updated_at.timestamp()}:{seo_cache.version()}'
+        data = cache.get(key)
+        if data is None:
+            data = self.build_page(pk)
+            cache.set(key, data, timeout=settings.PART_PAGE_CACHE_SECONDS)
+        return Response(data)
+    
+    def build_page(self, pk):
+        images = PartImage.objects.order_by('order_index', 'id')
+        part = (
+            Part.objects.select_related('brand', 'warehouse')
+            .prefetch_related(Prefetch('images', queryset=images))
+            .get(pk=pk)
+        )
+        similar = (
+            Part.objects.filter(brand_id=part.brand_id, is_active=True)
+            .exclude(id=part.id)
+            .select_related('brand', 'warehouse')
+            .prefetch_related(Prefetch('images', queryset=images))
+            .order_by('-created_at')[:self.SIMILAR_LIMIT]
+        )
+        return {
+            'part': PartDetailSerializer(part).data,
+            'similar': PartListSerializer(similar, many=True).data,
+            'meta': get_meta(GeneratedMeta.KIND_PART, part.id),
+            'breadcrumbs': [
+                {'title': 'Главная', 'url': '/'},
+                {'title': 'Каталог', 'url': '/catalog/'},
+                {'title': part.brand.name, 'url': f'/catalog/brand/{part.brand_id}/'},
+                {'title': part.title, 'url': f'/catalog/part/{part.id}/'},
+            ],
+        }
@@ -0,0 +1,128 @@
+"""
+Пакетный запрос /api/batch/: несколько GET-запросов к API за один HTTP-запрос
+
+Подзапросы не проходят middleware заново: URL разрешается резолвером и view
+вызывается напрямую с копией исходного запроса. Аутентификация выполняется
+один раз для пакета — пользователь передается в подзапросы через механизм
+forced authentication DRF. По умолчанию подзапросы выполняются по очереди в
+одном соединении с БД; с parallel=true — в пуле потоков (у каждого потока
+свое соединение, оно закрывается после подзапроса).
+
+Асинхронные представления (SSE) и маршруты выгрузок и файлов отклоняются до
+вызова: их ответ — поток или файл, который в пакет не помещается.
+"""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+BATCH_PATH = '/api/batch/'
+
+# Выгрузки, потоки и файлы: в пакете не выполняются
+EXCLUDED_URL_NAMES = {
+    'order-export', 'order-status-stream',
+    'robots-txt', 'sitemap-xml', 'sitemap-shard', 'yml-feed',
+}
+
+
+class BatchViewSet(viewsets.ViewSet):
+    """Выполняет список GET-запросов к /api/ и возвращает ответы в том же порядке"""
+
+    def create(self, request):
+        paths = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(paths, list) or not paths:
+            return Response(
+                {'error': 'Передайте непустой список requests'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(paths) > settings.BATCH_MAX_REQUESTS:
+            return Response(
+                {'error': f'Не больше {settings.BATCH_MAX_REQUESTS} запросов в пакете'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not all(isinstance(path, str) and path.startswith('/api/') for path in paths):
+            return Response(
+                {'error': 'Каждый запрос — строка с путем, начинающимся с /api/'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if request.data.get('parallel') and len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=settings.BATCH_MAX_WORKERS) as executor:
+                responses = list(executor.map(
+                    lambda path: self.run_in_thread(request, path), paths
+                ))
+        else:
+            responses = [self.run(request, path) for path in paths]
+        return Response({'responses': responses})
+
+    def run_in_thread(self, request, path):
+        try:
+            return self.run(request, path)
+        finally:
+            connection.close()
+
+    def run(self, request, path):
+        """Выполняет один подзапрос: {'path', 'status', 'body'}"""
+        url = urlsplit(path)
+        if url.path == BATCH_PATH:
+            return self.error(path, status.HTTP_400_BAD_REQUEST, 'Вложенный пакет не поддерживается')
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return self.error(path, status.HTTP_404_NOT_FOUND, 'Не найдено')
+
+        if match.url_name in EXCLUDED_URL_NAMES or asyncio.iscoroutinefunction(match.func):
+            return self.error(path, status.HTTP_400_BAD_REQUEST, 'Потоковые ответы не поддерживаются')
+
+        try:
+            response = match.func(self.subrequest(request, url, match), *match.args, **match.kwargs)
+            if response.streaming:
+                response.close()
+                return self.error(path, status.HTTP_400_BAD_REQUEST, 'Потоковые ответы не поддерживаются')
+            if isinstance(response, Response):
+                body = response.data
+            elif response.get('Content-Type', '').startswith('application/json'):
+                body = json.loads(response.content)
+            else:
+                body = response.content.decode(response.charset)
+        except Http404:
+            return self.error(path, status.HTTP_404_NOT_FOUND, 'Не найдено')
+        except Exception:
+            logger.exception('Batch subrequest %s failed', path)
+            return self.error(path, status.HTTP_500_INTERNAL_SERVER_ERROR, 'Внутренняя ошибка')
+        return {'path': path, 'status': response.status_code, 'body': body}
+
+    def subrequest(self, request, url, match):
+        """Копия исходного запроса как GET на url с уже выполненной аутентификацией"""
+        parent = request._request
+        sub = HttpRequest()
+        sub.method = 'GET'
+        sub.path = sub.path_info = url.path
+        sub.META = {
+            **parent.META,
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': url.path,
+            'QUERY_STRING': url.query,
+        }
+        sub.GET = QueryDict(url.query)
+        sub.COOKIES = parent.COOKIES
+        sub.resolver_match = match
+        if hasattr(parent, 'session'):
+            sub.session = parent.session
+        sub.user = request.user
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+        return sub
+
+    def error(self, path, status_code, message):
+        return {'path': path, 'status': status_code, 'body': {'error': message}}
@@ -0,0 +1,190 @@
+"""
+HTTP-микрокэш публичных GET-ответов каталога и SEO в nginx
+
+Ответы анонимным пользователям получают Cache-Control: public, max-age=
+HTTP_CACHE_SECONDS и заголовок Surrogate-Key со списком ключей ("catalog",
+"part:12", "brand:3", "seo" ...); nginx кэширует их и отдает без обращения к
+gunicorn. Запросы с авторизацией nginx не кэширует.
+
+При изменении данных (сохранение моделей, завершение импорта) диспетчер
+сбрасывает только затронутые ключи. nginx без коммерческих модулей не умеет
+удалять записи по тегу, поэтому каждый ключ соответствует набору канонических
+URL: фоновый поток после коммита запрашивает их через внутренний порт nginx
+(HTTP_CACHE_PURGE_URL), который всегда обходит кэш и сохраняет свежий ответ.
+Ключ записи в nginx включает Host (в ответах есть абсолютные ссылки пагинации)
+и вариант ответа, поэтому URL обновляется для каждого публичного хоста из
+ALLOWED_HOSTS и каждого варианта (JSON и браузерный API). Остальные URL
+(другие страницы списков, фильтры) истекают сами через HTTP_CACHE_SECONDS.
+"""
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+logger = logging.getLogger(__name__)
+
+SURROGATE_KEY_HEADER = 'Surrogate-Key'
+
+# Варианты ответа в ключе кэша nginx ($api_cache_variant) -> Accept запроса обновления
+REFRESH_ACCEPT = {
+    'json': 'application/json',
+    'html': 'text/html',
+}
+
+# Ключ "тип:id" (или просто "тип") -> канонические URL, которые обновляются при сбросе
+PURGE_URLS = {
+    'catalog': ['/api/parts/', '/api/brands/', '/api/warehouses/'],
+    'seo': ['/api/settings/'],
+    'part': [
+        '/api/parts/{id}/', '/api/parts/{id}/similar/',
+        '/api/pages/part/{id}/', '/api/meta/part/{id}/',
+    ],
+    'brand': ['/api/brands/{id}/', '/api/meta/brand/{id}/'],
+    'warehouse': ['/api/warehouses/{id}/'],
+    'seo-page': ['/api/meta/{id}/', '/api/pages/{id}/', '/api/pages/{id}/meta/'],
+}
+
+
+def public_cache_headers(response, keys):
+    """Помечает ответ как публичный для микрокэша с ключами keys"""
+    patch_cache_control(response, public=True, max_age=settings.HTTP_CACHE_SECONDS)
+    patch_vary_headers(response, ['Accept'])
+    response[SURROGATE_KEY_HEADER] = ' '.join(dict.fromkeys(keys))
+    return response
+
+
+def cache_public(*keys):
+    """Декоратор обычного Django view: успешные ответы — в микрокэш с ключами keys"""
+    def decorator(view):
+        def wrapped(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if settings.HTTP_CACHE_SECONDS > 0 and response.status_code == 200:
+                public_cache_headers(response, keys)
+            return response
+        wrapped.__name__ = view.__name__
+        wrapped.__doc__ = view.__doc__
+        return wrapped
+    return decorator
+
+
+class HttpCacheMixin:
+    """
+    Заголовки микрокэша для GET-ответов ViewSet. Ключи: surrogate_keys и для
+    ответов по объекту — "<surrogate_key_prefix>:<pk или slug из URL>".
+    """
+    surrogate_keys = ['catalog']
+    surrogate_key_prefix = None
+
+    def get_surrogate_keys(self):
+        keys = list(self.surrogate_keys)
+        lookup = self.kwargs.get('pk') or self.kwargs.get('slug')
+        if self.surrogate_key_prefix and lookup:
+            keys.append(f'{self.surrogate_key_prefix}:{lookup}')
+        return keys
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+            return response
+        if settings.HTTP_CACHE_SECONDS <= 0 or request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            public_cache_headers(response, self.get_surrogate_keys())
+        return response
+
+
+def purge_hosts():
+    """Публичные хосты сайта: ALLOWED_HOSTS без шаблонов"""
+    return [host for host in settings.ALLOWED_HOSTS if host and '*' not in host and not host.startswith('.')]
+
+
+def purge_urls(keys):
+    urls = []
+    for key in keys:
+        kind, _, object_id = key.partition(':')
+        for template in PURGE_URLS.get(kind, []):
+            if '{id}' in template and not object_id:
+                continue
+            urls.append(template.format(id=object_id))
+    return list(dict.fromkeys(urls))
+
+
+class PurgeDispatcher:
+    """
+    Сброс микрокэша по ключам после коммита транзакции. Запросы к nginx
+    выполняет фоновый поток; ключи, накопившиеся за время отправки,
+    объединяются.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def purge(self, *keys):
+        """Сбросить ключи после коммита текущей транзакции (в фоне)"""
+        if not settings.HTTP_CACHE_PURGE_URL or getattr(self._local, 'suspended', False):
+            return
+        keys = set(keys)
+        transaction.on_commit(lambda: self._enqueue(keys))
+
+    def purge_now(self, *keys):
+        """Сбросить ключи сразу, в текущем потоке (для management-команд)"""
+        if settings.HTTP_CACHE_PURGE_URL:
+            self._send(purge_urls(keys))
+
+    @contextmanager
+    def suspended(self):
+        """Не сбрасывать ключи при сохранении моделей (массовый импорт)"""
+        self._local.suspended = True
+        try:
+            yield
+        finally:
+            self._local.suspended = False
+
+    def _enqueue(self, keys):
+        self._queue.put(keys)
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='http-cache-purge', daemon=True)
+                self._worker.start()
+
+    def join(self):
+        """Дождаться отправки поставленных в очередь ключей (перед выходом команды)"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            batches = [self._queue.get()]
+            while True:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._send(purge_urls(set().union(*batches)))
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+
+    def _send(self, urls):
+        base_url = settings.HTTP_CACHE_PURGE_URL.rstrip('/')
+        hosts = purge_hosts()
+        for path in urls:
+            for host in hosts:
+                for accept in REFRESH_ACCEPT.values():
+                    request = Request(f'{base_url}{path}', headers={'Host': host, 'Accept': accept})
+                    try:
+                        urlopen(request, timeout=5).close()
+                    except (URLError, OSError) as exc:
+                        logger.warning('HTTP cache refresh %s%s failed: %s', host, path, exc)
+
+
+purge_dispatcher = PurgeDispatcher()
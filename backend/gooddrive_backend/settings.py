@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'catalog',
     'seo',
     'orders',
+    'analytics',
 ]
 
 MIDDLEWARE = [
@@ -74,6 +75,15 @@ DATABASES = {
     }
 }
 
+# Cache: общий для процессов backend (метки версий кэшей в памяти процессов);
+# в продакшене — файловый кэш на общем томе
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -126,8 +136,58 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_THROTTLE_RATES': {
+        # Резерв корзины: запросов на клиента (ScopedRateThrottle)
+        'cart_reserve': config('CART_RESERVE_THROTTLE_RATE', default='30/min'),
+    },
 }
 
+# Журнал событий заказов без PostgreSQL: задержка (сек.) перед выдачей новых событий;
+# должна быть больше самой долгой транзакции, пишущей события
+ORDER_EVENTS_SETTLE_SECONDS = config('ORDER_EVENTS_SETTLE_SECONDS', default=2, cast=int)
+
+# Поток статусов заказов (SSE): интервал keepalive-комментариев (сек.)
+ORDER_STREAM_KEEPALIVE_SECONDS = config('ORDER_STREAM_KEEPALIVE_SECONDS', default=25, cast=int)
+
+# Резерв корзины: срок жизни резерва (мин.)
+CART_RESERVATION_TTL_MINUTES = config('CART_RESERVATION_TTL_MINUTES', default=60, cast=int)
+# Резерв корзины: максимум единиц в одной позиции и всего в активных резервах клиента
+CART_RESERVATION_MAX_LINE_QUANTITY = config('CART_RESERVATION_MAX_LINE_QUANTITY', default=100, cast=int)
+CART_RESERVATION_MAX_TOTAL_QUANTITY = config('CART_RESERVATION_MAX_TOTAL_QUANTITY', default=1000, cast=int)
+
+# Прием заказов через очередь (202 + номер заявки); заказы создает process_order_intake
+ORDER_INTAKE_ASYNC = config('ORDER_INTAKE_ASYNC', default=False, cast=bool)
+
+# Файлы для поисковых роботов (robots.txt, карта сайта); каталог общий с nginx
+SEO_FILES_ROOT = config('SEO_FILES_ROOT', default=str(BASE_DIR / 'seo_files'))
+
+# Internal-location nginx для SEO_FILES_ROOT: если задан, Django отвечает X-Accel-Redirect
+SEO_FILES_ACCEL_PREFIX = config('SEO_FILES_ACCEL_PREFIX', default='')
+
+# Карта сайта: диапазон id запчастей в одном шарде (не больше 50 000)
+SITEMAP_SHARD_SIZE = config('SITEMAP_SHARD_SIZE', default=50000, cast=int)
+
+# Фид YML (Яндекс.Маркет): диапазон id запчастей в одном пересобираемом фрагменте
+YML_FEED_CHUNK_SIZE = config('YML_FEED_CHUNK_SIZE', default=5000, cast=int)
+
+# JSON-LD страницы запчасти: время жизни в кэше (сек.); ключ меняется вместе с updated_at
+PART_JSON_LD_CACHE_SECONDS = config('PART_JSON_LD_CACHE_SECONDS', default=86400, cast=int)
+
+# Страница запчасти /api/pages/part/<id>/: время жизни кэша ответа (сек.)
+PART_PAGE_CACHE_SECONDS = config('PART_PAGE_CACHE_SECONDS', default=300, cast=int)
+
+# Лента изменений каталога без PostgreSQL: задержка (сек.) перед выдачей свежих изменений
+PARTS_CHANGES_SETTLE_SECONDS = config('PARTS_CHANGES_SETTLE_SECONDS', default=5, cast=int)
+
+# Пакетный запрос /api/batch/: максимум подзапросов и потоков при parallel=true
+BATCH_MAX_REQUESTS = config('BATCH_MAX_REQUESTS', default=20, cast=int)
+BATCH_MAX_WORKERS = config('BATCH_MAX_WORKERS', default=4, cast=int)
+
+# HTTP-микрокэш nginx: срок жизни публичных GET-ответов каталога и SEO (0 — не кэшировать)
+HTTP_CACHE_SECONDS = config('HTTP_CACHE_SECONDS', default=10, cast=int)
+# Адрес nginx для обновления сброшенных ключей (пусто — сброс отключен)
+HTTP_CACHE_PURGE_URL = config('HTTP_CACHE_PURGE_URL', default='')
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
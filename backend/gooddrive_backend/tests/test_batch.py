@@ -0,0 +1,91 @@
+import warnings
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from catalog.models import Brand, Warehouse, Part
+from orders.views import OrderViewSet
+
+BATCH_URL = '/api/batch/'
+
+
+def create_part(**kwargs):
+    brand = Brand.objects.create(name='Bosch', country='Германия')
+    warehouse = Warehouse.objects.create(name='Основной', address='Москва')
+    return Part.objects.create(
+        title='Фильтр масляный', brand=brand, warehouse=warehouse,
+        quantity=10, stock=10, available=10, price_opt=100, **kwargs
+    )
+
+
+class BatchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.part = create_part()
+
+    def batch(self, paths, **extra):
+        response = self.client.post(BATCH_URL, {'requests': paths, **extra}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['responses']
+
+    def test_responses_in_request_order(self):
+        responses = self.batch(['/api/brands/', f'/api/parts/{self.part.id}/'])
+        self.assertEqual([item['status'] for item in responses], [200, 200])
+        self.assertEqual(responses[1]['body']['id'], self.part.id)
+
+    def test_nested_batch_rejected(self):
+        responses = self.batch([BATCH_URL, '/api/brands/'])
+        self.assertEqual(responses[0]['status'], 400)
+        self.assertEqual(responses[1]['status'], 200)
+
+    def test_unknown_path_and_missing_object(self):
+        responses = self.batch(['/api/no-such-endpoint/', '/api/parts/999999/'])
+        self.assertEqual([item['status'] for item in responses], [404, 404])
+
+    def test_async_stream_rejected_without_calling_view(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            responses = self.batch(['/api/brands/', '/api/orders/stream/GD0000001/'])
+        self.assertEqual(responses[0]['status'], 200)
+        self.assertEqual(responses[1]['status'], 400)
+
+    def test_export_rejected_before_dispatch(self):
+        user = User.objects.create_user('operator', password='secret')
+        self.client.force_login(user)
+        with mock.patch.object(OrderViewSet, '_export_xlsx') as export_xlsx:
+            responses = self.batch(['/api/orders/export/?format=xlsx', '/api/sitemap.xml'])
+        self.assertEqual([item['status'] for item in responses], [400, 400])
+        export_xlsx.assert_not_called()
+
+    def test_auth_carried_to_subrequests(self):
+        responses = self.batch(['/api/orders/'])
+        self.assertIn(responses[0]['status'], (401, 403))
+
+        user = User.objects.create_user('operator', password='secret')
+        self.client.force_login(user)
+        responses = self.batch(['/api/orders/'])
+        self.assertEqual(responses[0]['status'], 200)
+
+    def test_limits_validated(self):
+        response = self.client.post(BATCH_URL, {'requests': ['/admin/']}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(BATCH_URL, {'requests': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ParallelBatchTests(TransactionTestCase):
+    """Параллельные подзапросы идут в своих соединениях: данные должны быть зафиксированы"""
+
+    def test_parallel_matches_sequential(self):
+        part = create_part()
+        client = APIClient()
+        paths = ['/api/brands/', f'/api/parts/{part.id}/', '/api/parts/999999/', BATCH_URL]
+        sequential = client.post(BATCH_URL, {'requests': paths}, format='json').json()
+        parallel = client.post(BATCH_URL, {'requests': paths, 'parallel': True}, format='json').json()
+        self.assertEqual(
+            [item['status'] for item in parallel['responses']],
+            [item['status'] for item in sequential['responses']],
+        )
+        self.assertEqual([item['status'] for item in parallel['responses']], [200, 200, 404, 400])
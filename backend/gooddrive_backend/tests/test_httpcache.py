@@ -0,0 +1,77 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.test import SimpleTestCase, override_settings
+
+from gooddrive_backend.httpcache import PurgeDispatcher, purge_urls
+
+
+class RefreshRecorder(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.headers['Host'], self.headers['Accept'], self.path))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class PurgeDispatcherTests(SimpleTestCase):
+    # purge() регистрирует on_commit на соединении default
+    databases = {'default'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), RefreshRecorder)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        RefreshRecorder.requests = []
+
+    def test_keys_map_to_urls(self):
+        self.assertEqual(
+            purge_urls(['part:7', 'catalog']),
+            ['/api/parts/7/', '/api/parts/7/similar/', '/api/pages/part/7/',
+             '/api/meta/part/7/', '/api/parts/', '/api/brands/', '/api/warehouses/'],
+        )
+
+    def test_refresh_for_every_public_host_and_variant(self):
+        with override_settings(
+            HTTP_CACHE_PURGE_URL=f'http://127.0.0.1:{self.server.server_port}',
+            ALLOWED_HOSTS=['gooddrive.ru', 'www.gooddrive.ru', '*', '.example.com'],
+        ):
+            PurgeDispatcher().purge_now('warehouse:3')
+        self.assertEqual(sorted(RefreshRecorder.requests), [
+            ('gooddrive.ru', 'application/json', '/api/warehouses/3/'),
+            ('gooddrive.ru', 'text/html', '/api/warehouses/3/'),
+            ('www.gooddrive.ru', 'application/json', '/api/warehouses/3/'),
+            ('www.gooddrive.ru', 'text/html', '/api/warehouses/3/'),
+        ])
+
+    def test_background_purge_sent_before_join_returns(self):
+        with override_settings(
+            HTTP_CACHE_PURGE_URL=f'http://127.0.0.1:{self.server.server_port}',
+            ALLOWED_HOSTS=['gooddrive.ru'],
+        ):
+            dispatcher = PurgeDispatcher()
+            dispatcher.purge('brand:2')
+            dispatcher.purge('brand:2')
+            dispatcher.join()
+        self.assertEqual(
+            {request[2] for request in RefreshRecorder.requests},
+            {'/api/brands/2/', '/api/meta/brand/2/'},
+        )
+
+    def test_disabled_without_purge_url(self):
+        with override_settings(HTTP_CACHE_PURGE_URL=''):
+            PurgeDispatcher().purge_now('catalog')
+        self.assertEqual(RefreshRecorder.requests, [])
@@ -2,16 +2,22 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from seo import views as seo_views
+from .batch import BatchViewSet
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     # path('api/', include('files.urls')),  # Временно отключено - модель не определена
+    path('api/batch/', BatchViewSet.as_view({'post': 'create'}), name='api-batch'),
     path('api/', include('catalog.urls')),
     path('api/', include('seo.urls')),
     path('api/', include('orders.urls')),
-    path('robots.txt', include('seo.urls')),
-    path('sitemap.xml', include('seo.urls')),
-    path('yandex-verification.html', include('seo.urls')),
+    path('api/', include('analytics.urls')),
+    path('robots.txt', seo_views.robots_txt, name='robots-txt-root'),
+    path('sitemap.xml', seo_views.sitemap_xml, name='sitemap-index'),
+    path('sitemaps/<str:filename>', seo_views.sitemap_shard, name='sitemap-shard-root'),
+    path('feeds/yandex-market.yml.gz', seo_views.yml_feed, name='yml-feed-root'),
+    path('yandex-verification.html', seo_views.yandex_verification, name='yandex-verification-root'),
 ]
 
 # Обслуживание медиа-файлов в режиме разработки
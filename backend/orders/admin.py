@@ -1,8 +1,13 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Order, OrderItem, OrderStatusHistory
+from analytics.rollup import record_order_sales
+from .models import (
+    Order, OrderItem, OrderStatusHistory, OrderEvent, ArchivedOrder, CartReservation,
+    OrderIntake, DeliveryCity
+)
 
 
 class OrderItemInline(admin.TabularInline):
@@ -19,19 +24,35 @@ class OrderStatusHistoryInline(admin.TabularInline):
     fields = ['status', 'comment', 'created_at', 'created_by']
 
 
+class OrderAdminForm(forms.ModelForm):
+    """Форма заказа с проверкой допустимых переходов статуса"""
+    
+    class Meta:
+        model = Order
+        fields = '__all__'
+    
+    def clean_status(self):
+        new_status = self.cleaned_data['status']
+        old_status = self.initial.get('status')
+        if self.instance.pk and new_status != old_status:
+            if not Order.can_transition(old_status, new_status):
+                raise forms.ValidationError(
+                    f"Переход из статуса '{old_status}' в '{new_status}' недопустим"
+                )
+        return new_status
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
+    form = OrderAdminForm
     list_display = [
         'order_number', 'customer_name', 'customer_phone', 
         'total_amount', 'status', 'delivery_city', 'created_at'
     ]
     list_filter = [
-        'status', 'delivery_city', 'created_at', 'updated_at'
-    ]
-    search_fields = [
-        'order_number', 'customer_name', 'customer_phone', 
-        'customer_email', 'delivery_address'
+        'status', 'city', 'created_at', 'updated_at'
     ]
+    search_fields = ['search_text']
     readonly_fields = [
         'order_number', 'total_amount', 'created_at', 'updated_at'
     ]
@@ -53,23 +74,66 @@ class OrderAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        return super().get_queryset().select_related().prefetch_related('items__part')
+        return super().get_queryset(request).select_related().prefetch_related('items')
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по поисковой строке заказа (номер, имя, телефон, email)"""
+        terms = [search_term] if Order.is_phone_like(search_term) else search_term.split()
+        for term in terms:
+            queryset = queryset.filter(search_text__contains=Order.normalize_search_term(term))
+        return queryset, False
     
     def save_model(self, request, obj, form, change):
         """Сохранение модели с записью в историю"""
-        old_status = None
-        if change:
-            old_status = Order.objects.get(pk=obj.pk).status
+        if not change:
+            super().save_model(request, obj, form, change)
+            return
+        
+        # Статус меняется отдельно условным UPDATE от статуса, который видел оператор
+        status_changed = 'status' in form.changed_data
+        new_status = obj.status
+        obj.status = form.initial.get('status')
         
-        super().save_model(request, obj, form, change)
+        update_fields = [field for field in form.changed_data if field != 'status']
+        if update_fields:
+            obj.save(update_fields=update_fields + ['updated_at'])
         
-        # Если статус изменился, записываем в историю
-        if change and old_status != obj.status:
-            OrderStatusHistory.objects.create(
-                order=obj,
-                status=obj.status,
-                comment=f"Статус изменен администратором",
-                created_by=request.user
+        if status_changed:
+            changed = obj.transition_status(
+                new_status,
+                comment="Статус изменен администратором",
+                user=request.user
+            )
+            if not changed:
+                self.message_user(
+                    request,
+                    "Статус не изменен: заказ уже изменил другой пользователь. "
+                    "Обновите страницу и повторите.",
+                    level=messages.ERROR
+                )
+    
+    def save_related(self, request, form, formsets, change):
+        """Сохранение позиций с записью события о создании заказа или изменении позиций"""
+        super().save_related(request, form, formsets, change)
+        
+        items_changed = any(
+            formset.model is OrderItem and formset.has_changed()
+            for formset in formsets
+        )
+        if not change:
+            # Событие создания — в той же транзакции, что и заказ с позициями
+            OrderEvent.record(
+                form.instance, OrderEvent.EVENT_CREATED,
+                status=form.instance.status,
+                **OrderEvent.items_payload(form.instance)
+            )
+        if not change and form.instance.status != 'cancelled':
+            # Заказ, созданный в админке, учитываем в сводке продаж
+            record_order_sales([form.instance.pk])
+        if change and items_changed:
+            OrderEvent.record(
+                form.instance, OrderEvent.EVENT_ITEMS_CHANGED,
+                **OrderEvent.items_payload(form.instance)
             )
 
 
@@ -81,10 +145,13 @@ class OrderItemAdmin(admin.ModelAdmin):
     ]
     list_filter = ['order__status', 'order__created_at']
     search_fields = [
-        'order__order_number', 'part__title', 
-        'part__original_number', 'part__manufacturer_number'
+        'order__order_number', 'part_title', 
+        'part_original_number', 'part_manufacturer_number'
+    ]
+    readonly_fields = [
+        'total_price', 'part_title', 'part_brand_name', 'part_original_number',
+        'part_manufacturer_number', 'part_image_url', 'warehouse_name'
     ]
-    readonly_fields = ['total_price']
     
     def get_order_status(self, obj):
         """Получить статус заказа"""
@@ -92,7 +159,7 @@ class OrderItemAdmin(admin.ModelAdmin):
     get_order_status.short_description = 'Статус заказа'
     
     def get_queryset(self, request):
-        return super().get_queryset().select_related('order', 'part')
+        return super().get_queryset(request).select_related('order', 'part')
 
 
 @admin.register(OrderStatusHistory)
@@ -107,12 +174,82 @@ class OrderStatusHistoryAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     
     def get_queryset(self, request):
-        return super().get_queryset().select_related('order', 'created_by')
+        return super().get_queryset(request).select_related('order', 'created_by')
+
 
+@admin.register(OrderEvent)
+class OrderEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'order_number', 'event_type', 'created_at']
+    list_filter = ['event_type', 'created_at']
+    search_fields = ['order_number']
+    readonly_fields = ['order', 'order_number', 'event_type', 'payload', 'created_at']
+    
+    def has_add_permission(self, request):
+        # Журнал событий только для чтения
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = [
+        'order_number', 'customer_name', 'customer_phone',
+        'total_amount', 'status', 'created_at', 'archived_at'
+    ]
+    list_filter = ['status', 'created_at']
+    search_fields = ['order_number', 'customer_phone_normalized']
+    readonly_fields = [
+        'original_id', 'order_number', 'customer_name', 'customer_phone',
+        'customer_phone_normalized', 'total_amount', 'status', 'items_count',
+        'created_at', 'archived_at', 'data'
+    ]
+    
+    def has_add_permission(self, request):
+        # Архив пополняется только командой archive_orders
+        return False
 
 
+@admin.register(CartReservation)
+class CartReservationAdmin(admin.ModelAdmin):
+    list_display = ['token', 'user', 'part', 'quantity', 'expires_at', 'created_at']
+    list_filter = ['expires_at']
+    search_fields = ['token', 'part__title', 'user__username']
+    readonly_fields = ['token', 'user', 'part', 'quantity', 'expires_at', 'created_at']
+    
+    def has_add_permission(self, request):
+        # Резервы создаются только через API корзины
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        # Удаление в обход release_token не вернуло бы запчасти в доступное количество
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('part', 'user')
 
 
+@admin.register(OrderIntake)
+class OrderIntakeAdmin(admin.ModelAdmin):
+    list_display = ['ticket', 'status', 'order', 'created_at', 'processed_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['ticket']
+    readonly_fields = ['ticket', 'status', 'payload', 'order', 'errors', 'created_at', 'processed_at']
+    
+    def has_add_permission(self, request):
+        # Заявки создает только API
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
+@admin.register(DeliveryCity)
+class DeliveryCityAdmin(admin.ModelAdmin):
+    list_display = ['name', 'normalized_name']
+    search_fields = ['normalized_name']
+    readonly_fields = ['normalized_name']
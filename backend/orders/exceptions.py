@@ -0,0 +1,16 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class OrderStatusConflict(APIException):
+    """Статус заказа изменен другим пользователем после чтения"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Статус заказа уже изменен другим пользователем. Обновите данные заказа.'
+    default_code = 'status_conflict'
+
+
+class ReservationLimitExceeded(APIException):
+    """Превышен лимит единиц в активных резервах клиента"""
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'Превышен лимит зарезервированных позиций. Оформите заказ или снимите резерв.'
+    default_code = 'reservation_limit'
@@ -1,5 +1,28 @@
 import django_filters
-from .models import Order
+from rest_framework import filters
+from .models import Order, ArchivedOrder, DeliveryCity
+
+
+class OrderSearchFilter(filters.SearchFilter):
+    """
+    Поиск оператора по заказам: подстрока в Order.search_text
+    (номер, имя, телефон, email). На PostgreSQL LIKE '%...%' по этой колонке
+    обслуживает триграммный индекс.
+    """
+    
+    def get_search_terms(self, request):
+        # Телефон с пробелами («8 912 123-45-67») — один запрос, а не несколько слов
+        query = request.query_params.get(self.search_param, '')
+        if Order.is_phone_like(query):
+            return [query]
+        return super().get_search_terms(request)
+    
+    def filter_queryset(self, request, queryset, view):
+        for term in self.get_search_terms(request):
+            term = Order.normalize_search_term(term)
+            if term:
+                queryset = queryset.filter(search_text__contains=term)
+        return queryset
 
 
 class OrderFilter(django_filters.FilterSet):
@@ -31,10 +54,12 @@ class OrderFilter(django_filters.FilterSet):
         lookup_expr='lte'
     )
     
-    # Фильтрация по городу доставки
+    # Фильтрация по городу доставки (по справочнику, начало названия)
     delivery_city = django_filters.CharFilter(
-        field_name='delivery_city',
-        lookup_expr='icontains'
+        method='filter_delivery_city'
+    )
+    city = django_filters.NumberFilter(
+        field_name='city_id'
     )
     
     # Фильтрация по наличию email
@@ -51,28 +76,44 @@ class OrderFilter(django_filters.FilterSet):
         model = Order
         fields = [
             'status', 'total_amount_min', 'total_amount_max',
-            'created_after', 'created_before', 'delivery_city',
+            'created_after', 'created_before', 'delivery_city', 'city',
             'has_email', 'has_notes'
         ]
     
+    def filter_delivery_city(self, queryset, name, value):
+        """Фильтр по городу: города справочника, название которых начинается с value"""
+        cities = DeliveryCity.objects.filter(
+            normalized_name__startswith=DeliveryCity.normalize_name(value)
+        )
+        return queryset.filter(city__in=cities)
+    
     def filter_has_email(self, queryset, name, value):
-        """Фильтр по наличию email"""
-        if value:
-            return queryset.exclude(customer_email__isnull=True).exclude(customer_email='')
-        else:
-            return queryset.filter(customer_email__isnull=True) | queryset.filter(customer_email='')
+        """Фильтр по наличию email (пустой email хранится как NULL)"""
+        return queryset.filter(customer_email__isnull=not value)
     
     def filter_has_notes(self, queryset, name, value):
         """Фильтр по наличию комментариев"""
         if value:
-            return queryset.exclude(notes__isnull=True).exclude(notes='')
-        else:
-            return queryset.filter(notes__isnull=True) | queryset.filter(notes='')
-
-
-
-
-
-
+            return queryset.exclude(notes='')
+        return queryset.filter(notes='')
 
 
+class ArchivedOrderFilter(django_filters.FilterSet):
+    """Фильтры для архивных заказов"""
+    
+    status = django_filters.ChoiceFilter(
+        choices=Order.STATUS_CHOICES,
+        field_name='status'
+    )
+    created_after = django_filters.DateTimeFilter(
+        field_name='created_at',
+        lookup_expr='gte'
+    )
+    created_before = django_filters.DateTimeFilter(
+        field_name='created_at',
+        lookup_expr='lte'
+    )
+    
+    class Meta:
+        model = ArchivedOrder
+        fields = ['status', 'created_after', 'created_before']
@@ -0,0 +1,51 @@
+"""
+Прием заказов через очередь (для пиковых нагрузок)
+
+В режиме ORDER_INTAKE_ASYNC API только проверяет структуру данных и
+записывает заявку в таблицу OrderIntake, отвечая 202 с номером заявки.
+Команда process_order_intake забирает заявки пачками (SKIP LOCKED, поэтому
+обработчиков может быть несколько) и создает заказы обычным
+OrderCreateSerializer: проверка наличия, цены и резерв корзины — те же,
+что и при синхронном создании.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OrderIntake
+from .serializers import OrderCreateSerializer
+
+logger = logging.getLogger(__name__)
+
+
+@transaction.atomic
+def process_queued(batch_size):
+    """Создает заказы по пачке заявок из очереди; возвращает число обработанных"""
+    intakes = list(
+        OrderIntake.objects.select_for_update(skip_locked=True)
+        .filter(status=OrderIntake.STATUS_QUEUED)
+        .order_by('id')[:batch_size]
+    )
+    now = timezone.now()
+    for intake in intakes:
+        serializer = OrderCreateSerializer(data=intake.payload)
+        try:
+            # Ошибка одной заявки не должна откатывать всю пачку
+            with transaction.atomic():
+                if serializer.is_valid():
+                    intake.order = serializer.save()
+                    intake.status = OrderIntake.STATUS_COMPLETED
+                else:
+                    intake.status = OrderIntake.STATUS_FAILED
+                    intake.errors = serializer.errors
+        except Exception:
+            logger.exception('Order intake %s failed', intake.ticket)
+            intake.status = OrderIntake.STATUS_FAILED
+            intake.errors = {'non_field_errors': ['Не удалось создать заказ']}
+        intake.processed_at = now
+    
+    OrderIntake.objects.bulk_update(
+        intakes, ['status', 'order', 'errors', 'processed_at']
+    )
+    return len(intakes)
@@ -0,0 +1,95 @@
+"""
+Management command для переноса закрытых старых заказов в архив
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from orders.models import Order, ArchivedOrder
+from orders.serializers import OrderSerializer
+
+
+class Command(BaseCommand):
+    help = 'Переносит доставленные и отмененные заказы старше N месяцев в архив'
+
+    CLOSED_STATUSES = ['delivered', 'cancelled']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=12,
+            help='Архивировать заказы старше указанного числа месяцев (по умолчанию: 12)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Количество заказов в одной транзакции (по умолчанию: 500)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать заказы для архивации'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=30 * options['months'])
+        batch_size = options['batch_size']
+
+        candidates = Order.objects.filter(
+            status__in=self.CLOSED_STATUSES,
+            created_at__lt=cutoff
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'Заказов для архивации: {candidates.count()}')
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Архивируем заказы, созданные до {cutoff:%Y-%m-%d}'
+        ))
+
+        archived_total = 0
+        last_id = 0
+        while True:
+            batch_ids = list(
+                candidates.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not batch_ids:
+                break
+            last_id = batch_ids[-1]
+            archived_total += self.archive_batch(batch_ids)
+            self.stdout.write(f'Перенесено в архив: {archived_total}')
+
+        self.stdout.write(self.style.SUCCESS(f'\nАрхивация завершена! Заказов: {archived_total}'))
+
+    @transaction.atomic
+    def archive_batch(self, batch_ids):
+        """Копирует пачку заказов в архив и удаляет их из рабочих таблиц"""
+        orders = list(
+            Order.objects.select_for_update()
+            .filter(id__in=batch_ids, status__in=self.CLOSED_STATUSES)
+            .prefetch_related('items', 'status_history__created_by')
+        )
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(
+                original_id=order.id,
+                order_number=order.order_number,
+                customer_name=order.customer_name,
+                customer_phone=order.customer_phone,
+                customer_phone_normalized=order.customer_phone_normalized,
+                total_amount=order.total_amount,
+                status=order.status,
+                items_count=len(order.items.all()),
+                created_at=order.created_at,
+                data=OrderSerializer(order).data,
+            )
+            for order in orders
+        ])
+        Order.objects.filter(id__in=[order.id for order in orders]).delete()
+        return len(orders)
@@ -0,0 +1,58 @@
+"""
+Management command для заполнения снимка запчасти в существующих позициях заказов
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from catalog.models import Part, PartImage
+from orders.models import OrderItem
+
+
+class Command(BaseCommand):
+    help = 'Заполняет название, бренд, номера, изображение и склад в позициях заказов без снимка'
+
+    SNAPSHOT_FIELDS = [
+        'part_title', 'part_brand_name', 'part_original_number',
+        'part_manufacturer_number', 'part_image_url', 'warehouse_name'
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество позиций в одной транзакции (по умолчанию: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = OrderItem.objects.filter(part_title='')
+
+        updated_total = 0
+        last_id = 0
+        while True:
+            batch = list(
+                pending.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'part_id')[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            updated_total += self.fill_batch(batch)
+            self.stdout.write(f'Обновлено позиций: {updated_total}')
+
+        self.stdout.write(self.style.SUCCESS(f'\nГотово! Обновлено позиций: {updated_total}'))
+
+    @transaction.atomic
+    def fill_batch(self, items):
+        """Заполняет снимок пачки позиций одним запросом к каталогу"""
+        parts = Part.objects.select_related('brand', 'warehouse').annotate(
+            main_image_url=PartImage.main_image_url_subquery()
+        ).in_bulk({item.part_id for item in items})
+
+        for item in items:
+            for field, value in OrderItem.part_snapshot(parts[item.part_id]).items():
+                setattr(item, field, value)
+        OrderItem.objects.bulk_update(items, self.SNAPSHOT_FIELDS)
+        return len(items)
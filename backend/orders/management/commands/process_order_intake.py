@@ -0,0 +1,45 @@
+"""
+Management command для создания заказов по заявкам из очереди
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from orders.intake import process_queued
+
+
+class Command(BaseCommand):
+    help = 'Создает заказы по заявкам, принятым в режиме очереди (ORDER_INTAKE_ASYNC)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Количество заявок в одной транзакции (по умолчанию: 50)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Работать постоянно, проверяя очередь раз в N секунд (0 — один проход)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+
+        while True:
+            processed_total = 0
+            while True:
+                processed = process_queued(batch_size)
+                processed_total += processed
+                if processed < batch_size:
+                    break
+
+            if processed_total or not interval:
+                self.stdout.write(f'Обработано заявок: {processed_total}')
+
+            if not interval:
+                break
+            time.sleep(interval)
@@ -0,0 +1,48 @@
+"""
+Management command для снятия просроченных резервов корзин
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from gooddrive_backend.httpcache import purge_dispatcher
+from orders.reservations import release_expired
+
+
+class Command(BaseCommand):
+    help = 'Снимает просроченные резервы корзин и возвращает запчасти в доступное количество'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество резервов в одной транзакции (по умолчанию: 1000)'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Работать постоянно, проверяя резервы раз в N секунд (0 — один проход)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        interval = options['interval']
+
+        while True:
+            released_total = 0
+            while True:
+                released = release_expired(batch_size)
+                released_total += released
+                if released < batch_size:
+                    break
+
+            if released_total or not interval:
+                self.stdout.write(f'Снято просроченных резервов: {released_total}')
+
+            if not interval:
+                # Сброс микрокэша идет в фоновом потоке: дожидаемся его до выхода
+                purge_dispatcher.join()
+                break
+            time.sleep(interval)
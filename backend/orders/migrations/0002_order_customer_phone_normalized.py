@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:47
+
+from django.db import migrations, models
+
+
+def normalize_phone(phone):
+    digits = ''.join(filter(str.isdigit, phone or ''))
+    if not digits:
+        return ''
+    if len(digits) == 11 and digits.startswith('8'):
+        digits = '7' + digits[1:]
+    elif len(digits) == 10:
+        digits = '7' + digits
+    return f"+{digits[:15]}"
+
+
+def backfill_customer_phone_normalized(apps, schema_editor):
+    """Заполняет нормализованный телефон для существующих заказов"""
+    Order = apps.get_model('orders', 'Order')
+    batch = []
+    for order in Order.objects.only('id', 'customer_phone').iterator(chunk_size=2000):
+        order.customer_phone_normalized = normalize_phone(order.customer_phone)
+        batch.append(order)
+        if len(batch) >= 2000:
+            Order.objects.bulk_update(batch, ['customer_phone_normalized'])
+            batch = []
+    if batch:
+        Order.objects.bulk_update(batch, ['customer_phone_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='order',
+            name='orders_orde_custome_59f5e1_idx',
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer_phone_normalized',
+            field=models.CharField(blank=True, editable=False, help_text='Нормализованный номер телефона для поиска заказов клиента', max_length=16, verbose_name='Телефон (E.164)'),
+        ),
+        migrations.RunPython(backfill_customer_phone_normalized, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer_phone_normalized', '-created_at'], name='orders_orde_custome_7f6faf_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:49
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_customer_phone_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_number', models.CharField(max_length=20, verbose_name='Номер заказа')),
+                ('event_type', models.CharField(choices=[('created', 'Заказ создан'), ('status_changed', 'Статус изменен'), ('items_changed', 'Позиции изменены')], max_length=20, verbose_name='Тип события')),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Данные события')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата события')),
+                ('order', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='orders.order', verbose_name='Заказ')),
+            ],
+            options={
+                'verbose_name': 'Событие заказа',
+                'verbose_name_plural': 'События заказов',
+                'ordering': ['id'],
+            },
+        ),
+    ]
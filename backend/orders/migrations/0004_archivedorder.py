@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:52
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_orderevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True, verbose_name='ID заказа')),
+                ('order_number', models.CharField(max_length=20, unique=True, verbose_name='Номер заказа')),
+                ('customer_name', models.CharField(max_length=100, verbose_name='Имя клиента')),
+                ('customer_phone', models.CharField(max_length=20, verbose_name='Телефон')),
+                ('customer_phone_normalized', models.CharField(blank=True, max_length=16, verbose_name='Телефон (E.164)')),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Общая сумма')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает обработки'), ('processing', 'В обработке'), ('shipped', 'Отправлен'), ('delivered', 'Доставлен'), ('cancelled', 'Отменен')], max_length=20, verbose_name='Статус заказа')),
+                ('items_count', models.PositiveIntegerField(default=0, verbose_name='Количество позиций')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Данные заказа')),
+            ],
+            options={
+                'verbose_name': 'Архивный заказ',
+                'verbose_name_plural': 'Архивные заказы',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['customer_phone_normalized', '-created_at'], name='orders_arch_custome_4c90a4_idx'), models.Index(fields=['created_at'], name='orders_arch_created_91566f_idx')],
+            },
+        ),
+    ]
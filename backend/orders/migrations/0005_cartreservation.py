@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+        ('orders', '0004_archivedorder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CartReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(verbose_name='Токен резерва')),
+                ('quantity', models.PositiveIntegerField(verbose_name='Количество')),
+                ('expires_at', models.DateTimeField(verbose_name='Действует до')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('part', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cart_reservations', to='catalog.part', verbose_name='Автозапчасть')),
+            ],
+            options={
+                'verbose_name': 'Резерв корзины',
+                'verbose_name_plural': 'Резервы корзин',
+                'ordering': ['expires_at'],
+                'indexes': [models.Index(fields=['expires_at'], name='orders_cart_expires_7efaef_idx'), models.Index(fields=['token'], name='orders_cart_token_c7080a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_cartreservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='part_brand_name',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Бренд'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='part_image_url',
+            field=models.CharField(blank=True, max_length=500, verbose_name='URL изображения'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='part_manufacturer_number',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Номер производителя'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='part_original_number',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Оригинальный номер'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='part_title',
+            field=models.CharField(blank=True, max_length=200, verbose_name='Название'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='warehouse_name',
+            field=models.CharField(blank=True, max_length=200, verbose_name='Склад'),
+        ),
+    ]
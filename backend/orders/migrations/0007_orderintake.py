@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:00
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_orderitem_part_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderIntake',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Номер заявки')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('completed', 'Заказ создан'), ('failed', 'Отклонена')], default='queued', max_length=20, verbose_name='Статус')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Данные заказа')),
+                ('errors', models.JSONField(blank=True, null=True, verbose_name='Ошибки')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата обработки')),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='orders.order', verbose_name='Заказ')),
+            ],
+            options={
+                'verbose_name': 'Заявка на заказ',
+                'verbose_name_plural': 'Заявки на заказ',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'id'], name='orders_orde_status_a4992b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:02
+
+from django.db import migrations
+
+
+def create_order_number_sequence(apps, schema_editor):
+    """Последовательность номеров заказов; шаг равен orders.numbering.BLOCK_SIZE"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE SEQUENCE IF NOT EXISTS orders_order_number_seq START 1 INCREMENT BY 20'
+    )
+
+
+def drop_order_number_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP SEQUENCE IF EXISTS orders_order_number_seq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_orderintake'),
+    ]
+
+    operations = [
+        # order_number уже проиндексирован ограничением unique
+        migrations.RemoveIndex(
+            model_name='order',
+            name='orders_orde_order_n_f3ada5_idx',
+        ),
+        migrations.RunPython(create_order_number_sequence, drop_order_number_sequence),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:03
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def clean_city_name(name):
+    name = ' '.join((name or '').split()).strip(' .,')
+    return re.sub(r'^(г\.|г |город )\s*', '', name, flags=re.IGNORECASE)
+
+
+def normalize_city_name(name):
+    return clean_city_name(name).lower().replace('ё', 'е')
+
+
+def build_search_text(order):
+    return ' '.join(filter(None, [
+        order.order_number.lower(),
+        ' '.join(order.customer_name.split()).lower().replace('ё', 'е'),
+        order.customer_phone_normalized.lstrip('+'),
+        (order.customer_email or '').lower(),
+    ]))
+
+
+def backfill_order_search(apps, schema_editor):
+    """Заполняет справочник городов, город заказа и поисковую строку"""
+    Order = apps.get_model('orders', 'Order')
+    DeliveryCity = apps.get_model('orders', 'DeliveryCity')
+    
+    city_ids = {}
+    batch = []
+    fields = ['search_text', 'customer_email', 'city']
+    orders = Order.objects.only(
+        'id', 'order_number', 'customer_name', 'customer_phone_normalized',
+        'customer_email', 'delivery_city'
+    )
+    for order in orders.iterator(chunk_size=2000):
+        normalized = normalize_city_name(order.delivery_city)
+        if normalized not in city_ids:
+            city, _ = DeliveryCity.objects.get_or_create(
+                normalized_name=normalized,
+                defaults={'name': clean_city_name(order.delivery_city)}
+            )
+            city_ids[normalized] = city.id
+        order.city_id = city_ids[normalized]
+        order.customer_email = order.customer_email or None
+        order.search_text = build_search_text(order)
+        batch.append(order)
+        if len(batch) >= 2000:
+            Order.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Order.objects.bulk_update(batch, fields)
+
+
+def create_search_index(apps, schema_editor):
+    """Триграммный индекс для поиска подстроки (только PostgreSQL)"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS orders_order_search_text_trgm '
+        'ON orders_order USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS orders_order_search_text_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_number_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryCity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('normalized_name', models.CharField(max_length=100, unique=True, verbose_name='Нормализованное название')),
+            ],
+            options={
+                'verbose_name': 'Город доставки',
+                'verbose_name_plural': 'Города доставки',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False, verbose_name='Поисковая строка'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='city',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='orders', to='orders.deliverycity', verbose_name='Город (справочник)'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['city', '-created_at'], name='orders_orde_city_id_97398f_idx'),
+        ),
+        migrations.RunPython(backfill_order_search, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
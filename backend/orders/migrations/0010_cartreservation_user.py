@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('orders', '0009_order_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cartreservation',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cart_reservations', to=settings.AUTH_USER_MODEL, verbose_name='Клиент'),
+        ),
+    ]
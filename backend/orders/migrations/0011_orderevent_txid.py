@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:44
+
+from django.db import migrations, models
+
+
+def create_txid_trigger(apps, schema_editor):
+    """Триггер записывает в событие номер транзакции, в которой оно создано"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        '''
+        CREATE OR REPLACE FUNCTION orders_orderevent_set_txid() RETURNS trigger AS $$
+        BEGIN
+            NEW.txid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        '''
+    )
+    schema_editor.execute(
+        'CREATE TRIGGER orders_orderevent_txid BEFORE INSERT ON orders_orderevent '
+        'FOR EACH ROW EXECUTE FUNCTION orders_orderevent_set_txid()'
+    )
+
+
+def drop_txid_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP TRIGGER IF EXISTS orders_orderevent_txid ON orders_orderevent')
+    schema_editor.execute('DROP FUNCTION IF EXISTS orders_orderevent_set_txid()')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0010_cartreservation_user'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='orderevent',
+            options={'ordering': ['txid', 'id'], 'verbose_name': 'Событие заказа', 'verbose_name_plural': 'События заказов'},
+        ),
+        migrations.AddField(
+            model_name='orderevent',
+            name='txid',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Транзакция'),
+        ),
+        migrations.AddIndex(
+            model_name='orderevent',
+            index=models.Index(fields=['txid', 'id'], name='orders_orde_txid_038c45_idx'),
+        ),
+        # Уже записанные события остаются с txid = 0 и идут первыми в порядке id
+        migrations.RunPython(create_txid_trigger, drop_txid_trigger),
+    ]
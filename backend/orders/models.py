@@ -1,8 +1,54 @@
-from django.db import models
+from django.db import connection, models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import RegexValidator
 from django.utils import timezone
+import re
 import uuid
 
+from .numbering import allocator
+
+
+class DeliveryCity(models.Model):
+    """Справочник городов доставки (одно написание города — одна запись)"""
+    
+    name = models.CharField(
+        max_length=100,
+        verbose_name="Название"
+    )
+    normalized_name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Нормализованное название"
+    )
+    
+    class Meta:
+        verbose_name = "Город доставки"
+        verbose_name_plural = "Города доставки"
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    @staticmethod
+    def clean_name(name):
+        """Название без префикса «г.»/«город» и лишних пробелов"""
+        name = ' '.join((name or '').split()).strip(' .,')
+        return re.sub(r'^(г\.|г |город )\s*', '', name, flags=re.IGNORECASE)
+    
+    @classmethod
+    def normalize_name(cls, name):
+        """Ключ справочника: «г. Москва», «москва » и «МОСКВА» дают одно значение"""
+        return cls.clean_name(name).lower().replace('ё', 'е')
+    
+    @classmethod
+    def for_name(cls, name):
+        """Город справочника для написания из заказа (создается при первом упоминании)"""
+        city, _ = cls.objects.get_or_create(
+            normalized_name=cls.normalize_name(name),
+            defaults={'name': cls.clean_name(name)}
+        )
+        return city
+
 
 class Order(models.Model):
     """Модель заказа"""
@@ -15,6 +61,15 @@ class Order(models.Model):
         ('cancelled', 'Отменен'),
     ]
     
+    # Допустимые переходы между статусами
+    STATUS_TRANSITIONS = {
+        'pending': ['processing', 'cancelled'],
+        'processing': ['shipped', 'cancelled'],
+        'shipped': ['delivered'],
+        'delivered': [],
+        'cancelled': [],
+    }
+    
     # Уникальный номер заказа
     order_number = models.CharField(
         max_length=20,
@@ -36,6 +91,13 @@ class Order(models.Model):
         )],
         verbose_name="Телефон"
     )
+    customer_phone_normalized = models.CharField(
+        max_length=16,
+        blank=True,
+        editable=False,
+        verbose_name="Телефон (E.164)",
+        help_text="Нормализованный номер телефона для поиска заказов клиента"
+    )
     customer_email = models.EmailField(
         blank=True,
         null=True,
@@ -50,6 +112,16 @@ class Order(models.Model):
         max_length=100,
         verbose_name="Город"
     )
+    city = models.ForeignKey(
+        DeliveryCity,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=False,
+        related_name='orders',
+        verbose_name="Город (справочник)"
+    )
     delivery_postal_code = models.CharField(
         max_length=10,
         blank=True,
@@ -75,6 +147,14 @@ class Order(models.Model):
         verbose_name="Комментарии к заказу"
     )
     
+    # Поисковая строка оператора (номер, имя, телефон, email); на PostgreSQL
+    # проиндексирована pg_trgm, поэтому поиск подстроки идет по индексу
+    search_text = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Поисковая строка"
+    )
+    
     # Временные метки
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -85,13 +165,16 @@ class Order(models.Model):
         verbose_name="Дата обновления"
     )
     
+    # Поля, из которых строится search_text
+    SEARCH_FIELDS = ['order_number', 'customer_name', 'customer_phone', 'customer_email']
+    
     class Meta:
         verbose_name = "Заказ"
         verbose_name_plural = "Заказы"
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['order_number']),
-            models.Index(fields=['customer_phone']),
+            models.Index(fields=['customer_phone_normalized', '-created_at']),
+            models.Index(fields=['city', '-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
         ]
@@ -103,14 +186,123 @@ class Order(models.Model):
         if not self.order_number:
             # Генерируем уникальный номер заказа
             self.order_number = self.generate_order_number()
+        self.customer_phone_normalized = self.normalize_phone(self.customer_phone)
+        # Пустой email храним как NULL, чтобы фильтр has_email был одним условием
+        self.customer_email = self.customer_email or None
+        self.search_text = self.build_search_text()
+        
+        update_fields = kwargs.get('update_fields')
+        city_changed = (
+            self.city_id is None
+            or self.delivery_city != getattr(self, '_loaded_delivery_city', None)
+        )
+        if city_changed and (update_fields is None or 'delivery_city' in update_fields):
+            self.city = DeliveryCity.for_name(self.delivery_city)
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'customer_phone' in update_fields:
+                update_fields.add('customer_phone_normalized')
+            if update_fields & set(self.SEARCH_FIELDS):
+                update_fields.add('search_text')
+            if 'delivery_city' in update_fields:
+                update_fields.add('city')
+            kwargs['update_fields'] = update_fields
         super().save(*args, **kwargs)
+        if update_fields is None or 'delivery_city' in update_fields:
+            self._loaded_delivery_city = self.delivery_city
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Город из БД: справочник городов ищется заново, только если город изменился
+        instance._loaded_delivery_city = instance.__dict__.get('delivery_city')
+        return instance
+    
+    def build_search_text(self):
+        """Строка для поиска оператора: номер, имя, телефон цифрами, email"""
+        return ' '.join(filter(None, [
+            self.order_number.lower(),
+            self.normalize_search_term(self.customer_name),
+            self.customer_phone_normalized.lstrip('+'),
+            (self.customer_email or '').lower(),
+        ]))
+    
+    @staticmethod
+    def is_phone_like(term):
+        """Запрос из цифр и символов форматирования телефона"""
+        return bool(re.fullmatch(r'[\d\s()+-]*\d[\d\s()+-]*', term))
+    
+    @classmethod
+    def normalize_search_term(cls, term):
+        """Приводит запрос оператора к виду search_text"""
+        term = ' '.join(term.split()).lower().replace('ё', 'е')
+        if cls.is_phone_like(term):
+            # Телефон: ищем по цифрам, полный номер — в формате E.164
+            digits = ''.join(filter(str.isdigit, term))
+            if len(digits) in (10, 11):
+                return cls.normalize_phone(digits).lstrip('+')
+            return digits
+        return term
+    
+    def transition_status(self, new_status, comment='', user=None):
+        """
+        Переводит заказ в new_status условным UPDATE ... WHERE id=? AND status=?
+        (compare-and-set от текущего self.status) и записывает историю и событие.
+        Возвращает False, если статус уже изменил кто-то другой.
+        Вызывать внутри транзакции.
+        """
+        from analytics.rollup import record_order_sales, SIGN_CANCELLED
+        from .realtime import publish_status_change
+        
+        old_status = self.status
+        now = timezone.now()
+        updated = Order.objects.filter(pk=self.pk, status=old_status).update(
+            status=new_status,
+            updated_at=now
+        )
+        if not updated:
+            return False
+        
+        self.status = new_status
+        self.updated_at = now
+        OrderStatusHistory.objects.create(
+            order=self,
+            status=new_status,
+            comment=comment,
+            created_by=user
+        )
+        OrderEvent.record(
+            self, OrderEvent.EVENT_STATUS_CHANGED,
+            old_status=old_status,
+            new_status=new_status
+        )
+        if new_status == 'cancelled':
+            record_order_sales([self.pk], SIGN_CANCELLED)
+        publish_status_change(self, old_status, new_status)
+        return True
+    
+    @classmethod
+    def can_transition(cls, old_status, new_status):
+        """Проверяет, допустим ли переход между статусами"""
+        return new_status in cls.STATUS_TRANSITIONS.get(old_status, [])
+    
+    @staticmethod
+    def normalize_phone(phone):
+        """Приводит номер телефона к формату E.164 (+79121234567)"""
+        digits = ''.join(filter(str.isdigit, phone or ''))
+        if not digits:
+            return ''
+        # Российские номера: 8XXXXXXXXXX и XXXXXXXXXX приводим к 7XXXXXXXXXX
+        if len(digits) == 11 and digits.startswith('8'):
+            digits = '7' + digits[1:]
+        elif len(digits) == 10:
+            digits = '7' + digits
+        return f"+{digits[:15]}"
     
     @staticmethod
     def generate_order_number():
-        """Генерирует уникальный номер заказа"""
-        timestamp = timezone.now().strftime('%Y%m%d%H%M%S')
-        unique_id = str(uuid.uuid4())[:8].upper()
-        return f"GD{timestamp}{unique_id}"
+        """Генерирует уникальный номер заказа (см. orders.numbering)"""
+        return allocator.next_number()
 
 
 class OrderItem(models.Model):
@@ -141,18 +333,73 @@ class OrderItem(models.Model):
         verbose_name="Общая цена"
     )
     
+    # Снимок запчасти на момент заказа (не зависит от изменений каталога)
+    part_title = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Название"
+    )
+    part_brand_name = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name="Бренд"
+    )
+    part_original_number = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Оригинальный номер"
+    )
+    part_manufacturer_number = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="Номер производителя"
+    )
+    part_image_url = models.CharField(
+        max_length=500,
+        blank=True,
+        verbose_name="URL изображения"
+    )
+    warehouse_name = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Склад"
+    )
+    
     class Meta:
         verbose_name = "Позиция заказа"
         verbose_name_plural = "Позиции заказа"
         ordering = ['id']
     
     def __str__(self):
-        return f"{self.part.title} x{self.quantity}"
+        return f"{self.part_title} x{self.quantity}"
     
     def save(self, *args, **kwargs):
         # Автоматически вычисляем общую цену
         self.total_price = self.quantity * self.unit_price
+        # Снимок запчасти, если он не был заполнен при создании заказа
+        if not self.part_title and self.part_id:
+            from catalog.models import Part, PartImage
+            part = Part.objects.select_related('brand', 'warehouse').annotate(
+                main_image_url=PartImage.main_image_url_subquery()
+            ).get(pk=self.part_id)
+            for field, value in self.part_snapshot(part).items():
+                setattr(self, field, value)
         super().save(*args, **kwargs)
+    
+    @staticmethod
+    def part_snapshot(part):
+        """
+        Поля снимка запчасти. Ожидает part с загруженными brand и warehouse
+        и аннотацией main_image_url (PartImage.main_image_url_subquery()).
+        """
+        return {
+            'part_title': part.title,
+            'part_brand_name': part.brand.name,
+            'part_original_number': part.original_number,
+            'part_manufacturer_number': part.manufacturer_number,
+            'part_image_url': getattr(part, 'main_image_url', None) or '',
+            'warehouse_name': part.warehouse.name,
+        }
 
 
 class OrderStatusHistory(models.Model):
@@ -194,9 +441,279 @@ class OrderStatusHistory(models.Model):
         return f"{self.order.order_number} - {self.get_status_display()}"
 
 
+class OrderEvent(models.Model):
+    """Журнал событий заказов (только добавление) для внешних потребителей"""
+    
+    EVENT_CREATED = 'created'
+    EVENT_STATUS_CHANGED = 'status_changed'
+    EVENT_ITEMS_CHANGED = 'items_changed'
+    
+    EVENT_CHOICES = [
+        (EVENT_CREATED, 'Заказ создан'),
+        (EVENT_STATUS_CHANGED, 'Статус изменен'),
+        (EVENT_ITEMS_CHANGED, 'Позиции изменены'),
+    ]
+    
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='events',
+        verbose_name="Заказ"
+    )
+    order_number = models.CharField(
+        max_length=20,
+        verbose_name="Номер заказа"
+    )
+    event_type = models.CharField(
+        max_length=20,
+        choices=EVENT_CHOICES,
+        verbose_name="Тип события"
+    )
+    payload = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        verbose_name="Данные события"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата события"
+    )
+    # Номер транзакции PostgreSQL, записавшей событие (заполняет триггер);
+    # в других СУБД — 0
+    txid = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Транзакция"
+    )
+    
+    class Meta:
+        verbose_name = "Событие заказа"
+        verbose_name_plural = "События заказов"
+        ordering = ['txid', 'id']
+        indexes = [
+            models.Index(fields=['txid', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.order_number} - {self.get_event_type_display()}"
+    
+    @classmethod
+    def build(cls, order, event_type, **payload):
+        """Создает (без сохранения) событие для заказа"""
+        return cls(
+            order_id=order.pk,
+            order_number=order.order_number,
+            event_type=event_type,
+            payload=payload
+        )
+    
+    @classmethod
+    def record(cls, order, event_type, **payload):
+        """Записывает событие; вызывать в той же транзакции, что и изменение"""
+        event = cls.build(order, event_type, **payload)
+        event.save()
+        return event
+    
+    @classmethod
+    def committed_horizon(cls):
+        """
+        Наименьший номер транзакции, которая может быть еще не зафиксирована
+        (только PostgreSQL). События с меньшим txid уже не появятся задним числом.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+            return cursor.fetchone()[0]
+    
+    @classmethod
+    def items_payload(cls, order):
+        """Снимок позиций заказа для данных события"""
+        return {
+            'total_amount': order.total_amount,
+            'items': [
+                {
+                    'part_id': item.part_id,
+                    'quantity': item.quantity,
+                    'unit_price': item.unit_price,
+                }
+                for item in order.items.all()
+            ],
+        }
 
 
+class ArchivedOrder(models.Model):
+    """Архивный заказ: закрытые старые заказы, вынесенные из рабочих таблиц"""
+    
+    original_id = models.BigIntegerField(
+        unique=True,
+        verbose_name="ID заказа"
+    )
+    order_number = models.CharField(
+        max_length=20,
+        unique=True,
+        verbose_name="Номер заказа"
+    )
+    customer_name = models.CharField(
+        max_length=100,
+        verbose_name="Имя клиента"
+    )
+    customer_phone = models.CharField(
+        max_length=20,
+        verbose_name="Телефон"
+    )
+    customer_phone_normalized = models.CharField(
+        max_length=16,
+        blank=True,
+        verbose_name="Телефон (E.164)"
+    )
+    total_amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name="Общая сумма"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Order.STATUS_CHOICES,
+        verbose_name="Статус заказа"
+    )
+    items_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество позиций"
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Дата создания"
+    )
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата архивации"
+    )
+    
+    # Полный снимок заказа с позициями и историей статусов (как в OrderSerializer)
+    data = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        verbose_name="Данные заказа"
+    )
+    
+    class Meta:
+        verbose_name = "Архивный заказ"
+        verbose_name_plural = "Архивные заказы"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer_phone_normalized', '-created_at']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Архивный заказ #{self.order_number} - {self.customer_name}"
 
 
+class CartReservation(models.Model):
+    """Временный резерв запчасти под корзину (снимается по истечении срока)"""
+    
+    token = models.UUIDField(
+        verbose_name="Токен резерва"
+    )
+    # SET_NULL: при удалении клиента резерв не удаляется, а снимается по сроку вместе с остатком
+    user = models.ForeignKey(
+        'auth.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='cart_reservations',
+        verbose_name="Клиент"
+    )
+    part = models.ForeignKey(
+        'catalog.Part',
+        on_delete=models.CASCADE,
+        related_name='cart_reservations',
+        verbose_name="Автозапчасть"
+    )
+    quantity = models.PositiveIntegerField(
+        verbose_name="Количество"
+    )
+    expires_at = models.DateTimeField(
+        verbose_name="Действует до"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+    
+    class Meta:
+        verbose_name = "Резерв корзины"
+        verbose_name_plural = "Резервы корзин"
+        ordering = ['expires_at']
+        indexes = [
+            models.Index(fields=['expires_at']),
+            models.Index(fields=['token']),
+        ]
+    
+    def __str__(self):
+        return f"{self.token} - {self.part_id} x{self.quantity}"
 
 
+class OrderIntake(models.Model):
+    """
+    Заявка на создание заказа в очереди (режим приема заказов через очередь).
+    Заявку принимает API, заказ по ней создает команда process_order_intake.
+    """
+    
+    STATUS_QUEUED = 'queued'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'В очереди'),
+        (STATUS_COMPLETED, 'Заказ создан'),
+        (STATUS_FAILED, 'Отклонена'),
+    ]
+    
+    ticket = models.UUIDField(
+        unique=True,
+        default=uuid.uuid4,
+        editable=False,
+        verbose_name="Номер заявки"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name="Статус"
+    )
+    payload = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        verbose_name="Данные заказа"
+    )
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="Заказ"
+    )
+    errors = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name="Ошибки"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Дата обработки"
+    )
+    
+    class Meta:
+        verbose_name = "Заявка на заказ"
+        verbose_name_plural = "Заявки на заказ"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.ticket} - {self.get_status_display()}"
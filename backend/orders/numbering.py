@@ -0,0 +1,69 @@
+"""
+Номера заказов: префикс и порядковый номер (GD0001234)
+
+На PostgreSQL номера выдает последовательность orders_order_number_seq с
+шагом BLOCK_SIZE: один nextval закрепляет за процессом блок номеров, которые
+затем выдаются без обращения к БД. nextval не откатывается вместе с
+транзакцией, поэтому номер не может достаться двум заказам. Между процессами
+номера идут не строго по порядку, а остаток блока при перезапуске процесса
+пропускается. На других СУБД (разработка) берется следующий номер после
+последнего выданного.
+"""
+import threading
+
+from django.db import connection
+from django.db.models import Max
+from django.db.models.functions import Length
+
+PREFIX = 'GD'
+DIGITS = 7
+BLOCK_SIZE = 20
+SEQUENCE = 'orders_order_number_seq'
+
+
+def format_order_number(value):
+    return f"{PREFIX}{value:0{DIGITS}d}"
+
+
+class OrderNumberAllocator:
+    """Выдача номеров заказов блоками из последовательности БД (на процесс)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = 0
+        self._limit = 0
+
+    def next_number(self):
+        if connection.vendor != 'postgresql':
+            return format_order_number(self._last_issued() + 1)
+        with self._lock:
+            if self._next >= self._limit:
+                self._next = self._allocate_block()
+                self._limit = self._next + BLOCK_SIZE
+            value = self._next
+            self._next += 1
+        return format_order_number(value)
+
+    def _allocate_block(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT nextval(%s)', [SEQUENCE])
+            return cursor.fetchone()[0]
+
+    def _last_issued(self):
+        from .models import Order, ArchivedOrder
+
+        last = 0
+        for model in (Order, ArchivedOrder):
+            # Номера старого формата (с датой) длиннее и не учитываются
+            number = model.objects.annotate(
+                number_length=Length('order_number')
+            ).filter(
+                order_number__startswith=PREFIX,
+                number_length=len(PREFIX) + DIGITS
+            ).aggregate(last=Max('order_number'))['last']
+            if number:
+                last = max(last, int(number[len(PREFIX):]))
+        return last
+
+
+allocator = OrderNumberAllocator()
@@ -0,0 +1,63 @@
+"""
+Расчет цен и доступности позиций корзины/заказа
+
+Используется и при расчете корзины (/api/cart/quote/), и при создании
+заказа, чтобы цена и проверка остатков считались одинаково.
+"""
+from decimal import Decimal
+
+from catalog.models import Part, PartImage
+
+
+def quote_items(items):
+    """
+    Рассчитывает позиции по списку словарей {'part_id', 'quantity'}
+    одним запросом к каталогу.
+    """
+    part_ids = {item['part_id'] for item in items}
+    parts = Part.objects.select_related('brand', 'warehouse').annotate(
+        main_image_url=PartImage.main_image_url_subquery()
+    ).in_bulk(part_ids)
+    
+    lines = []
+    total_amount = Decimal('0.00')
+    for item in items:
+        part = parts.get(item['part_id'])
+        quantity = item['quantity']
+        
+        if part is None:
+            lines.append({
+                'part_id': item['part_id'],
+                'found': False,
+                'title': '',
+                'brand_name': '',
+                'quantity': quantity,
+                'unit_price': None,
+                'total_price': None,
+                'available': 0,
+                'shortfall': quantity,
+                'part': None,
+            })
+            continue
+        
+        unit_price = part.price_opt
+        total_price = unit_price * quantity
+        total_amount += total_price
+        lines.append({
+            'part_id': part.id,
+            'found': True,
+            'title': part.title,
+            'brand_name': part.brand.name,
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'total_price': total_price,
+            'available': part.available,
+            'shortfall': max(0, quantity - part.available),
+            'part': part,
+        })
+    
+    return {
+        'lines': lines,
+        'total_amount': total_amount,
+        'is_available': all(line['shortfall'] == 0 for line in lines),
+    }
@@ -0,0 +1,148 @@
+"""
+Рассылка изменений статусов заказов подписчикам (server-sent events)
+
+Публикация выполняется из обычных синхронных представлений. На PostgreSQL
+изменения передаются через NOTIFY в той же транзакции, что и само изменение,
+поэтому доходят до ASGI-процессов только после фиксации. Каждый ASGI-процесс
+держит одно LISTEN-соединение и раздает уведомления своим подписчикам через
+asyncio-очереди. На других СУБД (разработка) рассылка идет внутри процесса.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection, transaction
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'order_status'
+STREAM_TOKEN_SALT = 'orders.stream'
+
+
+def stream_token(order_number):
+    """
+    Токен подписки на поток статусов заказа: подпись номера заказа ключом
+    SECRET_KEY. Номера последовательные, поэтому без токена поток не отдается.
+    """
+    return signing.Signer(salt=STREAM_TOKEN_SALT).signature(order_number)
+
+
+def check_stream_token(order_number, token):
+    return bool(token) and constant_time_compare(stream_token(order_number), token)
+
+
+class OrderStatusBroker:
+    """Внутрипроцессная pub/sub шина изменений статусов заказов"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._listener = None
+
+    @asynccontextmanager
+    async def subscribe(self, order_id):
+        """Подписка на изменения статуса одного заказа"""
+        self._ensure_listener()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        subscriber = (loop, queue)
+        with self._lock:
+            self._subscribers.setdefault(order_id, set()).add(subscriber)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(order_id)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[order_id]
+
+    def dispatch(self, payload):
+        """Передает событие подписчикам заказа (потокобезопасно)"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(payload['order_id'], ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+    def _ensure_listener(self):
+        """Запускает поток LISTEN при первой подписке (только PostgreSQL)"""
+        if connection.vendor != 'postgresql' or self._listener is not None:
+            return
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name='order-status-listener', daemon=True
+                )
+                self._listener.start()
+
+    def _listen(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        db = settings.DATABASES['default']
+        while True:
+            try:
+                conn = psycopg2.connect(
+                    dbname=db['NAME'],
+                    user=db['USER'],
+                    password=db['PASSWORD'],
+                    host=db['HOST'],
+                    port=db['PORT'],
+                )
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL};')
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self.dispatch(json.loads(notify.payload))
+            except Exception:
+                logger.exception('Order status listener failed, reconnecting')
+                time.sleep(5)
+
+
+broker = OrderStatusBroker()
+
+
+def publish_status_changes(changes):
+    """
+    Публикует изменения статусов: список словарей с ключами
+    order_id, order_number, old_status, new_status.
+    Вызывать внутри транзакции, в которой меняется статус.
+    """
+    if not changes:
+        return
+    payloads = [json.dumps(change) for change in changes]
+    if connection.vendor == 'postgresql':
+        # NOTIFY доставляется слушателям только после фиксации транзакции
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+                [CHANNEL, payloads]
+            )
+    else:
+        def dispatch_changes():
+            for change in changes:
+                broker.dispatch(change)
+        transaction.on_commit(dispatch_changes)
+
+
+def publish_status_change(order, old_status, new_status):
+    """Публикует изменение статуса одного заказа"""
+    publish_status_changes([{
+        'order_id': order.pk,
+        'order_number': order.order_number,
+        'old_status': old_status,
+        'new_status': new_status,
+    }])
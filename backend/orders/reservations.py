@@ -0,0 +1,144 @@
+"""
+Временные резервы запчастей под корзину
+
+Резерв увеличивает Part.reserve условным UPDATE (только если хватает
+доступного количества), без блокировок между запросами. Просроченные
+резервы снимает команда release_expired_reservations пачками, одним
+UPDATE на пачку. UPDATE не вызывает сигналов моделей, поэтому HTTP-микрокэш
+затронутых запчастей сбрасывается здесь явно.
+
+Резерв принадлежит клиенту: дополнить или снять его может только владелец, а
+сумма единиц в активных резервах клиента ограничена
+CART_RESERVATION_MAX_TOTAL_QUANTITY.
+"""
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from catalog.models import Part
+from gooddrive_backend.httpcache import purge_dispatcher
+from rest_framework.exceptions import NotFound
+from .exceptions import ReservationLimitExceeded
+from .models import CartReservation
+
+
+def reservation_ttl():
+    return timedelta(minutes=settings.CART_RESERVATION_TTL_MINUTES)
+
+
+def purge_parts(part_ids):
+    """Сбросить микрокэш списков и карточек запчастей с изменившимся остатком"""
+    if part_ids:
+        purge_dispatcher.purge('catalog', *[f'part:{part_id}' for part_id in part_ids])
+
+
+@transaction.atomic
+def reserve_items(items, user, token=None):
+    """
+    Резервирует позиции [{'part_id', 'quantity'}] под токен корзины клиента.
+    Повторный вызов с тем же токеном добавляет позиции и продлевает весь резерв.
+    """
+    now = timezone.now()
+    expires_at = now + reservation_ttl()
+    
+    # Резервы одного клиента оформляются по очереди: параллельные запросы не обойдут лимит
+    list(get_user_model().objects.select_for_update().filter(pk=user.pk).values_list('pk'))
+    if token and CartReservation.objects.filter(token=token).exclude(user=user).exists():
+        raise NotFound('Резерв не найден')
+    token = token or uuid.uuid4()
+    
+    active = CartReservation.objects.filter(
+        user=user, expires_at__gt=now
+    ).aggregate(total=Sum('quantity'))['total'] or 0
+    if active + sum(item['quantity'] for item in items) > settings.CART_RESERVATION_MAX_TOTAL_QUANTITY:
+        raise ReservationLimitExceeded()
+    
+    lines = []
+    reservations = []
+    for item in items:
+        part_id, quantity = item['part_id'], item['quantity']
+        reserved = Part.objects.filter(
+            id=part_id, is_active=True, available__gte=quantity
+        ).update(
+            reserve=F('reserve') + quantity,
+            available=F('available') - quantity,
+            updated_at=now
+        )
+        if reserved:
+            reservations.append(CartReservation(
+                token=token, user=user, part_id=part_id, quantity=quantity, expires_at=expires_at
+            ))
+        lines.append({'part_id': part_id, 'quantity': quantity, 'reserved': bool(reserved)})
+    
+    CartReservation.objects.bulk_create(reservations)
+    CartReservation.objects.filter(token=token).update(expires_at=expires_at)
+    purge_parts({reservation.part_id for reservation in reservations})
+    return {'token': token, 'expires_at': expires_at, 'lines': lines}
+
+
+def reserved_quantities(token):
+    """Количество, зарезервированное под токен, по запчастям"""
+    quantities = defaultdict(int)
+    rows = CartReservation.objects.filter(
+        token=token, expires_at__gt=timezone.now()
+    ).values_list('part_id', 'quantity')
+    for part_id, quantity in rows:
+        quantities[part_id] += quantity
+    return quantities
+
+
+def release_quantities(quantities):
+    """Возвращает в доступное количество {part_id: quantity} одним UPDATE"""
+    if not quantities:
+        return
+    amount = Case(
+        *[When(id=part_id, then=Value(quantity)) for part_id, quantity in quantities.items()],
+        default=Value(0),
+        output_field=IntegerField()
+    )
+    new_reserve = Greatest(F('reserve') - amount, Value(0))
+    Part.objects.filter(id__in=quantities.keys()).update(
+        reserve=new_reserve,
+        available=Greatest(F('stock') - new_reserve, Value(0)),
+        updated_at=timezone.now()
+    )
+    purge_parts(quantities.keys())
+
+
+def _release_rows(rows):
+    quantities = defaultdict(int)
+    for _, part_id, quantity in rows:
+        quantities[part_id] += quantity
+    release_quantities(quantities)
+    CartReservation.objects.filter(id__in=[row[0] for row in rows]).delete()
+
+
+@transaction.atomic
+def release_token(token, user=None):
+    """Снимает все резервы токена (только резервы user, если указан); возвращает число снятых позиций"""
+    reservations = CartReservation.objects.select_for_update().filter(token=token)
+    if user is not None:
+        reservations = reservations.filter(user=user)
+    rows = list(reservations.values_list('id', 'part_id', 'quantity'))
+    _release_rows(rows)
+    return len(rows)
+
+
+@transaction.atomic
+def release_expired(batch_size=1000):
+    """Снимает одну пачку просроченных резервов; возвращает ее размер"""
+    rows = list(
+        CartReservation.objects.select_for_update(skip_locked=True)
+        .filter(expires_at__lte=timezone.now())
+        .order_by('expires_at')
+        .values_list('id', 'part_id', 'quantity')[:batch_size]
+    )
+    _release_rows(rows)
+    return len(rows)
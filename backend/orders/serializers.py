@@ -1,11 +1,19 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
-from .models import Order, OrderItem, OrderStatusHistory
-from catalog.serializers import PartListSerializer
+from .models import (
+    Order, OrderItem, OrderStatusHistory, OrderEvent, ArchivedOrder, OrderIntake
+)
+from .exceptions import OrderStatusConflict
+from .pricing import quote_items
+from .realtime import stream_token
+from .reservations import release_token, reserved_quantities
+from analytics.rollup import record_order_sales
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
     """Сериализатор для позиции заказа"""
-    part = PartListSerializer(read_only=True)
+    part = serializers.SerializerMethodField()
     part_id = serializers.IntegerField(write_only=True)
     
     class Meta:
@@ -14,7 +22,23 @@ class OrderItemSerializer(serializers.ModelSerializer):
             'id', 'part', 'part_id', 'quantity', 
             'unit_price', 'total_price'
         ]
-        read_only_fields = ['id', 'total_price']
+        # Цена всегда берется из каталога при создании заказа
+        read_only_fields = ['id', 'unit_price', 'total_price']
+    
+    def get_part(self, obj):
+        """Запчасть по снимку на момент заказа (без обращения к каталогу)"""
+        return {
+            'id': obj.part_id,
+            'title': obj.part_title,
+            'brand_name': obj.part_brand_name,
+            'original_number': obj.part_original_number,
+            'manufacturer_number': obj.part_manufacturer_number,
+            'warehouse_name': obj.warehouse_name,
+            'main_image': {
+                'url': obj.part_image_url,
+                'alt': obj.part_title
+            } if obj.part_image_url else None,
+        }
 
 
 class OrderStatusHistorySerializer(serializers.ModelSerializer):
@@ -35,6 +59,7 @@ class OrderSerializer(serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     status_history = OrderStatusHistorySerializer(many=True, read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
+    stream_token = serializers.SerializerMethodField()
     
     class Meta:
         model = Order
@@ -43,47 +68,63 @@ class OrderSerializer(serializers.ModelSerializer):
             'customer_email', 'delivery_address', 'delivery_city', 
             'delivery_postal_code', 'total_amount', 'status', 
             'status_display', 'notes', 'created_at', 'updated_at',
-            'items', 'status_history'
+            'items', 'status_history', 'stream_token'
         ]
         read_only_fields = [
             'id', 'order_number', 'total_amount', 'created_at', 
             'updated_at', 'status_history'
         ]
+    
+    def get_stream_token(self, obj):
+        """Токен для подписки на поток статусов (GET /api/orders/stream/<номер>/?token=)"""
+        return stream_token(obj.order_number)
 
 
 class OrderCreateSerializer(serializers.ModelSerializer):
     """Сериализатор для создания заказа"""
     items = OrderItemSerializer(many=True)
+    reservation_token = serializers.UUIDField(required=False, write_only=True)
     
     class Meta:
         model = Order
         fields = [
             'customer_name', 'customer_phone', 'customer_email',
             'delivery_address', 'delivery_city', 'delivery_postal_code',
-            'notes', 'items'
+            'notes', 'items', 'reservation_token'
         ]
     
     def validate_items(self, value):
         """Валидация позиций заказа"""
         if not value:
             raise serializers.ValidationError("Заказ должен содержать хотя бы одну позицию")
+        return value
+    
+    def validate(self, attrs):
+        """Проверка доступности с учетом резерва корзины и расчет цен"""
+        items = attrs['items']
+        reserved = {}
+        if attrs.get('reservation_token'):
+            reserved = reserved_quantities(attrs['reservation_token'])
         
-        for item in value:
+        quote = quote_items(items)
+        for item, line in zip(items, quote['lines']):
             # Проверяем доступность товара
-            part_id = item['part_id']
-            quantity = item['quantity']
+            if not line['found']:
+                raise serializers.ValidationError(
+                    {'items': [f"Товар с ID {line['part_id']} не найден"]}
+                )
+            available = line['available'] + reserved.get(line['part_id'], 0)
+            if line['quantity'] > available:
+                raise serializers.ValidationError(
+                    {'items': [f"Недостаточно товара '{line['title']}'. Доступно: {available}"]}
+                )
             
-            try:
-                from catalog.models import Part
-                part = Part.objects.get(id=part_id)
-                if part.available < quantity:
-                    raise serializers.ValidationError(
-                        f"Недостаточно товара '{part.title}'. Доступно: {part.available}"
-                    )
-            except Part.DoesNotExist:
-                raise serializers.ValidationError(f"Товар с ID {part_id} не найден")
+            # Цены фиксируем по тому же расчету, что и в корзине
+            item['unit_price'] = line['unit_price']
+            item['total_price'] = line['total_price']
+            item.update(OrderItem.part_snapshot(line['part']))
         
-        return value
+        return attrs
     
     def validate_customer_phone(self, value):
         """Валидация номера телефона"""
@@ -93,25 +134,14 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Введите корректный номер телефона")
         return value
     
+    @transaction.atomic
     def create(self, validated_data):
         """Создание заказа с позициями"""
         items_data = validated_data.pop('items')
+        reservation_token = validated_data.pop('reservation_token', None)
         
-        # Вычисляем общую сумму
-        total_amount = 0
-        for item_data in items_data:
-            part_id = item_data['part_id']
-            quantity = item_data['quantity']
-            
-            from catalog.models import Part
-            part = Part.objects.get(id=part_id)
-            unit_price = part.price_opt
-            total_price = quantity * unit_price
-            total_amount += total_price
-            
-            # Обновляем данные позиции
-            item_data['unit_price'] = unit_price
-            item_data['total_price'] = total_price
+        # Вычисляем общую сумму (цены рассчитаны в validate)
+        total_amount = sum(item_data['total_price'] for item_data in items_data)
         
         # Создаем заказ
         order = Order.objects.create(
@@ -119,9 +149,13 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             **validated_data
         )
         
-        # Создаем позиции заказа
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
+        # Создаем позиции заказа (цены и снимок запчасти уже заполнены в validate)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, **item_data) for item_data in items_data
+        ])
+        
+        # Дневная сводка продаж по запчастям
+        record_order_sales([order.id])
         
         # Создаем запись в истории статусов
         OrderStatusHistory.objects.create(
@@ -130,9 +164,52 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             comment='Заказ создан'
         )
         
+        # Событие для внешних потребителей пишется в той же транзакции
+        OrderEvent.record(
+            order, OrderEvent.EVENT_CREATED,
+            status=order.status,
+            **OrderEvent.items_payload(order)
+        )
+        
+        # Резерв корзины больше не нужен: заказ оформлен
+        if reservation_token:
+            release_token(reservation_token)
+        
         return order
 
 
+class OrderIntakeCreateSerializer(OrderCreateSerializer):
+    """
+    Прием заказа в очередь: только проверка структуры данных.
+    Наличие и цены проверяются при создании заказа обработчиком очереди.
+    """
+    
+    def validate(self, attrs):
+        return attrs
+    
+    def create(self, validated_data):
+        return OrderIntake.objects.create(payload=validated_data)
+
+
+class OrderIntakeSerializer(serializers.ModelSerializer):
+    """Сериализатор заявки на заказ"""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    order_id = serializers.IntegerField(read_only=True)
+    order_number = serializers.CharField(source='order.order_number', read_only=True, default=None)
+    stream_token = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = OrderIntake
+        fields = [
+            'ticket', 'status', 'status_display', 'order_id', 'order_number',
+            'stream_token', 'errors', 'created_at', 'processed_at'
+        ]
+    
+    def get_stream_token(self, obj):
+        """Токен потока статусов, когда заказ по заявке уже создан"""
+        return stream_token(obj.order.order_number) if obj.order_id else None
+
+
 class OrderUpdateSerializer(serializers.ModelSerializer):
     """Сериализатор для обновления заказа (только статус)"""
     
@@ -140,25 +217,122 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['status', 'notes']
     
+    def validate_status(self, value):
+        """Проверка допустимости перехода статуса"""
+        if self.instance and value != self.instance.status:
+            if not Order.can_transition(self.instance.status, value):
+                raise serializers.ValidationError(
+                    f"Переход из статуса '{self.instance.status}' в '{value}' недопустим. "
+                    f"Доступные: {Order.STATUS_TRANSITIONS[self.instance.status]}"
+                )
+        return value
+    
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Обновление заказа с записью в историю"""
         old_status = instance.status
         new_status = validated_data.get('status', old_status)
         
-        # Обновляем заказ
-        instance = super().update(instance, validated_data)
+        # Пишем только измененные колонки, без перезаписи всей строки
+        if 'notes' in validated_data:
+            instance.notes = validated_data['notes']
+            instance.save(update_fields=['notes', 'updated_at'])
         
-        # Если статус изменился, записываем в историю
+        # Если статус изменился, меняем его условным UPDATE и записываем в историю
         if old_status != new_status:
-            OrderStatusHistory.objects.create(
-                order=instance,
-                status=new_status,
-                comment=f"Статус изменен с '{instance.get_status_display()}' на '{instance.get_status_display()}'"
+            old_status_display = instance.get_status_display()
+            new_status_display = dict(Order.STATUS_CHOICES)[new_status]
+            changed = instance.transition_status(
+                new_status,
+                comment=f"Статус изменен с '{old_status_display}' на '{new_status_display}'"
             )
+            if not changed:
+                raise OrderStatusConflict()
         
         return instance
 
 
+class OrderBulkStatusSerializer(serializers.Serializer):
+    """Сериализатор для массовой смены статуса заказов"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=10000
+    )
+    order_numbers = serializers.ListField(
+        child=serializers.CharField(max_length=20),
+        required=False,
+        max_length=10000
+    )
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    comment = serializers.CharField(required=False, allow_blank=True, default='')
+    
+    def validate(self, attrs):
+        if not attrs.get('ids') and not attrs.get('order_numbers'):
+            raise serializers.ValidationError("Укажите ids или order_numbers заказов")
+        return attrs
+
+
+class OrderEventSerializer(serializers.ModelSerializer):
+    """Сериализатор для журнала событий заказов"""
+    
+    class Meta:
+        model = OrderEvent
+        fields = [
+            'id', 'event_type', 'order_id', 'order_number',
+            'payload', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class CartItemSerializer(serializers.Serializer):
+    """Сериализатор позиции корзины для расчета"""
+    part_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class CartQuoteSerializer(serializers.Serializer):
+    """Сериализатор запроса расчета корзины"""
+    items = CartItemSerializer(many=True, allow_empty=False, max_length=200)
+
+
+class CartReserveSerializer(serializers.Serializer):
+    """Сериализатор запроса резерва корзины"""
+    items = CartItemSerializer(many=True, allow_empty=False, max_length=200)
+    token = serializers.UUIDField(required=False)
+    
+    def validate_items(self, items):
+        limit = settings.CART_RESERVATION_MAX_LINE_QUANTITY
+        if any(item['quantity'] > limit for item in items):
+            raise serializers.ValidationError(f'Не больше {limit} единиц в одной позиции резерва')
+        return items
+
+
+class CartReleaseSerializer(serializers.Serializer):
+    """Сериализатор запроса снятия резерва корзины"""
+    token = serializers.UUIDField()
+
+
+class CartQuoteLineSerializer(serializers.Serializer):
+    """Сериализатор рассчитанной позиции корзины"""
+    part_id = serializers.IntegerField()
+    found = serializers.BooleanField()
+    title = serializers.CharField()
+    brand_name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, allow_null=True)
+    available = serializers.IntegerField()
+    shortfall = serializers.IntegerField()
+
+
+class CartQuoteResultSerializer(serializers.Serializer):
+    """Сериализатор результата расчета корзины"""
+    lines = CartQuoteLineSerializer(many=True)
+    total_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    is_available = serializers.BooleanField()
+
+
 class OrderListSerializer(serializers.ModelSerializer):
     """Сериализатор для списка заказов (краткая информация)"""
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -177,9 +351,19 @@ class OrderListSerializer(serializers.ModelSerializer):
         return obj.items.count()
 
 
-
-
-
-
-
-
+class ArchivedOrderListSerializer(serializers.ModelSerializer):
+    """Сериализатор для списка архивных заказов (краткая информация)"""
+    id = serializers.IntegerField(source='original_id', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    is_archived = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ArchivedOrder
+        fields = [
+            'id', 'order_number', 'customer_name', 'customer_phone',
+            'total_amount', 'status', 'status_display', 'items_count',
+            'created_at', 'is_archived'
+        ]
+    
+    def get_is_archived(self, obj):
+        return True
@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+from django.contrib import admin
+from django.test import RequestFactory, TestCase
+
+from analytics.models import PartSalesDaily
+from orders.admin import OrderAdmin
+from orders.models import Order, OrderEvent
+from orders.tests.utils import create_order, create_part
+
+
+class OrderAdminTests(TestCase):
+    def setUp(self):
+        self.admin = OrderAdmin(Order, admin.site)
+        self.request = RequestFactory().post('/admin/orders/order/add/')
+
+    def save_related(self, order, change):
+        form = SimpleNamespace(instance=order, save_m2m=lambda: None)
+        self.admin.save_related(self.request, form, [], change)
+
+    def test_created_order_gets_event_and_sales(self):
+        order = create_order(create_part(), quantity=2)
+        self.save_related(order, change=False)
+
+        event = OrderEvent.objects.get(order=order)
+        self.assertEqual(event.event_type, OrderEvent.EVENT_CREATED)
+        self.assertEqual(event.payload['status'], 'pending')
+        self.assertEqual(len(event.payload['items']), 1)
+        self.assertEqual(PartSalesDaily.objects.get().units, 2)
+
+    def test_changed_order_without_item_changes_has_no_event(self):
+        order = create_order(create_part())
+        self.save_related(order, change=True)
+        self.assertFalse(OrderEvent.objects.filter(order=order).exists())
@@ -0,0 +1,89 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from orders.models import ArchivedOrder, Order
+from orders.tests.utils import create_order, create_part
+
+
+class ArchiveOrdersTests(TestCase):
+    def setUp(self):
+        part = create_part()
+        old = timezone.now() - timedelta(days=400)
+        self.old_delivered = create_order(part, status='delivered', quantity=2)
+        self.old_pending = create_order(part, status='pending')
+        self.recent_delivered = create_order(part, status='delivered')
+        Order.objects.filter(
+            id__in=[self.old_delivered.id, self.old_pending.id]
+        ).update(created_at=old)
+
+    def archive(self, *args):
+        call_command('archive_orders', *args, stdout=StringIO())
+
+    def test_moves_only_old_closed_orders(self):
+        self.archive('--batch-size', '1')
+
+        self.assertEqual(
+            set(Order.objects.values_list('id', flat=True)),
+            {self.old_pending.id, self.recent_delivered.id},
+        )
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(
+            (archived.original_id, archived.order_number, archived.items_count),
+            (self.old_delivered.id, self.old_delivered.order_number, 1),
+        )
+        self.assertEqual(archived.data['items'][0]['quantity'], 2)
+
+    def test_dry_run_changes_nothing(self):
+        self.archive('--dry-run')
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertFalse(ArchivedOrder.objects.exists())
+
+    def test_archived_order_still_readable(self):
+        self.archive()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('operator'))
+
+        detail = client.get(f'/api/orders/{self.old_delivered.id}/').json()
+        self.assertTrue(detail['is_archived'])
+        self.assertEqual(detail['order_number'], self.old_delivered.order_number)
+
+        listed = client.get('/api/orders/', {'archived': 'true'}).json()['results']
+        self.assertEqual([order['order_number'] for order in listed], [self.old_delivered.order_number])
+
+        customer = client.get(
+            '/api/orders/customer_history/', {'phone': self.old_delivered.customer_phone}
+        ).json()['customer']
+        self.assertEqual((customer['orders_count'], customer['archived_orders_count']), (3, 1))
+
+        by_phone = client.get(
+            '/api/orders/by_phone/', {'phone': self.old_delivered.customer_phone}
+        ).json()
+        self.assertEqual(len(by_phone), 3)
+        self.assertEqual(by_phone[-1]['order_number'], self.old_delivered.order_number)
+        self.assertTrue(by_phone[-1]['is_archived'])
+
+    def test_statistics_include_archive(self):
+        self.archive()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('operator'))
+
+        data = client.get('/api/orders/statistics/').json()
+        self.assertEqual(data['total_orders'], 3)
+        self.assertEqual(data['total_amount'], 400.0)
+        self.assertAlmostEqual(data['avg_order_amount'], 400 / 3)
+        self.assertEqual(
+            {row['status']: row['count'] for row in data['status_statistics']},
+            {'delivered': 2, 'pending': 1},
+        )
+
+    def test_non_numeric_id_is_404(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('operator'))
+        self.assertEqual(client.get('/api/orders/abc/').status_code, 404)
+        self.assertEqual(client.get('/api/orders/999999/').status_code, 404)
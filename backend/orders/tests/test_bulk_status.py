@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderEvent, OrderStatusHistory
+from orders.tests.utils import create_order
+
+URL = '/api/orders/bulk_update_status/'
+
+
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('operator')
+        self.client.force_authenticate(self.user)
+
+    def test_results_per_order(self):
+        pending = create_order(status='pending')
+        processing = create_order(status='processing')
+        delivered = create_order(status='delivered')
+        cancelled = create_order(status='cancelled')
+
+        response = self.client.post(URL, {
+            'ids': [pending.id, delivered.id, 999999],
+            'order_numbers': [processing.order_number, cancelled.order_number, 'GD9999999'],
+            'status': 'cancelled',
+            'comment': 'Нет в наличии',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['updated'], 2)
+        self.assertEqual(
+            {row['id']: row['result'] for row in data['results']},
+            {
+                pending.id: 'updated', processing.id: 'updated',
+                delivered.id: 'not_allowed', cancelled.id: 'unchanged',
+            },
+        )
+        self.assertEqual(data['not_found'], {'ids': [999999], 'order_numbers': ['GD9999999']})
+        self.assertEqual(
+            dict(Order.objects.values_list('id', 'status')),
+            {
+                pending.id: 'cancelled', processing.id: 'cancelled',
+                delivered.id: 'delivered', cancelled.id: 'cancelled',
+            },
+        )
+
+    def test_history_and_events_for_updated_only(self):
+        pending = create_order(status='pending')
+        delivered = create_order(status='delivered')
+
+        self.client.post(URL, {
+            'ids': [pending.id, delivered.id], 'status': 'processing', 'comment': 'Пакет',
+        }, format='json')
+
+        history = OrderStatusHistory.objects.get()
+        self.assertEqual(
+            (history.order_id, history.status, history.comment, history.created_by),
+            (pending.id, 'processing', 'Пакет', self.user),
+        )
+        event = OrderEvent.objects.get(event_type=OrderEvent.EVENT_STATUS_CHANGED)
+        self.assertEqual(
+            (event.order_id, event.payload),
+            (pending.id, {'old_status': 'pending', 'new_status': 'processing'}),
+        )
+
+    def test_requires_orders(self):
+        response = self.client.post(URL, {'status': 'processing'}, format='json')
+        self.assertEqual(response.status_code, 400)
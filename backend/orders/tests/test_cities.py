@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from orders.models import DeliveryCity, Order
+from orders.tests.utils import create_order
+
+
+class DeliveryCityTests(TestCase):
+    def test_spellings_share_city(self):
+        first = create_order(delivery_city='г. Москва')
+        second = create_order(delivery_city='москва')
+        self.assertEqual(first.city_id, second.city_id)
+        self.assertEqual(DeliveryCity.objects.count(), 1)
+
+    def test_lookup_only_when_city_changes(self):
+        order = Order.objects.get(pk=create_order().pk)
+        order.notes = 'Позвонить заранее'
+        # UPDATE заказа без запросов к справочнику городов
+        with self.assertNumQueries(1):
+            order.save()
+
+        order.delivery_city = 'Казань'
+        order.save()
+        order.refresh_from_db()
+        self.assertEqual(order.city.name, 'Казань')
+
+    def test_city_refreshed_after_partial_save_without_city(self):
+        order = Order.objects.get(pk=create_order().pk)
+        order.delivery_city = 'Казань'
+        order.save(update_fields=['notes'])
+        order.save()
+        order.refresh_from_db()
+        self.assertEqual((order.delivery_city, order.city.name), ('Казань', 'Казань'))
+
+    def test_filter_by_city_prefix(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('operator'))
+        create_order(delivery_city='Санкт-Петербург')
+        moscow = create_order(delivery_city='Москва')
+
+        found = client.get('/api/orders/', {'delivery_city': 'моск'}).json()['results']
+        self.assertEqual([order['id'] for order in found], [moscow.id])
+        found = client.get('/api/orders/', {'delivery_city': 'петербург'}).json()['results']
+        self.assertEqual(found, [])
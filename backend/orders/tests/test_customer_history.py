@@ -0,0 +1,44 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from orders.models import Order
+from orders.tests.utils import create_order
+
+
+class CustomerPhoneTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('operator'))
+
+    def test_phone_normalized_on_partial_save(self):
+        order = create_order(customer_phone='+7 (912) 123-45-67')
+        order.customer_phone = '8 912 000-11-22'
+        order.save(update_fields=['customer_phone'])
+
+        order.refresh_from_db()
+        self.assertEqual(order.customer_phone_normalized, Order.normalize_phone('8 912 000-11-22'))
+        self.assertIn(order.customer_phone_normalized.lstrip('+'), order.search_text)
+
+    def test_history_and_aggregates_by_any_phone_spelling(self):
+        create_order(customer_phone='+7 (912) 123-45-67', total_amount=100)
+        create_order(customer_phone='89121234567', total_amount=250)
+        create_order(customer_phone='8 912 123 45 67', total_amount=999, status='cancelled')
+        create_order(customer_phone='+7 900 000-00-00', total_amount=50)
+
+        response = self.client.get(
+            '/api/orders/customer_history/', {'phone': '+7 912 123-45-67', 'page_size': 2}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['customer']['orders_count'], 3)
+        self.assertEqual(data['customer']['lifetime_total'], 350.0)
+        self.assertEqual(len(data['results']), 2)
+
+        rest = self.client.get(data['next']).json()
+        self.assertEqual(len(rest['results']), 1)
+        self.assertIsNone(rest['next'])
+
+    def test_history_requires_phone(self):
+        response = self.client.get('/api/orders/customer_history/')
+        self.assertEqual(response.status_code, 400)
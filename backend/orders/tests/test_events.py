@@ -0,0 +1,94 @@
+import threading
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from orders.models import OrderEvent
+from orders.tests.utils import create_order
+
+
+@override_settings(ORDER_EVENTS_SETTLE_SECONDS=0)
+class OrderEventFeedTests(TransactionTestCase):
+    # Журнал отдает только события зафиксированных транзакций, поэтому тесты
+    # не оборачиваются в общую транзакцию
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('integration'))
+        self.order = create_order()
+
+    def read(self, after=None, limit=100):
+        params = {'limit': limit}
+        if after is not None:
+            params['after'] = after
+        response = self.client.get('/api/orders/events/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_follow_cursor(self):
+        created = [
+            OrderEvent.record(self.order, OrderEvent.EVENT_STATUS_CHANGED, step=step).id
+            for step in range(5)
+        ]
+        seen, cursor, has_more = [], None, True
+        while has_more:
+            page = self.read(cursor, limit=2)
+            self.assertLessEqual(len(page['events']), 2)
+            seen += [event['id'] for event in page['events']]
+            cursor, has_more = page['next_cursor'], page['has_more']
+
+        self.assertEqual(seen, created)
+        self.assertEqual(self.read(cursor)['events'], [])
+        self.assertEqual(self.read(cursor)['next_cursor'], cursor)
+
+    def test_legacy_integer_cursor(self):
+        first = OrderEvent.record(self.order, OrderEvent.EVENT_CREATED)
+        second = OrderEvent.record(self.order, OrderEvent.EVENT_ITEMS_CHANGED)
+
+        page = self.read(first.id)
+        self.assertEqual([event['id'] for event in page['events']], [second.id])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/orders/events/', {'after': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    @skipUnless(connection.vendor == 'postgresql', 'Порядок фиксации транзакций есть только в PostgreSQL')
+    def test_event_of_long_transaction_not_skipped(self):
+        """
+        Транзакция A пишет событие первой (меньший id) и фиксируется после
+        транзакции B. Курсор не должен уйти дальше события A.
+        """
+        written, release = threading.Event(), threading.Event()
+        long_event = {}
+
+        def long_transaction():
+            try:
+                with transaction.atomic():
+                    long_event['id'] = OrderEvent.record(self.order, OrderEvent.EVENT_CREATED).id
+                    written.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=long_transaction)
+        thread.start()
+        try:
+            self.assertTrue(written.wait(10))
+            short_event = OrderEvent.record(self.order, OrderEvent.EVENT_STATUS_CHANGED)
+            self.assertGreater(short_event.id, long_event['id'])
+
+            # B зафиксирована, но A еще открыта: B не отдается раньше A
+            page = self.read()
+            self.assertEqual(page['events'], [])
+            cursor = page['next_cursor']
+        finally:
+            release.set()
+            thread.join()
+
+        page = self.read(cursor)
+        self.assertEqual(
+            [event['id'] for event in page['events']],
+            [long_event['id'], short_event.id],
+        )
@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from orders.tests.utils import create_order, create_part
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('accountant'))
+        self.order = create_order(create_part(), quantity=2)
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_json_accept_gets_file(self):
+        response = self.client.get('/api/orders/export/', HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn(self.order.order_number, self.content(response))
+
+    def test_format_parameter(self):
+        response = self.client.get(
+            '/api/orders/export/', {'format': 'jsonl'}, HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn(f'"order_number": "{self.order.order_number}"', self.content(response))
+
+        response = self.client.get('/api/orders/export/', {'format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('csv', response.json()['error'])
+
+    def test_errors_rendered_as_json(self):
+        self.client.force_authenticate(None)
+        response = self.client.get('/api/orders/export/', {'format': 'xlsx'})
+        self.assertIn(response.status_code, (401, 403))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('detail', response.json())
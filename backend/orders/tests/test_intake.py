@@ -0,0 +1,95 @@
+import threading
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from orders.intake import process_queued
+from orders.models import DeliveryCity, Order, OrderIntake
+from orders.tests.utils import create_part
+
+
+def order_payload(part, quantity=1):
+    return {
+        'customer_name': 'Иван Петров',
+        'customer_phone': '+79121234567',
+        'delivery_address': 'ул. Ленина, 1',
+        'delivery_city': 'Москва',
+        'items': [{'part_id': part.id, 'quantity': quantity}],
+    }
+
+
+@override_settings(ORDER_INTAKE_ASYNC=True)
+class OrderIntakeTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.part = create_part(quantity=5)
+
+    def test_queued_order_created_once(self):
+        response = self.client.post('/api/orders/', order_payload(self.part, 2), format='json')
+        self.assertEqual(response.status_code, 202)
+        ticket = response.json()['ticket']
+        self.assertFalse(Order.objects.exists())
+
+        self.assertEqual(process_queued(10), 1)
+        self.assertEqual(process_queued(10), 0)
+
+        order = Order.objects.get()
+        self.assertEqual(order.items.get().quantity, 2)
+        status = self.client.get(f'/api/orders/intake/{ticket}/').json()
+        self.assertEqual(
+            (status['status'], status['order_number']),
+            (OrderIntake.STATUS_COMPLETED, order.order_number),
+        )
+
+    def test_failed_intake_does_not_stop_batch(self):
+        failed = OrderIntake.objects.create(payload=order_payload(self.part, 50))
+        completed = OrderIntake.objects.create(payload=order_payload(self.part, 1))
+
+        self.assertEqual(process_queued(10), 2)
+
+        failed.refresh_from_db()
+        completed.refresh_from_db()
+        self.assertEqual(failed.status, OrderIntake.STATUS_FAILED)
+        self.assertIn('items', failed.errors)
+        self.assertEqual(completed.status, OrderIntake.STATUS_COMPLETED)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'SKIP LOCKED проверяется на PostgreSQL')
+class ParallelIntakeWorkersTests(TransactionTestCase):
+    def test_second_worker_skips_locked_intakes(self):
+        # Разные запчасти и уже известный город: обработчики не ждут блокировок
+        # остатков и справочника городов друг друга
+        DeliveryCity.for_name('Москва')
+        for _ in range(3):
+            OrderIntake.objects.create(payload=order_payload(create_part()))
+        processed, release = threading.Event(), threading.Event()
+        first = {}
+
+        def first_worker():
+            try:
+                # Пачка первого обработчика остается заблокированной до коммита
+                with transaction.atomic():
+                    first['processed'] = process_queued(2)
+                    processed.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=first_worker)
+        thread.start()
+        try:
+            self.assertTrue(processed.wait(10))
+            second = process_queued(10)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual((first['processed'], second), (2, 1))
+        self.assertEqual(process_queued(10), 0)
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertEqual(
+            OrderIntake.objects.filter(status=OrderIntake.STATUS_COMPLETED).count(), 3
+        )
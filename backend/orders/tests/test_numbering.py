@@ -0,0 +1,67 @@
+import threading
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from orders.models import ArchivedOrder
+from orders.numbering import BLOCK_SIZE, OrderNumberAllocator, format_order_number
+from orders.tests.utils import create_order
+
+
+class OrderNumberTests(TestCase):
+    def test_format(self):
+        self.assertEqual(format_order_number(1234), 'GD0001234')
+
+    def test_last_issued_includes_archive_and_skips_old_format(self):
+        create_order(order_number='GD0000007')
+        create_order(order_number='GD20240115001')
+        ArchivedOrder.objects.create(
+            original_id=100, order_number='GD0000042', customer_name='Иван',
+            customer_phone='+79121234567', total_amount=100, status='delivered',
+            created_at=timezone.now(), data={},
+        )
+        self.assertEqual(OrderNumberAllocator()._last_issued(), 42)
+
+    @skipUnless(connection.vendor != 'postgresql', 'На PostgreSQL номер выдает последовательность')
+    def test_next_after_last_without_sequence(self):
+        create_order(order_number='GD0000041')
+        self.assertEqual(create_order().order_number, 'GD0000042')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Последовательность номеров есть только в PostgreSQL')
+class OrderNumberBlockTests(TestCase):
+    def test_block_costs_one_query(self):
+        allocator = OrderNumberAllocator()
+        with self.assertNumQueries(1):
+            numbers = [allocator.next_number() for _ in range(BLOCK_SIZE)]
+        values = [int(number[2:]) for number in numbers]
+        self.assertEqual(values, list(range(values[0], values[0] + BLOCK_SIZE)))
+
+        with self.assertNumQueries(1):
+            allocator.next_number()
+
+    def test_processes_get_disjoint_blocks(self):
+        first, second = OrderNumberAllocator(), OrderNumberAllocator()
+        numbers = [first.next_number(), second.next_number()]
+        numbers += [first.next_number() for _ in range(BLOCK_SIZE)]
+        numbers += [second.next_number() for _ in range(BLOCK_SIZE)]
+        self.assertEqual(len(set(numbers)), len(numbers))
+
+    def test_threads_share_allocator_without_duplicates(self):
+        allocator = OrderNumberAllocator()
+        numbers = []
+
+        def take():
+            try:
+                numbers.extend(allocator.next_number() for _ in range(BLOCK_SIZE + 5))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=take) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(numbers)), len(numbers))
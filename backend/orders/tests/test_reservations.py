@@ -0,0 +1,118 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework.throttling import ScopedRateThrottle
+
+from catalog.models import Brand, Warehouse, Part
+from gooddrive_backend.httpcache import purge_dispatcher
+from orders.models import CartReservation
+from orders.reservations import release_expired, release_token, reserve_items
+
+
+@override_settings(HTTP_CACHE_PURGE_URL='http://nginx:8080')
+class ReservationCachePurgeTests(TestCase):
+    def setUp(self):
+        brand = Brand.objects.create(name='Bosch', country='Германия')
+        warehouse = Warehouse.objects.create(name='Основной', address='Москва')
+        self.part = Part.objects.create(
+            title='Фильтр', brand=brand, warehouse=warehouse,
+            quantity=5, stock=5, available=5, price_opt=100
+        )
+        self.user = User.objects.create_user('client', password='secret')
+
+    def purged_keys(self, func, *args):
+        with mock.patch.object(purge_dispatcher, '_enqueue') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                result = func(*args)
+        keys = set().union(*[call.args[0] for call in enqueue.call_args_list])
+        return result, keys
+
+    def test_reserve_and_release_purge_part(self):
+        result, keys = self.purged_keys(reserve_items, [{'part_id': self.part.id, 'quantity': 2}], self.user)
+        self.assertEqual(keys, {'catalog', f'part:{self.part.id}'})
+
+        _, keys = self.purged_keys(release_token, result['token'])
+        self.assertEqual(keys, {'catalog', f'part:{self.part.id}'})
+        self.part.refresh_from_db()
+        self.assertEqual(self.part.available, 5)
+
+    def test_failed_reserve_does_not_purge(self):
+        _, keys = self.purged_keys(reserve_items, [{'part_id': self.part.id, 'quantity': 50}], self.user)
+        self.assertEqual(keys, set())
+
+    def test_expired_release_purges_part(self):
+        reserve_items([{'part_id': self.part.id, 'quantity': 1}], self.user)
+        CartReservation.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        released, keys = self.purged_keys(release_expired)
+        self.assertEqual(released, 1)
+        self.assertEqual(keys, {'catalog', f'part:{self.part.id}'})
+
+
+@override_settings(CART_RESERVATION_MAX_LINE_QUANTITY=10, CART_RESERVATION_MAX_TOTAL_QUANTITY=15)
+class CartReserveApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        brand = Brand.objects.create(name='Bosch', country='Германия')
+        warehouse = Warehouse.objects.create(name='Основной', address='Москва')
+        self.part = Part.objects.create(
+            title='Фильтр', brand=brand, warehouse=warehouse,
+            quantity=100, stock=100, available=100, price_opt=100
+        )
+        self.owner = User.objects.create_user('owner', password='secret')
+        self.other = User.objects.create_user('other', password='secret')
+        self.client = APIClient()
+
+    def reserve(self, quantity, token=None):
+        data = {'items': [{'part_id': self.part.id, 'quantity': quantity}]}
+        if token:
+            data['token'] = token
+        return self.client.post('/api/cart/reserve/', data, format='json')
+
+    def test_anonymous_cannot_reserve_or_release(self):
+        self.assertIn(self.reserve(1).status_code, (401, 403))
+        response = self.client.post(
+            '/api/cart/release/', {'token': '00000000-0000-0000-0000-000000000000'}, format='json'
+        )
+        self.assertIn(response.status_code, (401, 403))
+
+    def test_quote_stays_public(self):
+        response = self.client.post(
+            '/api/cart/quote/', {'items': [{'part_id': self.part.id, 'quantity': 1}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_line_and_total_caps(self):
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.reserve(11).status_code, 400)
+        self.assertEqual(self.reserve(10).status_code, 200)
+        response = self.reserve(6)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('лимит', response.json()['detail'])
+        self.part.refresh_from_db()
+        self.assertEqual(self.part.available, 90)
+
+    def test_only_owner_extends_or_releases_token(self):
+        self.client.force_authenticate(self.owner)
+        token = self.reserve(3).json()['token']
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.reserve(1, token=token).status_code, 404)
+        response = self.client.post('/api/cart/release/', {'token': token}, format='json')
+        self.assertEqual(response.json(), {'released': 0})
+        self.part.refresh_from_db()
+        self.assertEqual(self.part.available, 97)
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.post('/api/cart/release/', {'token': token}, format='json')
+        self.assertEqual(response.json(), {'released': 1})
+
+    def test_reserve_throttled(self):
+        self.client.force_authenticate(self.owner)
+        with mock.patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'cart_reserve': '2/min'}):
+            statuses = [self.reserve(1).status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
@@ -0,0 +1,97 @@
+import threading
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from orders.models import Order, OrderEvent, OrderStatusHistory
+from orders.tests.utils import create_order
+from orders.views import OrderViewSet
+
+
+def changed_after_read(new_status):
+    """get_object, после которого статус заказа меняет другой оператор"""
+    get_object = OrderViewSet.get_object
+
+    def wrapped(view):
+        order = get_object(view)
+        Order.objects.filter(pk=order.pk).update(status=new_status)
+        return order
+    return wrapped
+
+
+class StatusTransitionApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('operator'))
+        self.order = create_order(status='pending')
+        self.url = f'/api/orders/{self.order.id}/update_status/'
+
+    def test_transition(self):
+        response = self.client.post(self.url, {'status': 'processing', 'expected_status': 'pending'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'processing')
+        self.assertEqual(OrderStatusHistory.objects.filter(order=self.order).count(), 1)
+
+    def test_stale_expected_status(self):
+        response = self.client.post(self.url, {'status': 'cancelled', 'expected_status': 'processing'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['current_status'], 'pending')
+
+    def test_not_allowed_transition(self):
+        response = self.client.post(self.url, {'status': 'delivered'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_concurrent_change_between_read_and_update(self):
+        with mock.patch.object(OrderViewSet, 'get_object', changed_after_read('cancelled')):
+            response = self.client.post(self.url, {'status': 'processing'})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['current_status'], 'cancelled')
+        self.assertFalse(OrderStatusHistory.objects.filter(order=self.order).exists())
+        self.assertFalse(
+            OrderEvent.objects.filter(event_type=OrderEvent.EVENT_STATUS_CHANGED).exists()
+        )
+
+    def test_concurrent_change_on_patch(self):
+        with mock.patch.object(OrderViewSet, 'get_object', changed_after_read('processing')):
+            response = self.client.patch(
+                f'/api/orders/{self.order.id}/', {'status': 'cancelled'}, format='json'
+            )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, 'processing')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Нужны параллельные транзакции PostgreSQL')
+class ConcurrentTransitionTests(TransactionTestCase):
+    def test_only_one_transition_wins(self):
+        order = create_order(status='pending')
+        first_done, release = threading.Event(), threading.Event()
+
+        def first_operator():
+            try:
+                with transaction.atomic():
+                    Order.objects.get(pk=order.pk).transition_status('processing')
+                    first_done.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=first_operator)
+        thread.start()
+        try:
+            self.assertTrue(first_done.wait(10))
+            # Второй оператор видит pending: его UPDATE ждет первую транзакцию
+            second = Order.objects.get(pk=order.pk)
+            threading.Timer(0.3, release.set).start()
+            with transaction.atomic():
+                changed = second.transition_status('cancelled')
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertFalse(changed)
+        self.assertEqual(Order.objects.get(pk=order.pk).status, 'processing')
+        self.assertEqual(OrderStatusHistory.objects.filter(order=order).count(), 1)
@@ -0,0 +1,48 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from orders.realtime import broker, stream_token
+from orders.tests.utils import create_order
+
+
+class OrderStatusStreamAccessTests(TestCase):
+    def setUp(self):
+        # Поток LISTEN держит свое соединение с тестовой БД до конца процесса
+        patcher = mock.patch.object(broker, '_ensure_listener')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Доставленный заказ: поток отдает текущий статус и закрывается
+        self.order = create_order(status='delivered')
+        self.url = f'/api/orders/stream/{self.order.order_number}/'
+
+    async def read_stream(self, response):
+        return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+    async def test_stream_requires_token(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+        other = stream_token('GD0000000')
+        response = await self.async_client.get(self.url, {'token': other})
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_with_order_token(self):
+        token = stream_token(self.order.order_number)
+        response = await self.async_client.get(self.url, {'token': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('"new_status": "delivered"', await self.read_stream(response))
+
+    async def test_stream_for_authenticated_user(self):
+        user = await User.objects.acreate(username='operator')
+        await sync_to_async(self.async_client.force_login)(user)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_token_returned_on_order_detail(self):
+        user = User.objects.create_user('operator', password='secret')
+        self.client.force_login(user)
+        data = self.client.get(f'/api/orders/{self.order.id}/').json()
+        self.assertEqual(data['stream_token'], stream_token(self.order.order_number))
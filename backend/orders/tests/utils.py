@@ -0,0 +1,30 @@
+from catalog.models import Brand, Warehouse, Part
+from orders.models import Order, OrderItem
+
+
+def create_part(quantity=100, price=100):
+    brand = Brand.objects.create(name='Bosch', country='Германия')
+    warehouse = Warehouse.objects.create(name='Основной', address='Москва')
+    return Part.objects.create(
+        title='Фильтр масляный', brand=brand, warehouse=warehouse,
+        quantity=quantity, stock=quantity, available=quantity, price_opt=price
+    )
+
+
+def create_order(part=None, status='pending', quantity=1, **kwargs):
+    fields = {
+        'customer_name': 'Иван Петров',
+        'customer_phone': '+7 (912) 123-45-67',
+        'delivery_address': 'ул. Ленина, 1',
+        'delivery_city': 'Москва',
+        'total_amount': 100 * quantity,
+        'status': status,
+        **kwargs,
+    }
+    order = Order.objects.create(**fields)
+    if part is not None:
+        OrderItem.objects.create(
+            order=order, part=part, quantity=quantity,
+            unit_price=part.price_opt, total_price=part.price_opt * quantity
+        )
+    return order
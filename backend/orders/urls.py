@@ -1,12 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import OrderViewSet, OrderStatusHistoryViewSet
+from .views import OrderViewSet, OrderStatusHistoryViewSet, CartViewSet, order_status_stream
 
 router = DefaultRouter()
 router.register(r'orders', OrderViewSet)
 router.register(r'order-status-history', OrderStatusHistoryViewSet)
+router.register(r'cart', CartViewSet, basename='cart')
 
 urlpatterns = [
+    path('orders/stream/<str:order_number>/', order_status_stream, name='order-status-stream'),
     path('', include(router.urls)),
 ]
 
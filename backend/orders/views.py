@@ -1,23 +1,65 @@
+import asyncio
+import csv
+import json
+import tempfile
+
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from .models import Order, OrderItem, OrderStatusHistory
+from django.conf import settings
+from django.db import connection, transaction
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from .models import (
+    Order, OrderItem, OrderStatusHistory, OrderEvent, ArchivedOrder, OrderIntake,
+    DeliveryCity
+)
 from .serializers import (
     OrderSerializer, OrderCreateSerializer, OrderUpdateSerializer,
-    OrderListSerializer, OrderStatusHistorySerializer
+    OrderListSerializer, OrderStatusHistorySerializer, OrderBulkStatusSerializer,
+    OrderEventSerializer, ArchivedOrderListSerializer,
+    OrderIntakeCreateSerializer, OrderIntakeSerializer,
+    CartQuoteSerializer, CartQuoteResultSerializer,
+    CartReserveSerializer, CartReleaseSerializer
 )
-from .filters import OrderFilter
+from .filters import OrderFilter, ArchivedOrderFilter, OrderSearchFilter
+from .realtime import broker, publish_status_changes, check_stream_token
+from .pricing import quote_items
+from .reservations import reserve_items, release_token
+from analytics.rollup import record_order_sales, SIGN_CANCELLED
+
+
+class OrderCursorPagination(CursorPagination):
+    """Курсорная пагинация для истории заказов клиента"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class Echo:
+    """Псевдобуфер: write() возвращает строку, а не пишет ее"""
+    
+    def write(self, value):
+        return value
 
 
 class OrderViewSet(viewsets.ModelViewSet):
     """ViewSet для работы с заказами"""
-    queryset = Order.objects.select_related().prefetch_related('items__part', 'status_history').all()
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    queryset = Order.objects.select_related().prefetch_related('items', 'status_history').all()
+    filter_backends = [DjangoFilterBackend, OrderSearchFilter, filters.OrderingFilter]
     filterset_class = OrderFilter
-    search_fields = ['order_number', 'customer_name', 'customer_phone', 'customer_email']
+    search_fields = ['search_text']
     ordering_fields = ['created_at', 'total_amount', 'status']
     ordering = ['-created_at']
     
@@ -33,16 +75,50 @@ class OrderViewSet(viewsets.ModelViewSet):
     
     def get_permissions(self):
         """Права доступа в зависимости от действия"""
-        if self.action == 'create':
-            # Создание заказа доступно всем
+        if self.action in ('create', 'intake_status'):
+            # Создание заказа и проверка заявки доступны всем
             permission_classes = [AllowAny]
         else:
             # Остальные действия только для авторизованных
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
     
+    def list(self, request, *args, **kwargs):
+        """Список заказов; с archived=true — список архивных заказов"""
+        if request.query_params.get('archived', 'false').lower() != 'true':
+            return super().list(request, *args, **kwargs)
+        
+        queryset = ArchivedOrderFilter(
+            request.query_params,
+            queryset=ArchivedOrder.objects.defer('data').order_by('-created_at')
+        ).qs
+        page = self.paginate_queryset(queryset)
+        serializer = ArchivedOrderListSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Детали заказа; если заказ перенесен в архив — данные из архива"""
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            pk = str(kwargs.get(self.lookup_field, ''))
+            archived = ArchivedOrder.objects.filter(original_id=pk).first() if pk.isdigit() else None
+            if archived is None:
+                raise
+            return Response({**archived.data, 'is_archived': True})
+    
     def create(self, request, *args, **kwargs):
         """Создание нового заказа"""
+        if settings.ORDER_INTAKE_ASYNC:
+            # Режим очереди: заказ создаст process_order_intake
+            serializer = OrderIntakeCreateSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            intake = serializer.save()
+            return Response(
+                OrderIntakeSerializer(intake).data,
+                status=status.HTTP_202_ACCEPTED
+            )
+        
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         order = serializer.save()
@@ -51,6 +127,14 @@ class OrderViewSet(viewsets.ModelViewSet):
         response_serializer = OrderSerializer(order)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
     
+    @action(detail=False, methods=['get'], url_path=r'intake/(?P<ticket>[0-9a-f-]{36})')
+    def intake_status(self, request, ticket=None):
+        """Статус заявки, принятой в режиме очереди"""
+        intake = get_object_or_404(
+            OrderIntake.objects.select_related('order'), ticket=ticket
+        )
+        return Response(OrderIntakeSerializer(intake).data)
+    
     @action(detail=True, methods=['get'])
     def status_history(self, request, pk=None):
         """Получить историю статусов заказа"""
@@ -80,21 +164,306 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        old_status = order.status
-        order.status = new_status
-        order.save()
+        # Статус, который видел оператор (для обнаружения параллельных изменений)
+        expected_status = request.data.get('expected_status') or order.status
+        if expected_status != order.status:
+            return Response(
+                {
+                    'error': 'Статус заказа уже изменен другим пользователем',
+                    'current_status': order.status
+                }, 
+                status=status.HTTP_409_CONFLICT
+            )
         
-        # Записываем в историю
-        OrderStatusHistory.objects.create(
-            order=order,
-            status=new_status,
-            comment=comment,
-            created_by=request.user if request.user.is_authenticated else None
-        )
+        if not Order.can_transition(order.status, new_status):
+            return Response(
+                {
+                    'error': f"Переход из статуса '{order.status}' в '{new_status}' недопустим. "
+                             f"Доступные: {Order.STATUS_TRANSITIONS[order.status]}"
+                }, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            changed = order.transition_status(
+                new_status,
+                comment=comment,
+                user=request.user if request.user.is_authenticated else None
+            )
+        if not changed:
+            return Response(
+                {
+                    'error': 'Статус заказа уже изменен другим пользователем',
+                    'current_status': Order.objects.values_list('status', flat=True).get(pk=order.pk)
+                }, 
+                status=status.HTTP_409_CONFLICT
+            )
         
         serializer = OrderSerializer(order)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """Массово перевести заказы в новый статус"""
+        from django.db.models import Q
+        
+        serializer = OrderBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data.get('ids', []))
+        order_numbers = set(serializer.validated_data.get('order_numbers', []))
+        new_status = serializer.validated_data['status']
+        comment = serializer.validated_data['comment']
+        user = request.user if request.user.is_authenticated else None
+        
+        with transaction.atomic():
+            # Блокируем выбранные заказы, чтобы статус не изменился до UPDATE
+            rows = list(
+                Order.objects.select_for_update()
+                .filter(Q(id__in=ids) | Q(order_number__in=order_numbers))
+                .order_by('id')
+                .values_list('id', 'order_number', 'status')
+            )
+            
+            results = []
+            updated_ids = []
+            events = []
+            for order_id, order_number, old_status in rows:
+                if old_status == new_status:
+                    result = 'unchanged'
+                elif Order.can_transition(old_status, new_status):
+                    result = 'updated'
+                    updated_ids.append(order_id)
+                    events.append(OrderEvent(
+                        order_id=order_id,
+                        order_number=order_number,
+                        event_type=OrderEvent.EVENT_STATUS_CHANGED,
+                        payload={'old_status': old_status, 'new_status': new_status}
+                    ))
+                else:
+                    result = 'not_allowed'
+                results.append({
+                    'id': order_id,
+                    'order_number': order_number,
+                    'old_status': old_status,
+                    'result': result,
+                })
+            
+            if updated_ids:
+                Order.objects.filter(id__in=updated_ids).update(
+                    status=new_status,
+                    updated_at=timezone.now()
+                )
+                OrderStatusHistory.objects.bulk_create([
+                    OrderStatusHistory(
+                        order_id=order_id,
+                        status=new_status,
+                        comment=comment,
+                        created_by=user
+                    )
+                    for order_id in updated_ids
+                ], batch_size=1000)
+                OrderEvent.objects.bulk_create(events, batch_size=1000)
+                if new_status == 'cancelled':
+                    record_order_sales(updated_ids, SIGN_CANCELLED)
+                publish_status_changes([
+                    {'order_id': event.order_id, 'order_number': event.order_number, **event.payload}
+                    for event in events
+                ])
+        
+        found_ids = {row[0] for row in rows}
+        found_numbers = {row[1] for row in rows}
+        return Response({
+            'status': new_status,
+            'updated': len(updated_ids),
+            'results': results,
+            'not_found': {
+                'ids': sorted(ids - found_ids),
+                'order_numbers': sorted(order_numbers - found_numbers),
+            },
+        })
+    
+    @action(detail=False, methods=['get'])
+    def events(self, request):
+        """
+        Журнал событий заказов после курсора after в порядке фиксации
+        транзакций. Курсор — "<txid>-<id>" последнего полученного события;
+        прежний целочисленный курсор (id события) тоже принимается.
+        """
+        from datetime import timedelta
+        from django.db.models import Q
+        
+        after = request.query_params.get('after', '0')
+        try:
+            if '-' in after:
+                after_txid, after_id = (int(value) for value in after.split('-', 1))
+            else:
+                after_id = int(after)
+                after_txid = OrderEvent.objects.filter(id=after_id).values_list(
+                    'txid', flat=True
+                ).first() or 0
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            return Response(
+                {'error': 'Параметр after должен быть курсором, limit — целым числом'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, 1000))
+        
+        queryset = OrderEvent.objects.filter(
+            Q(txid__gt=after_txid) | Q(txid=after_txid, id__gt=after_id)
+        )
+        if connection.vendor == 'postgresql':
+            # Отдаем только события транзакций, старше которых нет незафиксированных:
+            # позже в журнале не появится событие раньше курсора
+            queryset = queryset.filter(txid__lt=OrderEvent.committed_horizon())
+        else:
+            # Без номеров транзакций: не отдаем самые свежие события, чтобы курсор
+            # не перепрыгнул через транзакции короче ORDER_EVENTS_SETTLE_SECONDS
+            settled_before = timezone.now() - timedelta(
+                seconds=settings.ORDER_EVENTS_SETTLE_SECONDS
+            )
+            queryset = queryset.filter(created_at__lt=settled_before)
+        events = list(queryset.order_by('txid', 'id')[:limit + 1])
+        has_more = len(events) > limit
+        events = events[:limit]
+        
+        if events:
+            after_txid, after_id = events[-1].txid, events[-1].id
+        serializer = OrderEventSerializer(events, many=True)
+        return Response({
+            'events': serializer.data,
+            'next_cursor': f'{after_txid}-{after_id}',
+            'has_more': has_more,
+        })
+    
+    EXPORT_COLUMNS = [
+        ('order_number', 'Номер заказа'),
+        ('created_at', 'Дата создания'),
+        ('status', 'Статус'),
+        ('customer_name', 'Клиент'),
+        ('customer_phone', 'Телефон'),
+        ('customer_email', 'Email'),
+        ('delivery_city', 'Город'),
+        ('order_total', 'Сумма заказа'),
+        ('part_id', 'ID запчасти'),
+        ('part_title', 'Наименование'),
+        ('part_brand_name', 'Бренд'),
+        ('part_original_number', 'Оригинальный номер'),
+        ('quantity', 'Количество'),
+        ('unit_price', 'Цена за единицу'),
+        ('total_price', 'Сумма позиции'),
+    ]
+    EXPORT_CHUNK_SIZE = 2000
+    EXPORT_CONTENT_TYPES = {
+        'csv': 'text/csv; charset=utf-8',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'jsonl': 'application/x-ndjson',
+    }
+    
+    def perform_content_negotiation(self, request, force=False):
+        """
+        Формат выгрузки задается параметром ?format=, а не заголовком Accept:
+        клиент с Accept: application/json получает файл, а не 406. Ошибки
+        выгрузки (401, 403, 400) отдаются в JSON.
+        """
+        if self.action == 'export':
+            renderer = JSONRenderer()
+            return (renderer, renderer.media_type)
+        return super().perform_content_negotiation(request, force)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Потоковая выгрузка заказов с позициями (csv, xlsx, jsonl)"""
+        from django.db.models import F
+        
+        export_format = request.query_params.get('format', 'csv')
+        if export_format not in self.EXPORT_CONTENT_TYPES:
+            return Response(
+                {'error': f'Формат выгрузки: {", ".join(self.EXPORT_CONTENT_TYPES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Фильтры заказов (статус, даты и т.д.) применяются подзапросом
+        orders = self.filter_queryset(Order.objects.all()).order_by().values('id')
+        rows = (
+            OrderItem.objects.filter(order__in=orders)
+            .order_by('order__created_at', 'order_id', 'id')
+            .annotate(
+                order_number=F('order__order_number'),
+                created_at=F('order__created_at'),
+                status=F('order__status'),
+                customer_name=F('order__customer_name'),
+                customer_phone=F('order__customer_phone'),
+                customer_email=F('order__customer_email'),
+                delivery_city=F('order__delivery_city'),
+                order_total=F('order__total_amount'),
+            )
+            .values_list(*[name for name, _ in self.EXPORT_COLUMNS])
+            .iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
+        )
+        
+        filename = f"orders_{timezone.now():%Y%m%d_%H%M%S}.{export_format}"
+        if export_format == 'xlsx':
+            response = FileResponse(
+                self._export_xlsx(rows),
+                as_attachment=True,
+                filename=filename,
+                content_type=self.EXPORT_CONTENT_TYPES['xlsx']
+            )
+        elif export_format == 'jsonl':
+            response = StreamingHttpResponse(
+                self._export_jsonl(rows), content_type=self.EXPORT_CONTENT_TYPES['jsonl']
+            )
+        else:
+            response = StreamingHttpResponse(
+                self._export_csv(rows), content_type=self.EXPORT_CONTENT_TYPES['csv']
+            )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    def _export_csv(self, rows):
+        writer = csv.writer(Echo(), delimiter=';')
+        # BOM, чтобы Excel правильно определил кодировку
+        yield '\ufeff' + writer.writerow([title for _, title in self.EXPORT_COLUMNS])
+        for row in rows:
+            row = list(row)
+            row[1] = timezone.localtime(row[1]).strftime('%Y-%m-%d %H:%M:%S')
+            yield writer.writerow(row)
+    
+    def _export_jsonl(self, rows):
+        names = [name for name, _ in self.EXPORT_COLUMNS]
+        for row in rows:
+            yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+    
+    def _export_xlsx(self, rows):
+        """XLSX собирается в write-only режиме во временный файл (память не растет)"""
+        from openpyxl import Workbook
+        
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Заказы')
+        worksheet.append([title for _, title in self.EXPORT_COLUMNS])
+        for row in rows:
+            row = list(row)
+            # Excel не поддерживает даты с часовым поясом
+            row[1] = timezone.localtime(row[1]).replace(tzinfo=None)
+            worksheet.append(row)
+        
+        output = tempfile.TemporaryFile()
+        workbook.save(output)
+        output.seek(0)
+        return output
+    
+    @action(detail=False, methods=['get'])
+    def cities(self, request):
+        """Города из справочника для фильтра оператора (?q= — начало названия)"""
+        cities = DeliveryCity.objects.all()
+        query = request.query_params.get('q', '')
+        if query:
+            cities = cities.filter(
+                normalized_name__startswith=DeliveryCity.normalize_name(query)
+            )
+        return Response(list(cities.values('id', 'name')[:20]))
+    
     @action(detail=False, methods=['get'])
     def by_phone(self, request):
         """Получить заказы по номеру телефона"""
@@ -105,32 +474,97 @@ class OrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        orders = self.get_queryset().filter(customer_phone=phone)
-        serializer = OrderListSerializer(orders, many=True)
-        return Response(serializer.data)
+        phone = Order.normalize_phone(phone)
+        orders = self.get_queryset().filter(customer_phone_normalized=phone)
+        # Архивные заказы клиента — после рабочих, как в customer_history
+        archived = ArchivedOrder.objects.filter(
+            customer_phone_normalized=phone
+        ).defer('data').order_by('-created_at')
+        return Response(
+            OrderListSerializer(orders, many=True).data
+            + ArchivedOrderListSerializer(archived, many=True).data
+        )
+    
+    @action(detail=False, methods=['get'])
+    def customer_history(self, request):
+        """История заказов клиента с курсорной пагинацией и агрегатами"""
+        from django.db.models import Count, Sum, Q
+        
+        phone = Order.normalize_phone(request.query_params.get('phone'))
+        if not phone:
+            return Response(
+                {'error': 'Номер телефона не указан'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        orders = Order.objects.filter(customer_phone_normalized=phone)
+        
+        # Агрегаты считаются по индексу (customer_phone_normalized, created_at)
+        aggregates = orders.aggregate(
+            orders_count=Count('id'),
+            lifetime_total=Sum('total_amount', filter=~Q(status='cancelled'))
+        )
+        
+        paginator = OrderCursorPagination()
+        page = paginator.paginate_queryset(
+            orders.prefetch_related('items'), request, view=self
+        )
+        serializer = OrderListSerializer(page, many=True)
+        response = paginator.get_paginated_response(serializer.data)
+        
+        # Архивные заказы учитываются в агрегатах клиента
+        archived = ArchivedOrder.objects.filter(customer_phone_normalized=phone).aggregate(
+            orders_count=Count('id'),
+            lifetime_total=Sum('total_amount', filter=~Q(status='cancelled'))
+        )
+        response.data['customer'] = {
+            'phone': phone,
+            'orders_count': aggregates['orders_count'] + archived['orders_count'],
+            'archived_orders_count': archived['orders_count'],
+            'lifetime_total': float(
+                (aggregates['lifetime_total'] or 0) + (archived['lifetime_total'] or 0)
+            ),
+        }
+        return response
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Получить статистику заказов"""
-        from django.db.models import Count, Sum, Avg
+        """Получить статистику заказов (с учетом архива)"""
+        from django.db.models import Count, Sum
         from django.utils import timezone
         from datetime import timedelta
         
-        # Общая статистика
-        total_orders = Order.objects.count()
-        total_amount = Order.objects.aggregate(total=Sum('total_amount'))['total'] or 0
+        # Общая статистика (рабочая таблица и архив)
+        totals = self._sum_aggregates(
+            model.objects.aggregate(count=Count('id'), total=Sum('total_amount'))
+            for model in (Order, ArchivedOrder)
+        )
+        total_orders = totals['count']
+        total_amount = totals['total']
         
         # Статистика по статусам
-        status_stats = Order.objects.values('status').annotate(count=Count('id'))
+        status_counts = {}
+        for model in (Order, ArchivedOrder):
+            for row in model.objects.values('status').annotate(count=Count('id')).order_by():
+                status_counts[row['status']] = status_counts.get(row['status'], 0) + row['count']
+        status_stats = [
+            {'status': status_value, 'count': count}
+            for status_value, count in status_counts.items()
+        ]
         
         # Статистика за последние 30 дней
         thirty_days_ago = timezone.now() - timedelta(days=30)
-        recent_orders = Order.objects.filter(created_at__gte=thirty_days_ago)
-        recent_count = recent_orders.count()
-        recent_amount = recent_orders.aggregate(total=Sum('total_amount'))['total'] or 0
+        recent = self._sum_aggregates(
+            model.objects.filter(created_at__gte=thirty_days_ago).aggregate(
+                count=Count('id'), total=Sum('total_amount')
+            )
+            for model in (Order, ArchivedOrder)
+        )
+        recent_count = recent['count']
+        recent_amount = recent['total']
         
         # Средний чек
-        avg_order_amount = Order.objects.aggregate(avg=Avg('total_amount'))['avg'] or 0
+        avg_order_amount = total_amount / total_orders if total_orders else 0
         
         return Response({
             'total_orders': total_orders,
@@ -142,6 +576,15 @@ class OrderViewSet(viewsets.ModelViewSet):
                 'total_amount': float(recent_amount)
             }
         })
+    
+    @staticmethod
+    def _sum_aggregates(aggregates):
+        """Складывает агрегаты count/total рабочей таблицы и архива"""
+        result = {'count': 0, 'total': 0}
+        for aggregate in aggregates:
+            result['count'] += aggregate['count']
+            result['total'] += aggregate['total'] or 0
+        return result
 
 
 class OrderStatusHistoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -159,9 +602,101 @@ class OrderStatusHistoryViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
+class CartViewSet(viewsets.ViewSet):
+    """ViewSet для расчета и резерва корзины"""
+    throttle_scope = 'cart_reserve'
+    
+    def get_permissions(self):
+        """Расчет доступен всем; резерв — только авторизованным клиентам"""
+        if self.action == 'quote':
+            return [AllowAny()]
+        return [IsAuthenticated()]
+    
+    def get_throttles(self):
+        """Частота резервов ограничена на клиента (DEFAULT_THROTTLE_RATES['cart_reserve'])"""
+        if self.action == 'reserve':
+            return [ScopedRateThrottle()]
+        return super().get_throttles()
+    
+    @action(detail=False, methods=['post'])
+    def quote(self, request):
+        """Рассчитать цены, доступность и итог корзины одним запросом"""
+        data = request.data
+        if isinstance(data, list):
+            data = {'items': data}
+        serializer = CartQuoteSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        
+        quote = quote_items(serializer.validated_data['items'])
+        return Response(CartQuoteResultSerializer(quote).data)
+    
+    @action(detail=False, methods=['post'])
+    def reserve(self, request):
+        """Временно зарезервировать позиции корзины (на CART_RESERVATION_TTL_MINUTES)"""
+        serializer = CartReserveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        result = reserve_items(
+            serializer.validated_data['items'],
+            user=request.user,
+            token=serializer.validated_data.get('token')
+        )
+        return Response(result)
+    
+    @action(detail=False, methods=['post'])
+    def release(self, request):
+        """Снять свой резерв корзины досрочно"""
+        serializer = CartReleaseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        released = release_token(serializer.validated_data['token'], user=request.user)
+        return Response({'released': released})
 
 
+async def order_status_stream(request, order_number):
+    """
+    Поток server-sent events с изменениями статуса заказа.
+    Работает только под ASGI: соединение не занимает рабочий процесс.
+    Доступ — по токену заказа (?token=, выдается при создании заказа) или
+    авторизованному пользователю.
+    """
+    if not check_stream_token(order_number, request.GET.get('token', '')):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return JsonResponse({'error': 'Нужен токен заказа'}, status=403)
+    
+    order = await Order.objects.filter(order_number=order_number).values('id').afirst()
+    if order is None:
+        return JsonResponse({'error': 'Заказ не найден'}, status=404)
+    order_id = order['id']
+    
+    async def event_stream():
+        # Подписываемся до чтения статуса, чтобы не пропустить изменение между ними
+        async with broker.subscribe(order_id) as queue:
+            current = await Order.objects.filter(id=order_id).values('status').afirst()
+            current_status = current['status']
+            yield _sse_message('status', {
+                'order_id': order_id,
+                'order_number': order_number,
+                'new_status': current_status,
+            })
+            while current_status not in ('delivered', 'cancelled'):
+                try:
+                    payload = await asyncio.wait_for(
+                        queue.get(), timeout=settings.ORDER_STREAM_KEEPALIVE_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                current_status = payload['new_status']
+                yield _sse_message('status', payload)
+    
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
-
-
+def _sse_message(event, data):
+    """Форматирует сообщение server-sent events"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
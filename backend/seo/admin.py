@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import SeoPage, SeoSettings
+from .models import GeneratedMeta, SeoPage, SeoSettings
 
 
 @admin.register(SeoPage)
@@ -58,9 +58,13 @@ class SeoSettingsAdmin(admin.ModelAdmin):
         return False
 
 
-
-
-
-
-
-
+@admin.register(GeneratedMeta)
+class GeneratedMetaAdmin(admin.ModelAdmin):
+    list_display = ['key', 'title', 'source_updated_at', 'generated_at']
+    list_filter = ['kind']
+    search_fields = ['key', 'title']
+    readonly_fields = [field.name for field in GeneratedMeta._meta.fields]
+    
+    def has_add_permission(self, request):
+        # Записи собирает команда build_seo_meta
+        return False
@@ -0,0 +1,213 @@
+"""
+SEO метаданные страниц запчастей и брендов по шаблону (GeneratedMeta)
+
+Метаданные собираются пачками заранее, а не при запросе страницы: для
+запчасти — название, бренд, номер, цена и наличие, canonical и OG-изображение
+(главное PartImage). Повторная сборка берет только запчасти, у которых
+updated_at новее собранной версии, и удаляет записи неактивных запчастей;
+устаревшую запись запчасти get_meta пересобирает сам при запросе.
+Бренды немногочисленны и пересобираются всегда.
+"""
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .cache import seo_cache
+from .models import GeneratedMeta
+from .sitemaps import site_base_url
+
+TITLE_MAX = 60
+DESCRIPTION_MAX = 160
+# Название сайта в заголовке обрезается, чтобы осталось место для названия страницы
+TITLE_SITE_NAME_MAX = 25
+
+
+def clip(text, limit):
+    """Обрезает текст по границе слова до limit символов"""
+    text = ' '.join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1].rsplit(' ', 1)[0].rstrip(' ,.;:—-') + '…'
+
+
+def _title(name, site_name):
+    suffix = f' — {clip(site_name, TITLE_SITE_NAME_MAX)}'
+    return clip(name, TITLE_MAX - len(suffix)) + suffix
+
+
+def _default_og_image(site):
+    return site.default_og_image.url if site.default_og_image else None
+
+
+def part_meta(part, site, base_url):
+    """GeneratedMeta для запчасти (с select_related('brand') и main_image_url)"""
+    name = ' '.join(filter(None, [part.title, part.brand.name, part.original_number]))
+    availability = 'в наличии' if part.available > 0 else 'под заказ'
+    description = clip(
+        f'{name}: цена {part.price_opt:.0f} ₽, {availability}. '
+        f'Купить в интернет-магазине {site.site_name} с доставкой по России.',
+        DESCRIPTION_MAX
+    )
+    title = _title(name, site.site_name)
+    return GeneratedMeta(
+        key=GeneratedMeta.make_key(GeneratedMeta.KIND_PART, part.id),
+        kind=GeneratedMeta.KIND_PART,
+        object_id=part.id,
+        title=title,
+        description=description,
+        keywords=', '.join(dict.fromkeys(filter(None, [
+            part.title, part.brand.name, part.original_number, part.manufacturer_number
+        ])))[:255],
+        og_title=title,
+        og_description=description,
+        og_image_url=part.main_image_url or _default_og_image(site),
+        canonical_url=f'{base_url}/catalog/part/{part.id}/',
+        source_updated_at=part.updated_at,
+        generated_at=timezone.now(),
+    )
+
+
+def brand_meta(brand, site, base_url):
+    """GeneratedMeta для бренда (с аннотацией parts_count)"""
+    title = _title(f'Запчасти {brand.name}', site.site_name)
+    origin = f' ({brand.country})' if brand.country else ''
+    description = clip(
+        f'Автозапчасти {brand.name}{origin} в каталоге {site.site_name}, позиций: '
+        f'{brand.parts_count}. Оригинальные номера, цены и наличие, доставка по России.',
+        DESCRIPTION_MAX
+    )
+    return GeneratedMeta(
+        key=GeneratedMeta.make_key(GeneratedMeta.KIND_BRAND, brand.id),
+        kind=GeneratedMeta.KIND_BRAND,
+        object_id=brand.id,
+        title=title,
+        description=description,
+        keywords=f'запчасти {brand.name}, автозапчасти {brand.name}',
+        og_title=title,
+        og_description=description,
+        og_image_url=_default_og_image(site),
+        canonical_url=f'{base_url}/catalog/brand/{brand.id}/',
+        generated_at=timezone.now(),
+    )
+
+
+def _save(metas):
+    GeneratedMeta.objects.bulk_create(
+        metas,
+        update_conflicts=True,
+        unique_fields=['key'],
+        update_fields=GeneratedMeta.META_FIELDS + ['source_updated_at', 'generated_at'],
+    )
+
+
+def _parts_with_images():
+    from catalog.models import Part, PartImage
+
+    return Part.objects.filter(is_active=True).select_related('brand').annotate(
+        main_image_url=PartImage.main_image_url_subquery()
+    )
+
+
+def build_part_meta(part_ids=None, full=False, batch_size=1000):
+    """
+    Собирает метаданные запчастей: part_ids — только указанные, иначе все
+    изменившиеся (или все при full). Возвращает число собранных записей.
+    """
+    from catalog.models import Part
+
+    site = seo_cache.settings()
+    base_url = site_base_url()
+
+    pending = Part.objects.filter(is_active=True)
+    if part_ids is not None:
+        pending = pending.filter(id__in=part_ids)
+    elif not full:
+        stored = GeneratedMeta.objects.filter(
+            kind=GeneratedMeta.KIND_PART, object_id=OuterRef('pk')
+        ).values('source_updated_at')[:1]
+        pending = pending.annotate(meta_updated_at=Subquery(stored)).filter(
+            Q(meta_updated_at__isnull=True) | Q(updated_at__gt=F('meta_updated_at'))
+        )
+
+    built = 0
+    last_id = 0
+    while True:
+        batch_ids = list(
+            pending.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not batch_ids:
+            break
+        last_id = batch_ids[-1]
+        _save([
+            part_meta(part, site, base_url)
+            for part in _parts_with_images().filter(id__in=batch_ids)
+        ])
+        built += len(batch_ids)
+    return built
+
+
+def build_brand_meta(brand_ids=None):
+    """Собирает метаданные брендов: brand_ids — только указанные, иначе все"""
+    from catalog.models import Brand
+
+    site = seo_cache.settings()
+    base_url = site_base_url()
+    brands = Brand.objects.annotate(parts_count=Count('parts', filter=Q(parts__is_active=True)))
+    if brand_ids is not None:
+        brands = brands.filter(id__in=brand_ids)
+    metas = [brand_meta(brand, site, base_url) for brand in brands]
+    _save(metas)
+    return len(metas)
+
+
+def remove_stale_meta():
+    """Удаляет метаданные неактивных и удаленных запчастей и брендов"""
+    from catalog.models import Brand, Part
+
+    removed, _ = GeneratedMeta.objects.filter(
+        Q(kind=GeneratedMeta.KIND_PART) & ~Q(object_id__in=Part.objects.filter(is_active=True).values('id'))
+        | Q(kind=GeneratedMeta.KIND_BRAND) & ~Q(object_id__in=Brand.objects.values('id'))
+    ).delete()
+    return removed
+
+
+def build_generated_meta(full=False, batch_size=1000):
+    """Полный проход: запчасти (изменившиеся или все), бренды, удаление устаревших"""
+    return {
+        'parts': build_part_meta(full=full, batch_size=batch_size),
+        'brands': build_brand_meta(),
+        'removed': remove_stale_meta(),
+    }
+
+
+def get_meta(kind, object_id):
+    """
+    Метаданные страницы одним поиском по ключу; если запись еще не собрана
+    или запчасть изменилась после сборки (цена, наличие) — собирает только
+    этот объект. Для несуществующего или неактивного объекта — None.
+    """
+    from catalog.models import Part
+
+    key = GeneratedMeta.make_key(kind, object_id)
+    fields = GeneratedMeta.META_FIELDS
+    stored = GeneratedMeta.objects.filter(key=key)
+    if kind == GeneratedMeta.KIND_PART:
+        # Версия запчасти тем же запросом, что и запись
+        stored = stored.annotate(part_updated_at=Subquery(
+            Part.objects.filter(pk=OuterRef('object_id')).values('updated_at')[:1]
+        ))
+        data = stored.values(*fields, 'source_updated_at', 'part_updated_at').first()
+        if data is not None:
+            source_updated_at = data.pop('source_updated_at')
+            part_updated_at = data.pop('part_updated_at')
+            if source_updated_at is None or (part_updated_at and part_updated_at > source_updated_at):
+                data = None
+    else:
+        data = stored.values(*fields).first()
+    if data is None:
+        if kind == GeneratedMeta.KIND_PART:
+            built = build_part_meta(part_ids=[object_id])
+        else:
+            built = build_brand_meta(brand_ids=[object_id])
+        if built:
+            data = GeneratedMeta.objects.filter(key=key).values(*fields).first()
+    return data
@@ -0,0 +1,78 @@
+"""
+Кэш SEO-данных в памяти процесса
+
+Настройки и активные SEO-страницы (уже сериализованные, по slug) хранятся в
+процессе и загружаются одним запросом на каждую версию данных. Версия лежит
+в общем кэше Django (VERSION_KEY): сохранение или удаление SeoPage/SeoSettings
+меняет ее после коммита, и каждый процесс при следующем обращении видит новую
+версию и перечитывает данные. Пока версия не изменилась, мета-запросы
+обслуживаются без обращения к БД.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'seo:version'
+
+
+class SeoMetaCache:
+    """Настройки и SEO-страницы в памяти процесса с общей меткой версии"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._settings = None
+        self._pages = None
+
+    def _current_version(self):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    def _sync(self):
+        version = self._current_version()
+        if version != self._version:
+            self._version = version
+            self._settings = None
+            self._pages = None
+
+    def version(self):
+        """Текущая общая версия SEO-данных (для ключей производных кэшей)"""
+        return self._current_version()
+
+    def settings(self):
+        """Единственная запись SeoSettings"""
+        from .models import SeoSettings
+
+        with self._lock:
+            self._sync()
+            if self._settings is None:
+                self._settings = SeoSettings.get_settings()
+            return self._settings
+
+    def page(self, slug):
+        """Сериализованная активная SEO-страница или None"""
+        from .models import SeoPage
+        from .serializers import SeoPageSerializer
+
+        with self._lock:
+            self._sync()
+            if self._pages is None:
+                self._pages = {
+                    page.slug: SeoPageSerializer(page).data
+                    for page in SeoPage.objects.filter(is_active=True)
+                }
+            return self._pages.get(slug)
+
+    def invalidate(self):
+        """Меняет общую версию после коммита текущей транзакции"""
+        transaction.on_commit(
+            lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        )
+
+
+seo_cache = SeoMetaCache()
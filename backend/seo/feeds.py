@@ -0,0 +1,154 @@
+"""
+Товарный фид в формате YML (Яндекс.Маркет) в SEO_FILES_ROOT
+
+Предложения (offer) активных запчастей пишутся потоково из серверного
+курсора (iterator) в gzip-фрагменты по диапазонам id (YML_FEED_CHUNK_SIZE
+запчастей). Манифест хранит для каждого фрагмента число запчастей и
+последний updated_at: при повторной сборке перегенерируются только
+изменившиеся фрагменты. Итоговый файл склеивается из заголовка, фрагментов
+и окончания без повторного сжатия — gzip допускает несколько членов подряд,
+и распаковывается такой файл как один документ. Бренды, адрес и название
+сайта входят в подпись манифеста: при их изменении фид собирается целиком.
+"""
+import gzip
+import hashlib
+import json
+import shutil
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import seo_cache
+from .sitemaps import atomic_file, parts_signatures, read_manifest, seo_files_root, write_atomic
+
+FEED_NAME = 'yandex-market.yml.gz'
+FEED_MANIFEST_NAME = 'feed-manifest.json'
+FEED_CHUNKS_DIR = 'feed-chunks'
+
+CATEGORY_ID = 1
+CATEGORY_NAME = 'Автозапчасти'
+CURRENCY = 'RUR'
+
+FOOTER = '</offers>\n</shop>\n</yml_catalog>\n'
+
+OFFER_FIELDS = [
+    'id', 'title', 'description', 'original_number', 'available',
+    'price_opt', 'brand__name', 'main_image_url'
+]
+
+
+def feed_chunk_size():
+    return settings.YML_FEED_CHUNK_SIZE
+
+
+def chunk_name(chunk):
+    return f'offers-{chunk + 1}.xml.gz'
+
+
+def _offer(row, base_url):
+    part_id, title, description, number, available, price, vendor, picture = row
+    lines = [
+        f'<offer id="{part_id}" available="{"true" if available > 0 else "false"}">',
+        f'<url>{escape(base_url)}/catalog/part/{part_id}/</url>',
+        f'<price>{price}</price>',
+        f'<currencyId>{CURRENCY}</currencyId>',
+        f'<categoryId>{CATEGORY_ID}</categoryId>',
+    ]
+    if picture:
+        lines.append(f'<picture>{escape(picture)}</picture>')
+    lines.append(f'<vendor>{escape(vendor)}</vendor>')
+    if number:
+        lines.append(f'<vendorCode>{escape(number)}</vendorCode>')
+    lines.append(f'<name>{escape(title)}</name>')
+    if description:
+        lines.append(f'<description>{escape(description[:3000])}</description>')
+    lines.append(f'<count>{available}</count>')
+    lines.append('</offer>\n')
+    return ''.join(lines)
+
+
+def _offers(base_url, chunk):
+    from catalog.models import Part, PartImage
+
+    size = feed_chunk_size()
+    rows = (
+        Part.objects.filter(is_active=True, id__gt=chunk * size, id__lte=(chunk + 1) * size)
+        .annotate(main_image_url=PartImage.main_image_url_subquery())
+        .order_by('id')
+        .values_list(*OFFER_FIELDS)
+        .iterator(chunk_size=2000)
+    )
+    for row in rows:
+        yield _offer(row, base_url)
+
+
+def _header(base_url, site_name):
+    date = timezone.localtime().strftime('%Y-%m-%dT%H:%M:%S%z')
+    date = f'{date[:-2]}:{date[-2:]}'
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<yml_catalog date={quoteattr(date)}>\n<shop>\n'
+        f'<name>{escape(site_name)}</name>\n'
+        f'<company>{escape(site_name)}</company>\n'
+        f'<url>{escape(base_url)}</url>\n'
+        f'<currencies><currency id="{CURRENCY}" rate="1"/></currencies>\n'
+        f'<categories><category id="{CATEGORY_ID}">{CATEGORY_NAME}</category></categories>\n'
+        '<offers>\n'
+    )
+
+
+def _brands_signature():
+    from catalog.models import Brand
+
+    brands = list(Brand.objects.order_by('id').values_list('id', 'name'))
+    return hashlib.md5(repr(brands).encode('utf-8')).hexdigest()
+
+
+def build_yml_feed(base_url, full=False):
+    """
+    Собирает фид. Без full перегенерирует только изменившиеся фрагменты.
+    Возвращает {'built': [...], 'unchanged': N, 'removed': [...]}.
+    """
+    root = seo_files_root()
+    chunks_dir = root / FEED_CHUNKS_DIR
+    site_name = seo_cache.settings().site_name
+
+    manifest = read_manifest(root / FEED_MANIFEST_NAME)
+    context = {
+        'base_url': base_url,
+        'site_name': site_name,
+        'chunk_size': feed_chunk_size(),
+        'brands': _brands_signature(),
+    }
+    if any(manifest.get(key) != value for key, value in context.items()):
+        full = True
+    previous = {} if full else manifest.get('chunks', {})
+
+    signatures = parts_signatures(feed_chunk_size(), chunk_name)
+    built, unchanged = [], 0
+    for name, signature in signatures.items():
+        if previous.get(name) == signature and (chunks_dir / name).exists():
+            unchanged += 1
+            continue
+        write_atomic(chunks_dir / name, _offers(base_url, signature['shard']), compress=True)
+        built.append(name)
+
+    removed = []
+    for name in set(manifest.get('chunks', {})) - set(signatures):
+        (chunks_dir / name).unlink(missing_ok=True)
+        removed.append(name)
+
+    with atomic_file(root / FEED_NAME) as feed:
+        feed.write(gzip.compress(_header(base_url, site_name).encode('utf-8'), mtime=0))
+        for name in signatures:
+            with open(chunks_dir / name, 'rb') as chunk:
+                shutil.copyfileobj(chunk, feed)
+        feed.write(gzip.compress(FOOTER.encode('utf-8'), mtime=0))
+
+    write_atomic(root / FEED_MANIFEST_NAME, [json.dumps({
+        **context,
+        'built_at': timezone.now().isoformat(),
+        'chunks': signatures,
+    })])
+    return {'built': built, 'unchanged': unchanged, 'removed': removed}
@@ -0,0 +1,45 @@
+"""
+Готовые файлы для поисковых роботов в SEO_FILES_ROOT: robots.txt и карта сайта
+
+Файлы собирает команда build_seo_files (и импорт каталога после загрузки).
+В продакшене их отдает nginx прямо из общего каталога; если запрос все же
+дошел до Django и задан SEO_FILES_ACCEL_PREFIX, ответ — пустой с заголовком
+X-Accel-Redirect, и файл отправляет nginx.
+"""
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+
+from .sitemaps import INDEX_NAME, build_sitemaps, seo_files_root, site_base_url, write_atomic
+
+ROBOTS_NAME = 'robots.txt'
+
+ROBOTS_AGENTS = ['*', 'Yandex', 'Googlebot']
+
+
+def robots_lines(base_url):
+    for agent in ROBOTS_AGENTS:
+        yield f'User-agent: {agent}\nAllow: /\n\n'
+    yield f'Sitemap: {base_url}/{INDEX_NAME}\n'
+
+
+def build_robots(base_url):
+    write_atomic(seo_files_root() / ROBOTS_NAME, robots_lines(base_url))
+
+
+def build_seo_files(base_url=None, full=False):
+    """Собирает robots.txt и карту сайта; возвращает результат build_sitemaps"""
+    base_url = (base_url or site_base_url()).rstrip('/')
+    result = build_sitemaps(base_url, full=full)
+    build_robots(base_url)
+    result['built'].append(ROBOTS_NAME)
+    return result
+
+
+def serve_seo_file(name, content_type):
+    """Отдает готовый файл: через X-Accel-Redirect или, без nginx, из Python"""
+    prefix = settings.SEO_FILES_ACCEL_PREFIX
+    if prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{name}"
+        return response
+    return FileResponse(open(seo_files_root() / name, 'rb'), content_type=content_type)
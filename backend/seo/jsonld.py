@@ -0,0 +1,54 @@
+"""
+Разметка Schema.org (JSON-LD Product/Offer) для страницы запчасти
+
+Разметка собирается из запчасти с брендом и изображениями и кэшируется в
+кэше Django по ключу с updated_at запчасти: пока запчасть не изменилась
+(цена, остаток, изображения), страница получает готовый словарь из кэша.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .sitemaps import site_base_url
+
+SCHEMA_CONTEXT = 'https://schema.org'
+IN_STOCK = 'https://schema.org/InStock'
+OUT_OF_STOCK = 'https://schema.org/OutOfStock'
+NEW_CONDITION = 'https://schema.org/NewCondition'
+DESCRIPTION_MAX = 500
+
+
+def part_json_ld(part):
+    """JSON-LD Product для запчасти (brand и images — из select/prefetch_related)"""
+    url = f'{site_base_url()}/catalog/part/{part.id}/'
+    data = {
+        '@context': SCHEMA_CONTEXT,
+        '@type': 'Product',
+        'name': part.title,
+        'sku': str(part.id),
+        'brand': {'@type': 'Brand', 'name': part.brand.name},
+        'url': url,
+        'offers': {
+            '@type': 'Offer',
+            'url': url,
+            'priceCurrency': 'RUB',
+            'price': str(part.price_opt),
+            'availability': IN_STOCK if part.available > 0 else OUT_OF_STOCK,
+            'itemCondition': NEW_CONDITION,
+        },
+    }
+    if part.original_number:
+        data['mpn'] = part.original_number
+    images = [image.get_image_url for image in part.images.all() if image.get_image_url]
+    if images:
+        data['image'] = images
+    if part.description:
+        data['description'] = part.description[:DESCRIPTION_MAX]
+    return data
+
+
+def cached_part_json_ld(part):
+    """JSON-LD из кэша; при изменении запчасти (updated_at) собирается заново"""
+    key = f'seo:part-jsonld:{part.id}:{part.updated_at.timestamp()}'
+    return cache.get_or_set(
+        key, lambda: part_json_ld(part), timeout=settings.PART_JSON_LD_CACHE_SECONDS
+    )
@@ -0,0 +1,35 @@
+"""
+Management command для сборки файлов поисковых роботов (robots.txt, карта сайта)
+"""
+from django.core.management.base import BaseCommand
+
+from seo.files import build_seo_files
+from seo.sitemaps import seo_files_root
+
+
+class Command(BaseCommand):
+    help = 'Собирает robots.txt, sitemap.xml и шарды; без --full перегенерирует только изменившиеся шарды'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Перегенерировать все шарды'
+        )
+        parser.add_argument(
+            '--base-url',
+            type=str,
+            help='Адрес сайта для ссылок (по умолчанию: https://<домен из Sites>)'
+        )
+
+    def handle(self, *args, **options):
+        result = build_seo_files(options['base_url'], full=options['full'])
+
+        for name in result['built']:
+            self.stdout.write(f'Собран: {name}')
+        for name in result['removed']:
+            self.stdout.write(f'Удален: {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'\nФайлы для роботов готовы в {seo_files_root()}: собрано {len(result["built"])}, '
+            f'без изменений {result["unchanged"]}, удалено {len(result["removed"])}'
+        ))
@@ -0,0 +1,30 @@
+"""
+Management command для сборки SEO метаданных страниц запчастей и брендов
+"""
+from django.core.management.base import BaseCommand
+
+from seo.autometa import build_generated_meta
+
+
+class Command(BaseCommand):
+    help = 'Собирает SEO метаданные запчастей и брендов; без --full только для изменившихся запчастей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересобрать метаданные всех запчастей (например, после смены названия сайта)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество запчастей в одной пачке (по умолчанию: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        result = build_generated_meta(full=options['full'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'SEO метаданные собраны: запчастей {result["parts"]}, брендов {result["brands"]}, '
+            f'удалено устаревших {result["removed"]}'
+        ))
@@ -0,0 +1,34 @@
+"""
+Management command для сборки товарного фида YML (Яндекс.Маркет)
+"""
+from django.core.management.base import BaseCommand
+
+from seo.feeds import FEED_NAME, build_yml_feed
+from seo.sitemaps import seo_files_root, site_base_url
+
+
+class Command(BaseCommand):
+    help = 'Собирает фид yandex-market.yml.gz; без --full перегенерирует только изменившиеся фрагменты'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Перегенерировать все фрагменты'
+        )
+        parser.add_argument(
+            '--base-url',
+            type=str,
+            help='Адрес сайта для ссылок (по умолчанию: https://<домен из Sites>)'
+        )
+
+    def handle(self, *args, **options):
+        base_url = (options['base_url'] or site_base_url()).rstrip('/')
+        result = build_yml_feed(base_url, full=options['full'])
+
+        for name in result['removed']:
+            self.stdout.write(f'Удален фрагмент: {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Фид {seo_files_root() / FEED_NAME} готов: собрано фрагментов {len(result["built"])}, '
+            f'без изменений {result["unchanged"]}, удалено {len(result["removed"])}'
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneratedMeta',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False, verbose_name='Ключ')),
+                ('kind', models.CharField(choices=[('part', 'Запчасть'), ('brand', 'Бренд')], max_length=10, verbose_name='Тип страницы')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID объекта')),
+                ('title', models.CharField(max_length=60, verbose_name='Title')),
+                ('description', models.CharField(max_length=160, verbose_name='Description')),
+                ('keywords', models.CharField(blank=True, max_length=255, verbose_name='Keywords')),
+                ('og_title', models.CharField(max_length=60, verbose_name='OG Title')),
+                ('og_description', models.CharField(max_length=160, verbose_name='OG Description')),
+                ('og_image_url', models.URLField(blank=True, max_length=500, null=True, verbose_name='OG Image URL')),
+                ('canonical_url', models.URLField(max_length=500, verbose_name='Canonical URL')),
+                ('robots', models.CharField(default='index, follow', max_length=100, verbose_name='Robots')),
+                ('source_updated_at', models.DateTimeField(blank=True, help_text='updated_at запчасти, по которой собраны метаданные', null=True, verbose_name='Версия объекта')),
+                ('generated_at', models.DateTimeField(verbose_name='Дата сборки')),
+            ],
+            options={
+                'verbose_name': 'Сгенерированные SEO метаданные',
+                'verbose_name_plural': 'Сгенерированные SEO метаданные',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
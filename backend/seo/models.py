@@ -1,6 +1,8 @@
 from django.db import models
 from django.utils import timezone
 from django.core.validators import MaxLengthValidator
+from gooddrive_backend.httpcache import purge_dispatcher
+from .cache import seo_cache
 
 
 class SeoPage(models.Model):
@@ -90,6 +92,17 @@ class SeoPage(models.Model):
     def __str__(self):
         return f"{self.slug} - {self.title}"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        seo_cache.invalidate()
+        purge_dispatcher.purge('seo', f'seo-page:{self.slug}')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        seo_cache.invalidate()
+        purge_dispatcher.purge('seo', f'seo-page:{self.slug}')
+        return result
+    
     @property
     def get_og_image_url(self):
         """Возвращает URL изображения для Open Graph"""
@@ -168,6 +181,14 @@ class SeoSettings(models.Model):
         if not self.pk and SeoSettings.objects.exists():
             return
         super().save(*args, **kwargs)
+        seo_cache.invalidate()
+        purge_dispatcher.purge('seo')
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        seo_cache.invalidate()
+        purge_dispatcher.purge('seo')
+        return result
     
     @classmethod
     def get_settings(cls):
@@ -187,3 +208,56 @@ class SeoSettings(models.Model):
 
 
 
+
+
+class GeneratedMeta(models.Model):
+    """
+    SEO метаданные страниц запчастей и брендов, собранные по шаблону.
+    Заполняется командой build_seo_meta (и импортом каталога); API отдает
+    запись одним поиском по ключу вида 'part:123'.
+    """
+    KIND_PART = 'part'
+    KIND_BRAND = 'brand'
+    KIND_CHOICES = [
+        (KIND_PART, 'Запчасть'),
+        (KIND_BRAND, 'Бренд'),
+    ]
+
+    key = models.CharField(max_length=40, primary_key=True, verbose_name="Ключ")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Тип страницы")
+    object_id = models.PositiveIntegerField(verbose_name="ID объекта")
+
+    title = models.CharField(max_length=60, verbose_name="Title")
+    description = models.CharField(max_length=160, verbose_name="Description")
+    keywords = models.CharField(max_length=255, blank=True, verbose_name="Keywords")
+    og_title = models.CharField(max_length=60, verbose_name="OG Title")
+    og_description = models.CharField(max_length=160, verbose_name="OG Description")
+    og_image_url = models.URLField(max_length=500, blank=True, null=True, verbose_name="OG Image URL")
+    canonical_url = models.URLField(max_length=500, verbose_name="Canonical URL")
+    robots = models.CharField(max_length=100, default="index, follow", verbose_name="Robots")
+
+    source_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Версия объекта",
+        help_text="updated_at запчасти, по которой собраны метаданные"
+    )
+    generated_at = models.DateTimeField(verbose_name="Дата сборки")
+
+    # Поля ответа /api/meta/<тип>/<id>/
+    META_FIELDS = [
+        'title', 'description', 'keywords', 'og_title', 'og_description',
+        'og_image_url', 'canonical_url', 'robots'
+    ]
+
+    class Meta:
+        verbose_name = "Сгенерированные SEO метаданные"
+        verbose_name_plural = "Сгенерированные SEO метаданные"
+        unique_together = ['kind', 'object_id']
+
+    def __str__(self):
+        return f"{self.key} - {self.title}"
+
+    @staticmethod
+    def make_key(kind, object_id):
+        return f"{kind}:{object_id}"
@@ -0,0 +1,27 @@
+"""
+Обновление SEO после импорта каталога (команды import_parts и import_from_csv)
+"""
+from gooddrive_backend.httpcache import purge_dispatcher
+
+from .autometa import build_generated_meta
+from .feeds import build_yml_feed
+from .files import build_seo_files
+from .sitemaps import site_base_url
+
+
+def rebuild_after_import(skip_files=False, log=print):
+    """
+    Сбрасывает списки каталога и SEO-настройки в HTTP-микрокэше nginx и, если
+    не skip_files, пересобирает SEO метаданные, карту сайта, robots.txt и фид
+    YML (только измененное). Итог каждого шага передается в log.
+    """
+    purge_dispatcher.purge_now('catalog', 'seo')
+    if skip_files:
+        return
+
+    meta = build_generated_meta()
+    log(f'SEO метаданные обновлены: запчастей {meta["parts"]}, брендов {meta["brands"]}')
+    result = build_seo_files()
+    log(f'Карта сайта обновлена: собрано файлов {len(result["built"])}')
+    result = build_yml_feed(site_base_url())
+    log(f'Фид YML обновлен: собрано фрагментов {len(result["built"])}')
@@ -0,0 +1,211 @@
+"""
+Карта сайта: индекс sitemap.xml и gzip-шарды в SEO_FILES_ROOT
+
+Запчасти разбиты на шарды по диапазонам id (SITEMAP_SHARD_SIZE id на шард,
+поэтому в шарде не больше 50 000 URL). Шард пишется потоково из
+values_list().iterator() во временный gzip-файл и атомарно подменяет старый.
+Манифест хранит для каждого шарда число активных запчастей и максимальный
+updated_at: при повторной сборке перегенерируются только шарды, у которых
+они изменились.
+"""
+import gzip
+import json
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+# Ограничение протокола sitemaps.org на число URL в одном файле
+MAX_URLS_PER_SITEMAP = 50000
+
+INDEX_NAME = 'sitemap.xml'
+PAGES_SHARD = 'sitemap-pages.xml.gz'
+MANIFEST_NAME = 'sitemap-manifest.json'
+SHARD_NAME_RE = re.compile(r'^sitemap-(pages|parts-\d+)\.xml\.gz$')
+
+STATIC_PAGES = [
+    ('/', '1.0', 'daily'),
+    ('/catalog/', '0.9', 'daily'),
+    ('/about/', '0.7', 'monthly'),
+    ('/contact/', '0.7', 'monthly'),
+]
+
+URLSET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_CLOSE = '</urlset>\n'
+
+
+def seo_files_root():
+    return Path(settings.SEO_FILES_ROOT)
+
+
+def shard_size():
+    return min(settings.SITEMAP_SHARD_SIZE, MAX_URLS_PER_SITEMAP)
+
+
+def parts_shard_name(shard):
+    return f'sitemap-parts-{shard + 1}.xml.gz'
+
+
+def site_base_url(request=None):
+    """Адрес сайта для ссылок карты: домен из django.contrib.sites"""
+    from django.contrib.sites.models import Site
+
+    try:
+        domain = Site.objects.get_current().domain
+    except Exception:
+        domain = request.get_host() if request is not None else 'localhost'
+    return f"https://{domain}"
+
+
+@contextmanager
+def atomic_file(path):
+    """Открывает временный файл рядом с path (wb); после записи он подменяет path"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as raw:
+            yield raw
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_atomic(path, chunks, compress=False):
+    """Пишет файл во временный рядом и подменяет им path (читатели не видят недописанный файл)"""
+    with atomic_file(path) as raw:
+        stream = gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) if compress else raw
+        for chunk in chunks:
+            stream.write(chunk.encode('utf-8'))
+        if compress:
+            stream.close()
+
+
+def _url(loc, lastmod, changefreq, priority):
+    return (
+        f'<url><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod>'
+        f'<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>\n'
+    )
+
+
+def _pages_urls(base_url):
+    from catalog.models import Brand
+
+    today = timezone.localdate().isoformat()
+    yield URLSET_OPEN
+    for url, priority, changefreq in STATIC_PAGES:
+        yield _url(f'{base_url}{url}', today, changefreq, priority)
+    for brand_id in Brand.objects.order_by('id').values_list('id', flat=True).iterator():
+        yield _url(f'{base_url}/catalog/brand/{brand_id}/', today, 'weekly', '0.6')
+    yield URLSET_CLOSE
+
+
+def _parts_urls(base_url, shard):
+    from catalog.models import Part
+
+    size = shard_size()
+    rows = (
+        Part.objects.filter(is_active=True, id__gt=shard * size, id__lte=(shard + 1) * size)
+        .order_by('id')
+        .values_list('id', 'updated_at')
+        .iterator(chunk_size=5000)
+    )
+    yield URLSET_OPEN
+    for part_id, updated_at in rows:
+        lastmod = timezone.localtime(updated_at).date().isoformat()
+        yield _url(f'{base_url}/catalog/part/{part_id}/', lastmod, 'weekly', '0.8')
+    yield URLSET_CLOSE
+
+
+def parts_signatures(size, name_for):
+    """
+    Число активных запчастей и последний updated_at по диапазонам id размера
+    size (один запрос); ключ — name_for(номер диапазона)
+    """
+    from catalog.models import Part
+
+    rows = (
+        Part.objects.filter(is_active=True)
+        .annotate(shard=(F('id') - 1) / size)
+        .values('shard')
+        .annotate(count=Count('id'), lastmod=Max('updated_at'))
+        .order_by('shard')
+    )
+    return {
+        name_for(row['shard']): {
+            'shard': row['shard'],
+            'count': row['count'],
+            'lastmod': row['lastmod'].isoformat(),
+        }
+        for row in rows
+    }
+
+
+def read_manifest(path):
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def build_sitemaps(base_url, full=False):
+    """
+    Собирает карту сайта. Без full перегенерирует только изменившиеся шарды.
+    Возвращает {'built': [...], 'unchanged': N, 'removed': [...]}.
+    """
+    root = seo_files_root()
+    manifest = read_manifest(root / MANIFEST_NAME)
+    if manifest.get('base_url') != base_url or manifest.get('shard_size') != shard_size():
+        full = True
+    previous = {} if full else manifest.get('shards', {})
+
+    signatures = parts_signatures(shard_size(), parts_shard_name)
+    built, unchanged = [], 0
+    for name, signature in signatures.items():
+        if previous.get(name) == signature and (root / name).exists():
+            unchanged += 1
+            continue
+        write_atomic(root / name, _parts_urls(base_url, signature['shard']), compress=True)
+        built.append(name)
+
+    # Статические страницы и бренды: файл маленький, собираем всегда
+    write_atomic(root / PAGES_SHARD, _pages_urls(base_url), compress=True)
+    built.append(PAGES_SHARD)
+
+    removed = []
+    for name in set(manifest.get('shards', {})) - set(signatures):
+        (root / name).unlink(missing_ok=True)
+        removed.append(name)
+
+    now = timezone.now().isoformat()
+    index = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+        f'<sitemap><loc>{escape(base_url)}/sitemaps/{PAGES_SHARD}</loc>'
+        f'<lastmod>{now}</lastmod></sitemap>\n',
+    ]
+    for name, signature in signatures.items():
+        index.append(
+            f'<sitemap><loc>{escape(base_url)}/sitemaps/{name}</loc>'
+            f'<lastmod>{signature["lastmod"]}</lastmod></sitemap>\n'
+        )
+    index.append('</sitemapindex>\n')
+    write_atomic(root / INDEX_NAME, index)
+
+    write_atomic(root / MANIFEST_NAME, [json.dumps({
+        'base_url': base_url,
+        'shard_size': shard_size(),
+        'built_at': now,
+        'shards': signatures,
+    })])
+    return {'built': built, 'unchanged': unchanged, 'removed': removed}
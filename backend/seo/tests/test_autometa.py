@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from catalog.models import Brand, Warehouse, Part
+from seo.autometa import TITLE_MAX, build_generated_meta, get_meta
+from seo.models import GeneratedMeta, SeoSettings
+
+
+class GeneratedMetaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.brand = Brand.objects.create(name='Bosch', country='Германия')
+        warehouse = Warehouse.objects.create(name='Основной', address='Москва')
+        self.part = Part.objects.create(
+            title='Фильтр масляный для двигателя с турбонаддувом и интеркулером',
+            original_number='0451103316', brand=self.brand, warehouse=warehouse,
+            quantity=5, stock=5, available=5, price_opt=100
+        )
+
+    def test_title_fits_with_long_site_name(self):
+        SeoSettings.objects.create(site_name='Интернет-магазин автозапчастей ' * 3, site_description='')
+        build_generated_meta()
+        for meta in GeneratedMeta.objects.all():
+            self.assertLessEqual(len(meta.title), TITLE_MAX)
+            self.assertLessEqual(len(meta.og_title), TITLE_MAX)
+
+    def test_missing_meta_built_for_single_object(self):
+        data = get_meta(GeneratedMeta.KIND_BRAND, self.brand.id)
+        self.assertIn('Bosch', data['title'])
+        self.assertEqual(list(GeneratedMeta.objects.values_list('key', flat=True)), [f'brand:{self.brand.id}'])
+
+    def test_unknown_object_returns_none_without_writes(self):
+        SeoSettings.get_settings()
+        get_meta(GeneratedMeta.KIND_BRAND, self.brand.id)
+        for kind in (GeneratedMeta.KIND_BRAND, GeneratedMeta.KIND_PART):
+            # Поиск записи и проверка объекта, без сборки и записи
+            with self.assertNumQueries(2):
+                self.assertIsNone(get_meta(kind, 999999))
+        self.assertEqual(GeneratedMeta.objects.count(), 1)
+
+    def test_api_unknown_brand_404(self):
+        response = self.client.get('/api/meta/brand/999999/')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(GeneratedMeta.objects.exists())
+
+    def test_stale_part_meta_rebuilt(self):
+        get_meta(GeneratedMeta.KIND_PART, self.part.id)
+        with self.assertNumQueries(1):
+            self.assertIn('цена 100 ₽', get_meta(GeneratedMeta.KIND_PART, self.part.id)['description'])
+
+        self.part.price_opt = 250
+        self.part.stock = 0
+        self.part.save()
+        description = get_meta(GeneratedMeta.KIND_PART, self.part.id)['description']
+        self.assertIn('цена 250 ₽, под заказ', description)
+        self.assertEqual(GeneratedMeta.objects.get(key=f'part:{self.part.id}').description, description)
@@ -0,0 +1,44 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from catalog.models import Brand, Warehouse, Part
+from seo.files import ROBOTS_NAME
+from seo.models import GeneratedMeta
+from seo.rebuild import rebuild_after_import
+from seo.sitemaps import INDEX_NAME
+
+
+class RebuildAfterImportTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(SEO_FILES_ROOT=str(self.root))
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        brand = Brand.objects.create(name='Bosch', country='Германия')
+        warehouse = Warehouse.objects.create(name='Основной', address='Москва')
+        Part.objects.create(
+            title='Фильтр масляный', brand=brand, warehouse=warehouse,
+            quantity=1, stock=1, available=1, price_opt=100
+        )
+
+    def test_rebuilds_meta_and_files(self):
+        messages = []
+        rebuild_after_import(log=messages.append)
+
+        self.assertEqual(len(messages), 3)
+        self.assertTrue((self.root / INDEX_NAME).exists())
+        self.assertTrue((self.root / ROBOTS_NAME).exists())
+        self.assertEqual(GeneratedMeta.objects.count(), 2)
+
+    def test_skip_files(self):
+        messages = []
+        rebuild_after_import(skip_files=True, log=messages.append)
+
+        self.assertEqual(messages, [])
+        self.assertEqual(list(self.root.iterdir()), [])
+        self.assertFalse(GeneratedMeta.objects.exists())
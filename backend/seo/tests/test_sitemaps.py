@@ -0,0 +1,106 @@
+import gzip
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from catalog.models import Brand, Warehouse, Part
+from seo.files import build_seo_files
+from seo.sitemaps import INDEX_NAME, MANIFEST_NAME, PAGES_SHARD, build_sitemaps
+
+BASE_URL = 'https://gooddrive.ru'
+
+
+class SitemapShardTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(SEO_FILES_ROOT=str(self.root), SITEMAP_SHARD_SIZE=2)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        brand = Brand.objects.create(name='Bosch', country='Германия')
+        warehouse = Warehouse.objects.create(name='Основной', address='Москва')
+        # Шарды по диапазонам id: 1–2, 3–4, 5–6
+        self.parts = {
+            part_id: Part.objects.create(
+                id=part_id, title=f'Фильтр {part_id}', brand=brand, warehouse=warehouse,
+                quantity=1, stock=1, available=1, price_opt=100
+            )
+            for part_id in (1, 2, 3, 5)
+        }
+
+    def manifest(self):
+        return json.loads((self.root / MANIFEST_NAME).read_text())
+
+    def shard_urls(self, name):
+        with gzip.open(self.root / name, 'rt') as shard:
+            return [line for line in shard if '/catalog/part/' in line]
+
+    def test_first_build_writes_shards_and_manifest(self):
+        result = build_sitemaps(BASE_URL)
+
+        names = ['sitemap-parts-1.xml.gz', 'sitemap-parts-2.xml.gz', 'sitemap-parts-3.xml.gz']
+        self.assertEqual(result['built'], names + [PAGES_SHARD])
+        self.assertEqual(
+            {name: shard['count'] for name, shard in self.manifest()['shards'].items()},
+            dict(zip(names, [2, 1, 1])),
+        )
+        self.assertEqual(len(self.shard_urls('sitemap-parts-1.xml.gz')), 2)
+        self.assertIn(f'{BASE_URL}/catalog/part/5/', self.shard_urls('sitemap-parts-3.xml.gz')[0])
+        index = (self.root / INDEX_NAME).read_text()
+        for name in names + [PAGES_SHARD]:
+            self.assertIn(f'{BASE_URL}/sitemaps/{name}', index)
+
+    def test_rebuild_only_changed_shards(self):
+        build_sitemaps(BASE_URL)
+        result = build_sitemaps(BASE_URL)
+        self.assertEqual((result['built'], result['unchanged']), ([PAGES_SHARD], 3))
+
+        self.parts[3].title = 'Фильтр воздушный'
+        self.parts[3].save()
+        result = build_sitemaps(BASE_URL)
+        self.assertEqual(result['built'], ['sitemap-parts-2.xml.gz', PAGES_SHARD])
+        self.assertEqual(result['unchanged'], 2)
+
+    def test_empty_shard_removed(self):
+        build_sitemaps(BASE_URL)
+        Part.objects.filter(id=5).update(is_active=False)
+
+        result = build_sitemaps(BASE_URL)
+        self.assertEqual(result['removed'], ['sitemap-parts-3.xml.gz'])
+        self.assertFalse((self.root / 'sitemap-parts-3.xml.gz').exists())
+        self.assertNotIn('sitemap-parts-3.xml.gz', self.manifest()['shards'])
+        self.assertNotIn('sitemap-parts-3', (self.root / INDEX_NAME).read_text())
+
+    def test_new_base_url_rebuilds_everything(self):
+        build_sitemaps(BASE_URL)
+        result = build_sitemaps('https://www.gooddrive.ru')
+        self.assertEqual(len(result['built']), 4)
+        self.assertIn('https://www.gooddrive.ru/catalog/part/1/', self.shard_urls('sitemap-parts-1.xml.gz')[0])
+
+
+class SeoFileViewTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(SEO_FILES_ROOT=str(self.root), SEO_FILES_ACCEL_PREFIX='')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_missing_files_not_built_on_request(self):
+        for url in ('/sitemap.xml', '/robots.txt'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 503, url)
+            self.assertEqual(response['Retry-After'], '600')
+        self.assertEqual(list(self.root.iterdir()), [])
+
+    def test_built_files_served(self):
+        build_seo_files(BASE_URL)
+        response = self.client.get('/sitemap.xml')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'sitemap-pages.xml.gz', b''.join(response.streaming_content))
+        response = self.client.get('/robots.txt')
+        self.assertIn(f'Sitemap: {BASE_URL}/sitemap.xml', b''.join(response.streaming_content).decode())
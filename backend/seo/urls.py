@@ -8,9 +8,23 @@ router.register(r'settings', views.SeoSettingsViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path(
+        'meta/part/<int:pk>/',
+        views.GeneratedMetaViewSet.as_view({'get': 'retrieve'}),
+        {'kind': 'part'},
+        name='seo-meta-part'
+    ),
+    path(
+        'meta/brand/<int:pk>/',
+        views.GeneratedMetaViewSet.as_view({'get': 'retrieve'}),
+        {'kind': 'brand'},
+        name='seo-meta-brand'
+    ),
     path('meta/<slug:slug>/', views.SeoPageViewSet.as_view({'get': 'meta'}), name='seo-meta'),
     path('robots.txt', views.robots_txt, name='robots-txt'),
     path('sitemap.xml', views.sitemap_xml, name='sitemap-xml'),
+    path('sitemaps/<str:filename>', views.sitemap_shard, name='sitemap-shard'),
+    path('feeds/yandex-market.yml.gz', views.yml_feed, name='yml-feed'),
     path('yandex-verification.html', views.yandex_verification, name='yandex-verification'),
 ]
 
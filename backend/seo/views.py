@@ -2,15 +2,25 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
-from django.template.loader import render_to_string
+from django.http import Http404, HttpResponse
 from django.conf import settings
+from gooddrive_backend.httpcache import HttpCacheMixin, cache_public
 from .models import SeoPage, SeoSettings
 from .serializers import SeoPageSerializer, SeoSettingsSerializer
+from .cache import seo_cache
+from .autometa import get_meta
+from .files import ROBOTS_NAME, serve_seo_file
+from .feeds import FEED_NAME
+from .sitemaps import INDEX_NAME, SHARD_NAME_RE, seo_files_root
 
+# Через сколько секунд роботу повторить запрос еще не собранного файла
+SEO_FILES_RETRY_AFTER = 600
 
-class SeoPageViewSet(viewsets.ModelViewSet):
+
+class SeoPageViewSet(HttpCacheMixin, viewsets.ModelViewSet):
     """ViewSet для управления SEO страницами"""
+    surrogate_keys = ['seo']
+    surrogate_key_prefix = 'seo-page'
     queryset = SeoPage.objects.filter(is_active=True)
     serializer_class = SeoPageSerializer
     lookup_field = 'slug'
@@ -21,32 +31,32 @@ class SeoPageViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def meta(self, request, slug=None):
-        """Получить SEO метаданные для конкретной страницы"""
-        try:
-            page = self.get_object()
-            serializer = self.get_serializer(page)
-            return Response(serializer.data)
-        except SeoPage.DoesNotExist:
-            # Возвращаем дефолтные метаданные
-            settings_obj = SeoSettings.get_settings()
-            default_data = {
-                'slug': slug,
-                'title': f"{settings_obj.site_name} - {slug.title()}",
-                'description': settings_obj.site_description,
-                'keywords': '',
-                'og_title': f"{settings_obj.site_name} - {slug.title()}",
-                'og_description': settings_obj.site_description,
-                'og_image_url': settings_obj.default_og_image.url if settings_obj.default_og_image else None,
-                'canonical_url': None,
-                'robots': 'index, follow',
-                'yandex_verification': settings_obj.yandex_verification,
-                'is_active': True
-            }
-            return Response(default_data)
-
-
-class SeoSettingsViewSet(viewsets.ModelViewSet):
+        """Получить SEO метаданные для конкретной страницы (из кэша процесса)"""
+        page_data = seo_cache.page(slug)
+        if page_data is not None:
+            return Response(page_data)
+
+        # Возвращаем дефолтные метаданные
+        settings_obj = seo_cache.settings()
+        default_data = {
+            'slug': slug,
+            'title': f"{settings_obj.site_name} - {slug.title()}",
+            'description': settings_obj.site_description,
+            'keywords': '',
+            'og_title': f"{settings_obj.site_name} - {slug.title()}",
+            'og_description': settings_obj.site_description,
+            'og_image_url': settings_obj.default_og_image.url if settings_obj.default_og_image else None,
+            'canonical_url': None,
+            'robots': 'index, follow',
+            'yandex_verification': settings_obj.yandex_verification,
+            'is_active': True
+        }
+        return Response(default_data)
+
+
+class SeoSettingsViewSet(HttpCacheMixin, viewsets.ModelViewSet):
     """ViewSet для управления SEO настройками"""
+    surrogate_keys = ['seo']
     queryset = SeoSettings.objects.all()
     serializer_class = SeoSettingsSerializer
     
@@ -55,94 +65,81 @@ class SeoSettingsViewSet(viewsets.ModelViewSet):
         return SeoSettings.get_settings()
     
     def list(self, request, *args, **kwargs):
-        """Возвращаем единственную запись настроек"""
-        settings_obj = self.get_object()
+        """Возвращаем единственную запись настроек (из кэша процесса)"""
+        settings_obj = seo_cache.settings()
         serializer = self.get_serializer(settings_obj)
         return Response(serializer.data)
     
     def retrieve(self, request, *args, **kwargs):
-        """Возвращаем единственную запись настроек"""
-        settings_obj = self.get_object()
+        """Возвращаем единственную запись настроек (из кэша процесса)"""
+        settings_obj = seo_cache.settings()
         serializer = self.get_serializer(settings_obj)
         return Response(serializer.data)
 
 
-def robots_txt(request):
-    """Генерирует robots.txt"""
-    settings_obj = SeoSettings.get_settings()
-    
-    robots_content = f"""User-agent: *
-Allow: /
+class GeneratedMetaViewSet(HttpCacheMixin, viewsets.ViewSet):
+    """Готовые SEO метаданные страниц запчастей и брендов (GeneratedMeta)"""
+    surrogate_keys = ['seo']
 
-User-agent: Yandex
-Allow: /
+    def get_surrogate_keys(self):
+        """Метаданные сбрасываются вместе с запчастью/брендом: ключ part:ID или brand:ID"""
+        return [*self.surrogate_keys, f"{self.kwargs['kind']}:{self.kwargs['pk']}"]
 
-User-agent: Googlebot
-Allow: /
+    def retrieve(self, request, kind=None, pk=None):
+        """Метаданные одним поиском по ключу; если запись не собрана или устарела — собираем"""
+        data = get_meta(kind, pk)
+        if data is None:
+            raise Http404
+        return Response(data)
 
-Sitemap: {request.build_absolute_uri('/sitemap.xml')}
-"""
-    
-    return HttpResponse(robots_content, content_type='text/plain')
+
+def seo_file_unavailable():
+    """
+    Файл еще не собран: по запросу его не собираем (сборка всей карты сайта
+    займет воркер), а просим робота зайти позже
+    """
+    response = HttpResponse(
+        'Файл еще не собран', status=503, content_type='text/plain; charset=utf-8'
+    )
+    response['Retry-After'] = str(SEO_FILES_RETRY_AFTER)
+    return response
+
+
+@cache_public('seo')
+def robots_txt(request):
+    """robots.txt (собирается командой build_seo_files и импортом каталога)"""
+    if not (seo_files_root() / ROBOTS_NAME).exists():
+        return seo_file_unavailable()
+    return serve_seo_file(ROBOTS_NAME, 'text/plain; charset=utf-8')
 
 
 def sitemap_xml(request):
-    """Генерирует sitemap.xml"""
-    from django.contrib.sites.models import Site
-    from django.urls import reverse
-    from catalog.models import Part, Brand
-    
-    try:
-        current_site = Site.objects.get_current()
-        domain = current_site.domain
-    except:
-        domain = request.get_host()
-    
-    base_url = f"https://{domain}"
-    
-    # Статические страницы
-    static_pages = [
-        {'url': '/', 'priority': '1.0', 'changefreq': 'daily'},
-        {'url': '/catalog/', 'priority': '0.9', 'changefreq': 'daily'},
-        {'url': '/about/', 'priority': '0.7', 'changefreq': 'monthly'},
-        {'url': '/contact/', 'priority': '0.7', 'changefreq': 'monthly'},
-    ]
-    
-    # Динамические страницы автозапчастей
-    parts = Part.objects.filter(is_active=True).select_related('brand')
-    part_pages = []
-    for part in parts:
-        part_pages.append({
-            'url': f'/catalog/part/{part.id}/',
-            'priority': '0.8',
-            'changefreq': 'weekly',
-            'lastmod': part.updated_at.strftime('%Y-%m-%d')
-        })
-    
-    # Страницы брендов
-    brands = Brand.objects.all()
-    brand_pages = []
-    for brand in brands:
-        brand_pages.append({
-            'url': f'/catalog/brand/{brand.id}/',
-            'priority': '0.6',
-            'changefreq': 'weekly'
-        })
-    
-    context = {
-        'base_url': base_url,
-        'static_pages': static_pages,
-        'part_pages': part_pages,
-        'brand_pages': brand_pages,
-    }
-    
-    sitemap_content = render_to_string('seo/sitemap.xml', context)
-    return HttpResponse(sitemap_content, content_type='application/xml')
+    """Индекс карты сайта (собирается командой build_seo_files и импортом каталога)"""
+    if not (seo_files_root() / INDEX_NAME).exists():
+        return seo_file_unavailable()
+    return serve_seo_file(INDEX_NAME, 'application/xml')
+
+
+def sitemap_shard(request, filename):
+    """Шард карты сайта (gzip)"""
+    if not SHARD_NAME_RE.match(filename):
+        raise Http404
+    if not (seo_files_root() / filename).exists():
+        raise Http404
+    return serve_seo_file(filename, 'application/gzip')
+
+
+def yml_feed(request):
+    """Товарный фид YML (собирается командой build_yml_feed, по запросу не собирается)"""
+    if not (seo_files_root() / FEED_NAME).exists():
+        raise Http404
+    return serve_seo_file(FEED_NAME, 'application/gzip')
 
 
+@cache_public('seo')
 def yandex_verification(request):
     """Страница подтверждения Яндекс.Вебмастер"""
-    settings_obj = SeoSettings.get_settings()
+    settings_obj = seo_cache.settings()
     verification_code = settings_obj.yandex_verification
     
     if verification_code:
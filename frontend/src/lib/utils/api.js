@@ -86,6 +86,11 @@ export const partsApi = {
     return api.get(`/api/parts/${id}/`);
   },
   
+  // Получить данные страницы запчасти одним запросом (деталь, похожие, SEO, крошки)
+  async getPartPage(id) {
+    return api.get(`/api/pages/part/${id}/`);
+  },
+  
   // Получить похожие автозапчасти
   async getSimilarParts(id) {
     return api.get(`/api/parts/${id}/similar/`);
@@ -100,6 +105,11 @@ export const partsApi = {
   async getLowStockParts(params = {}) {
     return api.get('/api/parts/low_stock/', params);
   },
+  
+  // Получить изменения каталога после курсора (since: next_cursor прошлого ответа)
+  async getPartChanges(since = '', limit = 500) {
+    return api.get('/api/parts/changes/', { since, limit });
+  },
 };
 
 // API для работы с брендами
@@ -135,6 +145,16 @@ export const seoApi = {
     return api.get(`/api/meta/${slug}/`);
   },
   
+  // Получить SEO метаданные страницы запчасти
+  async getPartMeta(id) {
+    return api.get(`/api/meta/part/${id}/`);
+  },
+  
+  // Получить SEO метаданные страницы бренда
+  async getBrandMeta(id) {
+    return api.get(`/api/meta/brand/${id}/`);
+  },
+  
   // Получить глобальные SEO настройки
   async getSettings() {
     return api.get('/api/settings/');
@@ -173,11 +193,33 @@ export const ordersApi = {
     return api.post('/api/orders/', orderData);
   },
   
+  // Статус заявки на заказ (режим очереди: создание вернуло ticket вместо заказа)
+  async getIntakeStatus(ticket) {
+    return api.get(`/api/orders/intake/${ticket}/`);
+  },
+  
+  // Дождаться обработки заявки: вернет заявку со статусом completed или failed
+  async waitForIntake(ticket, { interval = 1000, timeout = 60000 } = {}) {
+    const deadline = Date.now() + timeout;
+    while (true) {
+      const intake = await this.getIntakeStatus(ticket);
+      if (intake.status !== 'queued' || Date.now() >= deadline) {
+        return intake;
+      }
+      await new Promise((resolve) => setTimeout(resolve, interval));
+    }
+  },
+  
   // Получить список заказов
   async getOrders(params = {}) {
     return api.get('/api/orders/', params);
   },
   
+  // Подсказки городов доставки для фильтра заказов
+  async getCities(query = '') {
+    return api.get('/api/orders/cities/', { q: query });
+  },
+  
   // Получить заказ по ID
   async getOrder(id) {
     return api.get(`/api/orders/${id}/`);
@@ -191,22 +233,65 @@ export const ordersApi = {
     });
   },
   
+  // Массово обновить статус заказов
+  async bulkUpdateStatus({ ids = [], order_numbers = [], status, comment = '' }) {
+    return api.post('/api/orders/bulk_update_status/', {
+      ids,
+      order_numbers,
+      status,
+      comment
+    });
+  },
+  
   // Получить заказы по телефону
   async getOrdersByPhone(phone) {
     return api.get('/api/orders/by_phone/', { phone });
   },
   
+  // Получить историю заказов клиента (курсорная пагинация)
+  async getCustomerHistory(phone, cursor = null) {
+    return api.get('/api/orders/customer_history/', { phone, cursor });
+  },
+  
   // Получить статистику заказов
   async getOrderStatistics() {
     return api.get('/api/orders/statistics/');
   },
   
+  // Подписаться на изменения статуса заказа (server-sent events);
+  // streamToken — поле stream_token из ответа создания заказа
+  subscribeOrderStatus(orderNumber, streamToken, onStatus) {
+    const query = new URLSearchParams({ token: streamToken });
+    const source = new EventSource(`${API_BASE_URL}/api/orders/stream/${orderNumber}/?${query}`);
+    source.addEventListener('status', (event) => onStatus(JSON.parse(event.data)));
+    return () => source.close();
+  },
+  
   // Получить историю статусов заказа
   async getOrderStatusHistory(id) {
     return api.get(`/api/orders/${id}/status_history/`);
   },
 };
 
+// API для расчета корзины
+export const cartApi = {
+  // Рассчитать цены и доступность всех позиций корзины одним запросом
+  async quote(cart) {
+    return api.post('/api/cart/quote/', {
+      items: cart.map(item => ({ part_id: item.id, quantity: item.quantity }))
+    });
+  },
+};
+
+// Пакетные запросы: несколько GET к API за один HTTP-запрос
+export const batchApi = {
+  // paths — массив путей вида '/api/brands/'; ответы приходят в том же порядке
+  async get(paths, { parallel = false } = {}) {
+    const { responses } = await api.post('/api/batch/', { requests: paths, parallel });
+    return responses;
+  },
+};
+
 // Утилиты для работы с корзиной
 export const cartUtils = {
   // Получить корзину из localStorage